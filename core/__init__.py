@@ -6,7 +6,7 @@ Customize files in src/ for your task.
 """
 
 from .base_generator import BaseGenerator, GenerationConfig
-from .schemas import TaskPair
+from .schemas import TaskPair, LazyTaskPair, Deferred
 from .image_utils import ImageRenderer
 from .output_writer import OutputWriter
 
@@ -14,6 +14,8 @@ __all__ = [
     "BaseGenerator",
     "GenerationConfig",
     "TaskPair",
+    "LazyTaskPair",
+    "Deferred",
     "ImageRenderer",
     "OutputWriter",
 ]
@@ -1,12 +1,29 @@
 """Base generator class."""
 
+import hashlib
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 from pathlib import Path
 from pydantic import BaseModel, Field
+from .memory import MemoryTracker
+from .progress import ProgressReporter
 from .schemas import TaskPair
 
 
+def derive_seed(*parts: int) -> int:
+    """Deterministically mix integers (e.g. seed, worker, epoch) into a 63-bit seed."""
+    digest = hashlib.sha256(":".join(str(int(p)) for p in parts).encode("ascii")).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+def config_with(config: "GenerationConfig", **updates) -> "GenerationConfig":
+    """Copy a config, applying only the updates its class has fields for."""
+    fields = type(config).model_fields
+    return config.model_copy(update={k: v for k, v in updates.items() if k in fields})
+
+
 class GenerationConfig(BaseModel):
     """Generation configuration."""
     num_samples: int
@@ -15,6 +32,14 @@ class GenerationConfig(BaseModel):
     random_seed: Optional[int] = None
     output_dir: Path = Path("data/questions")
     image_size: tuple[int, int] = (400, 400)
+    # Git provenance for metadata, resolved once by the parent process
+    # (metadata_builder.get_git_info()) so workers never shell out to git
+    git_info: Optional[Dict[str, Any]] = None
+    # Opt-in per-stage memory accounting: "rss" or "tracemalloc" (see core.memory)
+    memory_profile: Optional[str] = None
+    # Per-task metadata.json keeps only task fields; run-level provenance and
+    # config go once into `<domain>_task/run.json` (see run_header())
+    compact_metadata: bool = False
 
 
 class BaseGenerator(ABC):
@@ -22,6 +47,12 @@ class BaseGenerator(ABC):
     
     def __init__(self, config: GenerationConfig):
         self.config = config
+        # Counters and per-task latencies for the run summary (see core.run_summary)
+        self.run_stats: Dict[str, Any] = {"tasks": 0, "task_seconds": []}
+        self.memory = MemoryTracker(config.memory_profile, self.run_stats) if config.memory_profile else None
+        # Scratch directory for intermediate files such as videos before
+        # OutputWriter copies them (None = a shared directory under the system temp dir)
+        self.temp_dir: Optional[Path] = None
         if config.random_seed is not None:
             import random
             random.seed(config.random_seed)
@@ -46,14 +77,63 @@ class BaseGenerator(ABC):
         """Generate a single task. Implement this in your generator."""
         pass
     
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Account the enclosed block as generation stage `name`: its time is added
+        to run_stats["<name>_seconds"] and, with memory_profile set, its peak
+        memory kept in run_stats["<name>_peak_bytes"].
+        """
+        started = time.perf_counter()
+        with self.memory.stage(name) if self.memory is not None else nullcontext():
+            yield
+        key = f"{name}_seconds"
+        self.run_stats[key] = self.run_stats.get(key, 0.0) + time.perf_counter() - started
+    
+    def reset_dedup(self) -> None:
+        """Forget the tasks seen so far, so the next task is not deduplicated against them."""
+    
+    def generate_task_at(self, index: int) -> TaskPair:
+        """
+        Generate the task at a dataset index, reseeding from (random_seed, index).
+        
+        The result depends only on the seed and index (not on which tasks were
+        generated before), apart from within-run deduplication retries; call
+        reset_dedup() first to rule those out.
+        """
+        import random
+        random.seed(derive_seed(self.config.random_seed or 0, index))
+        return self.generate_task_pair(f"{self.config.domain}_{index:08d}")
+    
+    def iter_dataset(
+        self,
+        indices: Optional[Sequence[int]] = None,
+        progress: Optional[ProgressReporter] = None,
+    ) -> Iterator[TaskPair]:
+        """
+        Generate tasks one at a time, so callers can write and drop each one.
+        
+        With `indices`, generates exactly those tasks via generate_task_at()
+        (e.g. one shard of a larger run); otherwise tasks 0..num_samples-1 from
+        one continuous random stream. Each generated task is counted in
+        `progress`, which also tracks this generator's run_stats.
+        """
+        if progress is not None:
+            progress.set_worker_stats(id(self), self.run_stats)
+        for i in indices if indices is not None else range(self.config.num_samples):
+            if indices is not None:
+                pair = self.generate_task_at(i)
+            else:
+                pair = self.generate_task_pair(f"{self.config.domain}_{i:08d}")
+            if progress is not None:
+                progress.update()
+            yield pair
+    
     def generate_dataset(self) -> List[TaskPair]:
         """Generate complete dataset."""
-        pairs = []
-        for i in range(self.config.num_samples):
-            task_id = f"{self.config.domain}_{i:08d}"
-            pair = self.generate_task_pair(task_id)
-            pairs.append(pair)
-            print(f"  Generated: {task_id}")
+        progress = ProgressReporter(total=self.config.num_samples)
+        pairs = list(self.iter_dataset(progress=progress))
+        progress.close()
         return pairs
 
 
@@ -116,4 +196,17 @@ class BaseGenerator(ABC):
             generator_name=self.config.domain,
             parameters=task_data,
             seed=self.config.random_seed,
+            git_info=self.config.git_info,
+            compact=self.config.compact_metadata,
+        )
+    
+    def run_header(self) -> dict:
+        """Run-level provenance and config for `run.json` (compact metadata)."""
+        from .metadata_builder import build_run_header
+        
+        return build_run_header(
+            generator_name=self.config.domain,
+            seed=self.config.random_seed,
+            git_info=self.config.git_info,
+            config=self.config.model_dump(mode="json", exclude={"git_info"}),
         )
@@ -0,0 +1,176 @@
+"""
+Memory-mappable raw frame store.
+
+Stores animation frames as fixed-shape uint8 RGB arrays so training code can
+read frame k of task i straight out of the page cache, without a video decoder.
+
+Layout of a store directory:
+
+    store.json               # {"width", "height", "channels", "dtype"}
+    shard_00000.bin          # raw frames, height*width*channels bytes each
+    shard_00000.idx.jsonl    # one line per task: task_id, offset, count[, frame_map]
+
+`offset` is the first frame slot of the task within the shard. Consecutive
+identical frames (the hold frames of an animation) are stored once; `frame_map`
+then maps each frame index to its slot relative to `offset`.
+"""
+
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .image_utils import ImageRenderer
+
+
+STORE_FILE = "store.json"
+
+
+def _shard_paths(root: Path, shard: int) -> Tuple[Path, Path]:
+    return root / f"shard_{shard:05d}.bin", root / f"shard_{shard:05d}.idx.jsonl"
+
+
+class FrameStoreWriter:
+    """Appends task frame sequences to a sharded raw frame store."""
+
+    def __init__(self, root: Path, image_size: Tuple[int, int], shard_size: int = 1000):
+        """
+        Args:
+            root: Store directory
+            image_size: (width, height) of every frame
+            shard_size: Tasks per shard file
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.width, self.height = image_size
+        self.frame_bytes = self.width * self.height * 3
+        self.shard_size = shard_size
+
+        header = {"width": self.width, "height": self.height, "channels": 3, "dtype": "uint8"}
+        store_file = self.root / STORE_FILE
+        if store_file.exists():
+            existing = json.loads(store_file.read_text())
+            if existing != header:
+                raise ValueError(f"{self.root} holds {existing}, cannot append {header}")
+        else:
+            store_file.write_text(json.dumps(header))
+
+        # Never append to shards from an earlier run
+        self._shard = len(list(self.root.glob("shard_*.bin")))
+        self._tasks_in_shard = 0
+        self._frames_in_shard = 0
+
+    def append(self, task_id: str, frames: List[Any]) -> None:
+        """Append one task's frames (PIL Images of the configured size)."""
+        if not frames:
+            raise ValueError(f"No frames provided for {task_id}")
+        if self._tasks_in_shard >= self.shard_size:
+            self._shard += 1
+            self._tasks_in_shard = 0
+            self._frames_in_shard = 0
+        data_path, index_path = _shard_paths(self.root, self._shard)
+
+        frame_map = []
+        slots = 0
+        with open(data_path, "ab") as f:
+            for k, frame in enumerate(frames):
+                if k > 0 and frame is frames[k - 1]:
+                    frame_map.append(slots - 1)
+                    continue
+                if frame.size != (self.width, self.height):
+                    raise ValueError(
+                        f"Frame {k} of {task_id} is {frame.size}, "
+                        f"store expects {(self.width, self.height)}"
+                    )
+                f.write(ImageRenderer.ensure_rgb(frame).tobytes())
+                frame_map.append(slots)
+                slots += 1
+
+        entry = {"task_id": task_id, "offset": self._frames_in_shard, "count": len(frames)}
+        if slots != len(frames):
+            entry["frame_map"] = frame_map
+        with open(index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        self._frames_in_shard += slots
+        self._tasks_in_shard += 1
+
+
+class FrameStoreReader:
+    """
+    Zero-copy random access to a frame store.
+
+    Frames are returned as read-only memoryviews into memory-mapped shards
+    (or numpy views via frame_array()); nothing is decoded or copied.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        header = json.loads((self.root / STORE_FILE).read_text())
+        self.width = header["width"]
+        self.height = header["height"]
+        self.channels = header["channels"]
+        self.frame_bytes = self.width * self.height * self.channels
+
+        self._entries: List[Tuple[int, Dict[str, Any]]] = []
+        self._by_id: Dict[str, int] = {}
+        for index_path in sorted(self.root.glob("shard_*.idx.jsonl")):
+            shard = int(index_path.name[len("shard_"):-len(".idx.jsonl")])
+            with open(index_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._by_id[entry["task_id"]] = len(self._entries)
+                        self._entries.append((shard, entry))
+        self._maps: Dict[int, mmap.mmap] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> "FrameStoreReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def task_ids(self) -> List[str]:
+        return [entry["task_id"] for _, entry in self._entries]
+
+    def _entry(self, task: Union[int, str]) -> Tuple[int, Dict[str, Any]]:
+        return self._entries[self._by_id[task] if isinstance(task, str) else task]
+
+    def num_frames(self, task: Union[int, str]) -> int:
+        """Number of frames of a task (by position or task ID)."""
+        return self._entry(task)[1]["count"]
+
+    def frame(self, task: Union[int, str], k: int) -> memoryview:
+        """Raw bytes of frame k of a task, shape (height, width, channels) in C order."""
+        shard, entry = self._entry(task)
+        if not 0 <= k < entry["count"]:
+            raise IndexError(f"Frame {k} out of range for {entry['task_id']} ({entry['count']} frames)")
+        frame_map: Optional[List[int]] = entry.get("frame_map")
+        slot = entry["offset"] + (frame_map[k] if frame_map is not None else k)
+        start = slot * self.frame_bytes
+        return memoryview(self._map(shard))[start:start + self.frame_bytes]
+
+    def frame_array(self, task: Union[int, str], k: int):
+        """Frame k of a task as a read-only (height, width, channels) uint8 numpy view."""
+        import numpy as np
+
+        return np.frombuffer(self.frame(task, k), dtype=np.uint8).reshape(
+            self.height, self.width, self.channels
+        )
+
+    def _map(self, shard: int) -> mmap.mmap:
+        if shard not in self._maps:
+            data_path, _ = _shard_paths(self.root, shard)
+            with open(data_path, "rb") as f:
+                self._maps[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[shard]
+
+    def close(self) -> None:
+        """Unmap all shards. Views returned earlier must be released first."""
+        for m in self._maps.values():
+            m.close()
+        self._maps.clear()
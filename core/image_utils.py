@@ -1,18 +1,32 @@
 """Image utilities."""
 
 from PIL import Image, ImageDraw
-from typing import Tuple
+from typing import IO, Iterable, List, Optional, Tuple, Union
+from pathlib import Path
 
 
 class ImageRenderer:
     """Helper for image rendering."""
     
-    def __init__(self, image_size: Tuple[int, int] = (400, 400)):
+    def __init__(
+        self,
+        image_size: Tuple[int, int] = (400, 400),
+        palette: Optional[List[int]] = None,
+    ):
         self.image_size = image_size
+        # Flat [r, g, b, r, g, b, ...] palette; when set, canvases are "P" mode
+        self.palette = palette
     
     def create_blank_image(self, bg_color: Tuple[int, int, int] = (255, 255, 255)) -> Image.Image:
-        """Create blank RGB image."""
-        return Image.new('RGB', self.image_size, bg_color)
+        """Create blank image (RGB, or palette mode if the renderer has a palette)."""
+        if self.palette is None:
+            return Image.new('RGB', self.image_size, bg_color)
+        entries = [tuple(self.palette[i:i + 3]) for i in range(0, len(self.palette), 3)]
+        if tuple(bg_color) not in entries:
+            raise ValueError(f"Background color {bg_color} is not in the palette")
+        image = Image.new('P', self.image_size, entries.index(tuple(bg_color)))
+        image.putpalette(self.palette)
+        return image
     
     def draw_grid(self, image: Image.Image, rows: int, cols: int) -> Image.Image:
         """Draw grid on image."""
@@ -38,3 +52,50 @@ class ImageRenderer:
     def ensure_rgb(image: Image.Image) -> Image.Image:
         """Convert image to RGB."""
         return image.convert('RGB') if image.mode != 'RGB' else image
+    
+    @staticmethod
+    def build_palette(colors: Iterable[Tuple[int, int, int]]) -> List[int]:
+        """Build a flat palette from colors (first occurrence wins, max 256)."""
+        unique: List[Tuple[int, int, int]] = []
+        for color in colors:
+            color = tuple(int(c) for c in color[:3])
+            if color not in unique:
+                unique.append(color)
+        if len(unique) > 256:
+            raise ValueError(f"Palette needs {len(unique)} colors; at most 256 allowed")
+        return [c for color in unique for c in color]
+    
+    @staticmethod
+    def to_palette(image: Image.Image) -> Optional[Image.Image]:
+        """
+        Losslessly convert image to palette ("P") mode.
+        
+        Returns None if the image has more than 256 distinct colors.
+        """
+        if image.mode == 'P':
+            return image
+        rgb = ImageRenderer.ensure_rgb(image)
+        colors = rgb.getcolors(256)
+        if colors is None:
+            return None
+        # Median cut keeps every color exactly when there are at most `colors` of them
+        paletted = rgb.quantize(
+            colors=len(colors), method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE
+        )
+        # Colors map one-to-one (no dithering), so equal histograms mean equal pixels
+        if sorted(paletted.convert('RGB').getcolors(256)) != sorted(colors):
+            return None
+        return paletted
+    
+    @staticmethod
+    def save_png(
+        image: Image.Image,
+        fp: Union[Path, IO[bytes]],
+        mode: str = "RGB",
+        compress_level: int = 6,
+        optimize: bool = False,
+    ) -> None:
+        """Save image as PNG in "RGB" or lossless palette ("P") mode."""
+        paletted = ImageRenderer.to_palette(image) if mode == "P" else None
+        image = paletted if paletted is not None else ImageRenderer.ensure_rgb(image)
+        image.save(fp, format="PNG", compress_level=compress_level, optimize=optimize)
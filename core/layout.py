@@ -0,0 +1,114 @@
+"""
+Task directory layouts.
+
+Tasks live under `<output>/<domain>_task/`. The "flat" layout puts every task
+directory directly there; the fan-out layouts add two levels of two-character
+buckets so no single directory grows beyond ~10k entries:
+
+    flat : <domain>_task/<task_id>/
+    index: <domain>_task/00/73/<task_id>/   (digits of the zero-padded task index)
+    hash : <domain>_task/3f/a2/<task_id>/   (prefix of sha1(task_id))
+
+The chosen layout is recorded in `layout.json` and every written task is listed
+in `manifest.jsonl` (or, written to object storage, in numbered segments
+`manifest-00000.jsonl`, ...; see manifest_files), so readers can resolve tasks
+without walking the tree.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+LAYOUTS = ("flat", "index", "hash")
+LAYOUT_FILE = "layout.json"
+MANIFEST_FILE = "manifest.jsonl"
+# Segments of the manifest appended through object storage (core.storage.segment_key)
+MANIFEST_SEGMENTS = "manifest-[0-9]*.jsonl"
+
+_INDEX_RE = re.compile(r"_(\d+)$")
+
+
+def task_index(task_id: str) -> int:
+    """Extract the numeric index from a `{domain}_{i:08d}` task ID."""
+    m = _INDEX_RE.search(task_id)
+    if m is None:
+        raise ValueError(f"Task ID {task_id!r} has no numeric index suffix")
+    return int(m.group(1))
+
+
+def task_relpath(task_id: str, layout: str = "flat") -> Path:
+    """Path of a task directory relative to `<domain>_task/`."""
+    if layout == "flat":
+        return Path(task_id)
+    if layout == "index":
+        digits = f"{task_index(task_id):08d}"
+    elif layout == "hash":
+        digits = hashlib.sha1(task_id.encode("utf-8")).hexdigest()
+    else:
+        raise ValueError(f"Unknown layout {layout!r}; expected one of {LAYOUTS}")
+    return Path(digits[:2]) / digits[2:4] / task_id
+
+
+def read_layout(domain_dir: Path) -> str:
+    """Layout of an existing `<domain>_task/` directory (flat if unrecorded)."""
+    layout_file = Path(domain_dir) / LAYOUT_FILE
+    if not layout_file.exists():
+        return "flat"
+    return json.loads(layout_file.read_text())["layout"]
+
+
+def resolve_task_dir(domain_dir: Path, task_id: str, layout: Optional[str] = None) -> Path:
+    """
+    Map a task ID to its directory.
+
+    Args:
+        domain_dir: The `<domain>_task/` directory
+        task_id: Task ID
+        layout: Layout name; read from `layout.json` if None
+    """
+    domain_dir = Path(domain_dir)
+    if layout is None:
+        layout = read_layout(domain_dir)
+    return domain_dir / task_relpath(task_id, layout)
+
+
+def manifest_files(domain_dir: Path) -> List[Path]:
+    """`manifest.jsonl` (if present) followed by its numbered segments, in order."""
+    domain_dir = Path(domain_dir)
+    files = [domain_dir / MANIFEST_FILE] if (domain_dir / MANIFEST_FILE).exists() else []
+    return files + sorted(domain_dir.glob(MANIFEST_SEGMENTS))
+
+
+def iter_manifest(domain_dir: Path) -> Iterator[Dict[str, Any]]:
+    """Yield manifest entries (`task_id`, `path` relative to domain_dir, ...)."""
+    for manifest in manifest_files(domain_dir):
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def iter_task_dirs(domain_dir: Path) -> Iterator[Path]:
+    """
+    Yield every task directory under `<domain>_task/`.
+
+    Uses the manifest when present; otherwise walks the recorded layout.
+    Works for datasets written before layouts and manifests existed.
+    """
+    domain_dir = Path(domain_dir)
+    if manifest_files(domain_dir):
+        # Re-runs into the same directory append entries again; keep the first
+        seen = set()
+        for entry in iter_manifest(domain_dir):
+            if entry["task_id"] not in seen:
+                seen.add(entry["task_id"])
+                yield domain_dir / entry["path"]
+        return
+    depth = 0 if read_layout(domain_dir) == "flat" else 2
+    pattern = "/".join(["*"] * (depth + 1))
+    for path in sorted(domain_dir.glob(pattern)):
+        if path.is_dir():
+            yield path
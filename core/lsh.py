@@ -0,0 +1,95 @@
+"""
+Locality-sensitive hashing for near-duplicate detection.
+
+NearDuplicateIndex finds previously added integer vectors within an L∞
+radius of a query without comparing against all of them. Each of its hash
+tables looks at a fixed random subset of the vector's coordinates and snaps
+them to a randomly offset grid whose cells are several radii wide; two
+vectors within the radius land in the same cell of a table with high
+probability, and the union over tables catches nearly all of them. Bucket
+hits are then checked exactly, so results never contain false positives.
+
+Vectors are only compared within the same `group` (an exact, hashable key
+such as the number of objects), which also keeps buckets small.
+"""
+
+import random
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+
+class NearDuplicateIndex:
+    """Streaming L∞ near-neighbour index over integer vectors."""
+
+    def __init__(
+        self,
+        radius: int,
+        num_tables: int = 20,
+        dims_per_table: int = 6,
+        cell_radii: int = 4,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            radius: Vectors match if no coordinate differs by more than this
+            num_tables: Hash tables (more = higher recall, more memory)
+            dims_per_table: Coordinates hashed per table (more = fewer candidates)
+            cell_radii: Grid cell width in multiples of radius
+            seed: Seed of the table layouts (indices with the same seed hash identically)
+        """
+        if radius < 0:
+            raise ValueError(f"radius must be >= 0, got {radius}")
+        self.radius = radius
+        self.num_tables = num_tables
+        self.dims_per_table = dims_per_table
+        self.cell = max(1, cell_radii * radius)
+        self.seed = seed
+        self._tables: Dict[int, List[Tuple[Tuple[int, ...], Tuple[int, ...]]]] = {}
+        self._buckets: Dict[Hashable, List[int]] = {}
+        self._items: List[Tuple[Any, Hashable, Tuple[int, ...]]] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _layout(self, dim: int) -> List[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+        """(coordinates, grid offsets) of every table for vectors of length dim."""
+        layout = self._tables.get(dim)
+        if layout is None:
+            # Private RNG: deterministic per (seed, dim), leaves `random` untouched
+            rng = random.Random(self.seed * 1_000_003 + dim)
+            k = min(self.dims_per_table, dim)
+            layout = [
+                (
+                    tuple(sorted(rng.sample(range(dim), k))),
+                    tuple(rng.randrange(self.cell) for _ in range(k)),
+                )
+                for _ in range(self.num_tables)
+            ]
+            self._tables[dim] = layout
+        return layout
+
+    def _keys(self, group: Hashable, vector: Tuple[int, ...]) -> List[Hashable]:
+        return [
+            (t, group, tuple((vector[d] + o) // self.cell for d, o in zip(dims, offsets)))
+            for t, (dims, offsets) in enumerate(self._layout(len(vector)))
+        ]
+
+    def add(self, item: Any, group: Hashable, vector: Sequence[int]) -> None:
+        """Index `vector` under `group`; query() returns `item` for its neighbours."""
+        vector = tuple(vector)
+        position = len(self._items)
+        self._items.append((item, group, vector))
+        for key in self._keys(group, vector):
+            self._buckets.setdefault(key, []).append(position)
+
+    def query(self, group: Hashable, vector: Sequence[int]) -> List[Any]:
+        """Items added under `group` within `radius` of `vector` (in insertion order)."""
+        vector = tuple(vector)
+        candidates = set()
+        for key in self._keys(group, vector):
+            candidates.update(self._buckets.get(key, ()))
+        matches = []
+        for position in sorted(candidates):
+            item, _, other = self._items[position]
+            if all(abs(a - b) <= self.radius for a, b in zip(vector, other)):
+                matches.append(item)
+        return matches
@@ -0,0 +1,196 @@
+"""
+Opt-in memory accounting and memory-budgeted concurrency.
+
+MemoryTracker records how much memory each generation stage needs, keyed
+like the stage timings in run_stats (see core.run_summary):
+
+    "rss"         peak resident set size during each stage (cheap; includes
+                  Pillow/numpy buffers). On Linux the kernel's high-water
+                  mark is reset at every stage start; elsewhere the RSS at
+                  the end of the stage is used.
+    "tracemalloc" true per-stage peak of Python-level allocations (slower;
+                  misses memory allocated by C libraries such as Pillow)
+
+Peaks are stored as `<stage>_peak_bytes` and merged across workers by
+maximum, so the run summary shows the worst worker.
+
+plan_concurrency() sizes the shared-memory render/encode pipeline so that the
+estimated footprint (worker processes, per-task frame buffers and the frame
+ring, i.e. the prefetch depth) stays under a memory budget; plan_stream()
+does the same for TaskStream's workers and prefetch queues, including the
+dedup state each stream worker keeps (bounded by its dedup window).
+"""
+
+import resource
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+PEAK_SUFFIX = "_peak_bytes"
+PROCESS_PEAK_KEY = "process_peak_bytes"
+MEMORY_MODES = ("rss", "tracemalloc")
+
+MB = 1024 * 1024
+# Estimated dedup state per remembered task (signature plus near-duplicate index entry)
+DEDUP_TASK_BYTES = 8 * 1024
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        return peak_rss()
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux); False if unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _hwm_rss() -> Optional[int]:
+    """RSS high-water mark since the last reset (Linux VmHWM), in bytes."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryTracker:
+    """Per-stage peak memory, recorded into a run_stats dict."""
+
+    def __init__(self, mode: str, stats: Dict[str, Any]):
+        """
+        Args:
+            mode: "rss" or "tracemalloc"
+            stats: run_stats dict the `<stage>_peak_bytes` entries are kept in
+        """
+        if mode not in MEMORY_MODES:
+            raise ValueError(f"Unknown memory mode {mode!r}; expected one of {MEMORY_MODES}")
+        self.mode = mode
+        self.stats = stats
+        self._resettable = mode == "rss" and _reset_peak_rss() and _hwm_rss() is not None
+        if mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Record the peak memory of the enclosed block as stage `name`."""
+        if self.mode == "tracemalloc":
+            tracemalloc.reset_peak()
+        elif self._resettable:
+            _reset_peak_rss()
+        try:
+            yield
+        finally:
+            if self.mode == "tracemalloc":
+                peak = tracemalloc.get_traced_memory()[1]
+            else:
+                peak = _hwm_rss() if self._resettable else current_rss()
+                # Resetting the high-water mark also resets ru_maxrss, so track it here
+                self.stats[PROCESS_PEAK_KEY] = max(self.stats.get(PROCESS_PEAK_KEY, 0), peak, current_rss())
+            key = name + PEAK_SUFFIX
+            self.stats[key] = max(self.stats.get(key, 0), peak)
+
+
+def plan_concurrency(
+    budget_bytes: int,
+    frame_bytes: int,
+    max_frames: int,
+    num_renderers: int,
+    num_encoders: int,
+    ring_slots: Optional[int] = None,
+    process_bytes: Optional[int] = None,
+) -> Tuple[int, int, int]:
+    """
+    Largest (renderers, encoders, ring slots) within the requested ones that fit a budget.
+
+    Estimate: every process costs `process_bytes` (default: this process's
+    current RSS), a renderer additionally holds one task's frames, an encoder
+    one frame, and the ring holds `max_frames` frames per slot. Ring slots are
+    cut first (down to one per encoder), then encoders and renderers
+    alternately (down to one each).
+
+    Raises:
+        ValueError: If even one renderer, one encoder and one slot don't fit
+    """
+    process_bytes = current_rss() if process_bytes is None else process_bytes
+    task_bytes = frame_bytes * max_frames
+    renderers, encoders = num_renderers, num_encoders
+    slots = ring_slots or (renderers + encoders)
+
+    def estimate(r: int, e: int, s: int) -> int:
+        return (1 + r + e) * process_bytes + r * task_bytes + e * frame_bytes + s * task_bytes
+
+    while estimate(renderers, encoders, slots) > budget_bytes:
+        if slots > max(1, encoders):
+            slots -= 1
+        elif encoders > 1 and encoders >= renderers:
+            encoders -= 1
+        elif renderers > 1:
+            renderers -= 1
+        elif slots > 1:
+            slots -= 1
+        else:
+            raise ValueError(
+                f"Memory budget {budget_bytes / MB:.0f} MB is below the minimum pipeline "
+                f"footprint of {estimate(1, 1, 1) / MB:.0f} MB"
+            )
+    return renderers, encoders, slots
+
+
+def plan_stream(
+    budget_bytes: int,
+    task_bytes: int,
+    num_workers: int,
+    prefetch: int,
+    process_bytes: Optional[int] = None,
+    dedup_bytes: int = 0,
+) -> Tuple[int, int]:
+    """
+    Largest (workers, prefetch) within the requested ones that fit a budget.
+
+    Estimate: every process costs `process_bytes` (default: this process's
+    current RSS), and each worker holds one task in progress plus `prefetch`
+    queued ones and up to `dedup_bytes` of dedup state. Prefetch is cut first
+    (down to one), then workers.
+
+    Raises:
+        ValueError: If even one worker with one queued task doesn't fit
+    """
+    process_bytes = current_rss() if process_bytes is None else process_bytes
+
+    def estimate(w: int, p: int) -> int:
+        return (1 + w) * process_bytes + w * ((1 + p) * task_bytes + dedup_bytes)
+
+    workers = num_workers
+    while estimate(workers, prefetch) > budget_bytes:
+        if prefetch > 1:
+            prefetch -= 1
+        elif workers > 1:
+            workers -= 1
+        else:
+            raise ValueError(
+                f"Memory budget {budget_bytes / MB:.0f} MB is below the minimum stream "
+                f"footprint of {estimate(1, 1) / MB:.0f} MB"
+            )
+    return workers, prefetch
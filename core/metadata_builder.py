@@ -16,6 +16,11 @@ from functools import lru_cache
 from typing import Any, Dict, Optional
 
 
+# Run header written once per `<domain>_task/` directory with compact metadata
+RUN_HEADER_FILE = "run.json"
+# Value of the "format" key that marks compact task metadata
+COMPACT_FORMAT = "compact"
+
 SKIP_KEYS = {
     'temp_path', 'temp_dir', 'temp_file',
     'video_temp_path', 'image_temp_path', 
@@ -26,6 +31,16 @@ SKIP_KEYS = {
 }
 
 
+def get_git_info() -> Dict[str, Any]:
+    """
+    Git provenance of this checkout (cached per process).
+
+    Resolve it once in the parent process and hand it to workers through
+    GenerationConfig.git_info, so worker processes never run git themselves.
+    """
+    return dict(_get_git_info())
+
+
 @lru_cache(maxsize=1)
 def _get_git_info() -> Dict[str, Any]:
     """
@@ -76,6 +91,8 @@ def build_metadata(
     generator_name: str,
     parameters: Dict[str, Any],
     seed: Optional[int] = None,
+    git_info: Optional[Dict[str, Any]] = None,
+    compact: bool = False,
 ) -> Dict[str, Any]:
     """
     Build standardized metadata for a task.
@@ -85,6 +102,10 @@ def build_metadata(
         generator_name: Name of the generator (domain)
         parameters: Task parameters dict (from _generate_task_data())
         seed: Random seed used for generation (does not affect param_hash)
+        git_info: Pre-resolved git provenance (default: resolve in this process)
+        compact: Keep only task_id, parameters and param_hash (marked with
+            "format": "compact"); the run-level fields live once in the run
+            header (see build_run_header)
     
     Returns:
         Standardized metadata dict with all required fields
@@ -92,6 +113,13 @@ def build_metadata(
     clean_params = _clean_parameters(parameters)
     param_hash = _compute_param_hash(clean_params)
 
+    if compact:
+        return {
+            "format": COMPACT_FORMAT,
+            "task_id": task_id,
+            "parameters": clean_params,
+            "param_hash": param_hash,
+        }
     return {
         "task_id": task_id,
         "generator": generator_name,
@@ -100,11 +128,67 @@ def build_metadata(
         "param_hash": param_hash,
         "generation": {
             "seed": seed,
-            "git": _get_git_info(),
+            "git": git_info if git_info is not None else _get_git_info(),
         }
     }
 
 
+def build_run_header(
+    generator_name: str,
+    seed: Optional[int] = None,
+    git_info: Optional[Dict[str, Any]] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build the run-level provenance shared by all compact task metadata.
+    
+    Written once as `<domain>_task/run.json`; together with a task's compact
+    metadata it carries the same information as full metadata
+    (see expand_metadata).
+    
+    Args:
+        generator_name: Name of the generator (domain)
+        seed: Random seed of the run
+        git_info: Pre-resolved git provenance (default: resolve in this process)
+        config: JSON-serializable generation config
+    """
+    return {
+        "generator": generator_name,
+        "timestamp": datetime.now().isoformat(),
+        "generation": {
+            "seed": seed,
+            "git": git_info if git_info is not None else _get_git_info(),
+        },
+        "config": config or {},
+    }
+
+
+def is_compact_metadata(metadata: Dict[str, Any]) -> bool:
+    """Whether metadata is marked as the compact form (run-level fields in run.json)."""
+    return metadata.get("format") == COMPACT_FORMAT
+
+
+def dump_metadata(metadata: Dict[str, Any]) -> str:
+    """Serialize metadata for metadata.json (compact metadata without whitespace)."""
+    if is_compact_metadata(metadata):
+        return json.dumps(metadata, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(metadata, ensure_ascii=False, indent=2)
+
+
+def expand_metadata(metadata: Dict[str, Any], run_header: Dict[str, Any]) -> Dict[str, Any]:
+    """Full-form metadata from compact metadata and its run header."""
+    if not is_compact_metadata(metadata):
+        return metadata
+    return {
+        "task_id": metadata["task_id"],
+        "generator": run_header["generator"],
+        "timestamp": run_header["timestamp"],
+        "parameters": metadata["parameters"],
+        "param_hash": metadata["param_hash"],
+        "generation": run_header["generation"],
+    }
+
+
 def _clean_parameters(params: Dict[str, Any]) -> Dict[str, Any]:
     """
     Clean parameters by removing non-serializable and unnecessary keys.
@@ -174,14 +258,39 @@ def _compute_param_hash(params: Dict[str, Any]) -> str:
     return hash_obj.hexdigest()[:16]
 
 
-def verify_metadata(metadata: Dict[str, Any]) -> bool:
+def verify_run_header(run_header: Dict[str, Any]) -> bool:
+    """
+    Verify that a run header has the run-level fields of full metadata.
+    """
+    for field in ['generator', 'timestamp', 'generation']:
+        if field not in run_header:
+            return False
+    
+    if not isinstance(run_header['generation'], dict) or 'seed' not in run_header['generation']:
+        return False
+    
+    git_info = run_header['generation'].get('git', {})
+    if not isinstance(git_info, dict) or 'commit' not in git_info:
+        return False
+    
+    return True
+
+
+def verify_metadata(metadata: Dict[str, Any], run_header: Optional[Dict[str, Any]] = None) -> bool:
     """
     Verify that metadata has all required fields and correct format.
+    
+    Accepts full and compact metadata. For compact metadata the run-level
+    fields are checked in `run_header` if given (only the task fields
+    otherwise).
     """
-    required_fields = [
-        'task_id', 'generator', 'timestamp',
-        'parameters', 'param_hash', 'generation'
-    ]
+    if is_compact_metadata(metadata):
+        required_fields = ['task_id', 'parameters', 'param_hash']
+    else:
+        required_fields = [
+            'task_id', 'generator', 'timestamp',
+            'parameters', 'param_hash', 'generation'
+        ]
     
     for field in required_fields:
         if field not in metadata:
@@ -193,6 +302,9 @@ def verify_metadata(metadata: Dict[str, Any]) -> bool:
     if not isinstance(metadata['parameters'], dict):
         return False
     
+    if is_compact_metadata(metadata):
+        return run_header is None or verify_run_header(run_header)
+    
     if 'seed' not in metadata['generation']:
         return False
     
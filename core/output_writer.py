@@ -1,59 +1,214 @@
 """Output writer for standard format."""
 
-import shutil
+import io
+import json
+import tempfile
 from pathlib import Path
-from typing import List
-from .schemas import TaskPair
+from typing import Any, Dict, List, Optional
+from .schemas import TaskPair, LazyTaskPair
+from .frame_store import FrameStoreWriter
 from .image_utils import ImageRenderer
+from .layout import LAYOUTS, LAYOUT_FILE, MANIFEST_FILE, task_relpath
+from .metadata_builder import RUN_HEADER_FILE, dump_metadata
+from .storage import LocalStorage, StorageBackend
+from .video_utils import PreviewWriter
 
 
 class OutputWriter:
     """Writes tasks to standard folder structure."""
     
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        png_mode: str = "RGB",
+        compress_level: int = 6,
+        optimize: bool = False,
+        layout: str = "flat",
+        frame_store: Optional[FrameStoreWriter] = None,
+        preview_writer: Optional[PreviewWriter] = None,
+        storage: Optional[StorageBackend] = None,
+        run_header: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            output_dir: Root output directory
+            png_mode: "RGB" (24-bit) or "P" (indexed color, lossless when the
+                image has at most 256 colors; falls back to RGB otherwise)
+            compress_level: zlib level passed to the PNG encoder (0-9)
+            optimize: Let the PNG encoder search for the smallest encoding
+            layout: Task directory layout - "flat", "index" or "hash"
+                (see core.layout)
+            frame_store: If given, task frames (TaskPair.frames) are appended
+                to this memory-mappable store
+            preview_writer: If given, task frames are also written as an
+                animated `preview.gif` / `preview.webp`
+            storage: Where files go (see core.storage); default: local
+                files under output_dir. With other backends, task_dir()
+                paths are only nominal (the key below output_dir).
+            run_header: Written as `run.json` into every `<domain>_task/`
+                directory (for compact metadata, see
+                metadata_builder.build_run_header)
+
+        Resolution variants (TaskPair.variants) are written with the same
+        settings under `<output_dir>/<width>px/`.
+        """
+        if png_mode not in ("RGB", "P"):
+            raise ValueError(f"png_mode must be 'RGB' or 'P', got {png_mode!r}")
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {LAYOUTS}, got {layout!r}")
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.storage = storage if storage is not None else LocalStorage(self.output_dir)
+        self.png_mode = png_mode
+        self.compress_level = compress_level
+        self.optimize = optimize
+        self.layout = layout
+        self.frame_store = frame_store
+        self.preview_writer = preview_writer
+        self.run_header = run_header
+        self._prepared_domains = set()
+        self._variant_writers: Dict[int, "OutputWriter"] = {}
+    
+    def domain_dir(self, domain: str) -> Path:
+        """The `<domain>_task/` directory, recording its layout on first use."""
+        key = f"{domain}_task"
+        if domain not in self._prepared_domains:
+            layout_key = f"{key}/{LAYOUT_FILE}"
+            existing = self.storage.read_text(layout_key)
+            if existing is not None:
+                existing = json.loads(existing)["layout"]
+                if existing != self.layout:
+                    raise ValueError(
+                        f"{self.output_dir / key} uses layout {existing!r}, not {self.layout!r}"
+                    )
+            else:
+                # Atomic, so concurrent writer processes never read a half-written file
+                self.storage.write_text(layout_key, json.dumps({"layout": self.layout}), atomic=True)
+            if self.run_header is not None:
+                self.storage.write_text(
+                    f"{key}/{RUN_HEADER_FILE}", json.dumps(self.run_header, ensure_ascii=False, indent=2), atomic=True
+                )
+            self._prepared_domains.add(domain)
+        return self.output_dir / key
+    
+    def task_dir(self, domain: str, task_id: str) -> Path:
+        """Directory a task is written to under the configured layout."""
+        return self.domain_dir(domain) / task_relpath(task_id, self.layout)
+    
+    def _key(self, path: Path) -> str:
+        """Storage key of a path below output_dir."""
+        return path.relative_to(self.output_dir).as_posix()
+    
+    def variant_writer(self, width: int) -> "OutputWriter":
+        """Writer for the `<width>px/` resolution variant directory."""
+        if width not in self._variant_writers:
+            self._variant_writers[width] = OutputWriter(
+                self.output_dir / f"{width}px",
+                png_mode=self.png_mode,
+                compress_level=self.compress_level,
+                optimize=self.optimize,
+                layout=self.layout,
+                storage=self.storage.child(f"{width}px"),
+                run_header=self.run_header,
+            )
+        return self._variant_writers[width]
+    
+    def _save_png(self, image, key: str) -> None:
+        """Save image as PNG using the configured mode and compression."""
+        buf = io.BytesIO()
+        ImageRenderer.save_png(
+            image, buf, self.png_mode, self.compress_level, self.optimize
+        )
+        self.storage.write_bytes(key, buf.getvalue())
     
     def write_task_pair(self, task_pair: TaskPair) -> Path:
         """Write single task to disk."""
-        task_dir = self.output_dir / f"{task_pair.domain}_task" / task_pair.task_id
-        task_dir.mkdir(parents=True, exist_ok=True)
+        task_dir = self.task_dir(task_pair.domain, task_pair.task_id)
+        task_key = self._key(task_dir)
         
         # Write images
-        ImageRenderer.ensure_rgb(task_pair.first_image).save(task_dir / "first_frame.png")
+        lazy = isinstance(task_pair, LazyTaskPair)
+        self._save_png(task_pair.first_image, f"{task_key}/first_frame.png")
+        if lazy:
+            task_pair.release("first_image")
         
         if task_pair.final_image:
-            ImageRenderer.ensure_rgb(task_pair.final_image).save(task_dir / "final_frame.png")
+            self._save_png(task_pair.final_image, f"{task_key}/final_frame.png")
+        if lazy:
+            task_pair.release("final_image")
+        
+        # Write parametric animation
+        if task_pair.animation is not None:
+            self.storage.write_text(
+                f"{task_key}/animation.json",
+                json.dumps(task_pair.animation, separators=(",", ":"))
+            )
+        
+        # Write vector exports
+        for name, document in (task_pair.svg or {}).items():
+            self.storage.write_text(f"{task_key}/{name}", document)
         
         # Write prompt
-        (task_dir / "prompt.txt").write_text(task_pair.prompt)
+        self.storage.write_text(f"{task_key}/prompt.txt", task_pair.prompt)
         
         # Write video if provided (preserve original extension)
         if task_pair.ground_truth_video and Path(task_pair.ground_truth_video).exists():
             video_src = Path(task_pair.ground_truth_video)
             video_ext = video_src.suffix  # .mp4 or .avi
-            video_dst = task_dir / f"ground_truth{video_ext}"
-            # If the generator already wrote the video into the task directory,
-            # don't attempt to copy it onto itself.
-            try:
-                if video_src.resolve() != video_dst.resolve():
-                    shutil.copy(video_src, video_dst)
-            except OSError:
-                # Best-effort: if resolve fails, fall back to normal copy.
-                shutil.copy(video_src, video_dst)
+            self.storage.put_file(f"{task_key}/ground_truth{video_ext}", video_src)
+        for fps, video in sorted((task_pair.video_variants or {}).items()):
+            if Path(video).exists():
+                self.storage.put_file(f"{task_key}/ground_truth_{fps}fps{Path(video).suffix}", Path(video))
+        
         
+        if self.frame_store is not None and task_pair.frames:
+            self.frame_store.append(task_pair.task_id, task_pair.frames)
+        if self.preview_writer is not None and task_pair.frames:
+            self._write_preview(task_pair.frames, f"{task_key}/preview")
         
         # Write metadata if provided
         if task_pair.metadata is not None:
-            import json
-            (task_dir / "metadata.json").write_text(
-                json.dumps(task_pair.metadata, ensure_ascii=False, indent=2)
-            )
+            self.storage.write_text(f"{task_key}/metadata.json", dump_metadata(task_pair.metadata))
+        
+        self._append_manifest(task_pair, task_dir)
         
+        for width, variant in (task_pair.variants or {}).items():
+            self.variant_writer(width).write_task_pair(variant)
+        if lazy:
+            task_pair.release()
         return task_dir
     
+    def _write_preview(self, frames, key: str) -> None:
+        """Write an animated preview, via a temporary file unless storage is local."""
+        path = self.storage.local_path(key)
+        if path is not None:
+            self.preview_writer.write(frames, path)
+            return
+        with tempfile.TemporaryDirectory() as tmp:
+            written = self.preview_writer.write(frames, Path(tmp) / "preview")
+            self.storage.write_bytes(key + written.suffix, written.read_bytes())
+    
+    def _append_manifest(self, task_pair: TaskPair, task_dir: Path) -> None:
+        """Record the written task in `<domain>_task/manifest.jsonl`."""
+        domain_dir = self.domain_dir(task_pair.domain)
+        entry = {
+            "task_id": task_pair.task_id,
+            "path": task_dir.relative_to(domain_dir).as_posix(),
+        }
+        if task_pair.metadata is not None and "param_hash" in task_pair.metadata:
+            entry["param_hash"] = task_pair.metadata["param_hash"]
+        self.storage.append_text(f"{self._key(domain_dir)}/{MANIFEST_FILE}", json.dumps(entry) + "\n")
+    
     def write_dataset(self, task_pairs: List[TaskPair]) -> Path:
         """Write all tasks to disk."""
         for pair in task_pairs:
             self.write_task_pair(pair)
+        self.flush()
         return self.output_dir
+    
+    def flush(self) -> None:
+        """Finish pending storage writes (uploads) and raise the first failure."""
+        self.storage.flush()
+    
+    def close(self) -> None:
+        """Finish pending writes and release the storage backend."""
+        self.storage.close()
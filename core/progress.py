@@ -0,0 +1,203 @@
+"""
+Rate-limited progress reporting and metrics export.
+
+ProgressReporter replaces per-task log lines with one status line per
+interval (throughput, ETA and average seconds per task of every stage) and
+can mirror the same numbers into a metrics file for a local scraper:
+
+    progress = ProgressReporter(total=10_000, metrics_path="metrics.prom")
+    for pair in generator.iter_dataset(progress=progress):
+        with progress.stage("write"):
+            writer.write_task_pair(pair)
+    progress.close()
+
+Stage times and counters come from generator run_stats (see
+core.run_summary): numeric `<stage>_seconds` entries are stage totals, other
+numbers are counters (`<stage>_peak_bytes` memory peaks are maxed instead
+of summed). Each worker's latest run_stats is kept separately and
+summed, so stats from several processes aggregate without double counting.
+A metrics path ending in `.prom` is written in the Prometheus textfile
+format, anything else as JSON; files are replaced atomically.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+from .memory import MB, PEAK_SUFFIX
+
+
+STAGE_SUFFIX = "_seconds"
+METRIC_PREFIX = "taskgen_"
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressReporter:
+    """Throughput/ETA/stage-time reporting, refreshed at most once per interval."""
+
+    def __init__(
+        self,
+        total: Optional[int] = None,
+        interval: float = 2.0,
+        metrics_path: Optional[Path] = None,
+        printer: Optional[Callable[[str], None]] = print,
+    ):
+        """
+        Args:
+            total: Expected number of tasks (enables percentage and ETA)
+            interval: Minimum seconds between status lines / metrics writes
+            metrics_path: Metrics file (.prom = Prometheus textfile, else JSON)
+            printer: Called with each status line (None = silent)
+        """
+        self.total = total
+        self.interval = interval
+        self.metrics_path = Path(metrics_path) if metrics_path is not None else None
+        self.printer = printer
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self._reported_done: Optional[int] = None
+        self._worker_stats: Dict[Hashable, Dict[str, Any]] = {}
+        self._local_stages: Dict[str, float] = {}
+
+    def update(self, n: int = 1) -> None:
+        """Count n finished tasks and report if the interval has passed."""
+        self.done += n
+        self._maybe_report()
+
+    def set_worker_stats(self, worker: Hashable, stats: Dict[str, Any]) -> None:
+        """Latest run_stats of one worker (replaces that worker's previous ones)."""
+        self._worker_stats[worker] = stats
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage measured by the caller."""
+        self._local_stages[stage] = self._local_stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current metrics: progress, throughput, ETA, stage averages and counters."""
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        worker_stages: Dict[str, float] = {}
+        counters: Dict[str, float] = {}
+        for stats in self._worker_stats.values():
+            for key, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                if key.endswith(PEAK_SUFFIX):
+                    counters[key] = max(counters.get(key, 0), value)
+                elif key.endswith(STAGE_SUFFIX):
+                    stage = key[:-len(STAGE_SUFFIX)]
+                    worker_stages[stage] = worker_stages.get(stage, 0.0) + value
+                else:
+                    counters[key] = counters.get(key, 0) + value
+        # Worker stages are averaged over the tasks the workers report (they may
+        # run ahead of the tasks finished here); the caller's own over `done`
+        averages = {
+            stage: seconds / counters.get("tasks", self.done)
+            for stage, seconds in worker_stages.items() if counters.get("tasks", self.done)
+        }
+        averages.update(
+            (stage, seconds / self.done) for stage, seconds in self._local_stages.items() if self.done
+        )
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(0.0, (self.total - self.done) / rate)
+        return {
+            "tasks_done": self.done,
+            "tasks_total": self.total,
+            "elapsed_seconds": round(elapsed, 3),
+            "tasks_per_second": round(rate, 3),
+            "eta_seconds": round(eta, 3) if eta is not None else None,
+            "stage_seconds_per_task": {stage: round(averages[stage], 6) for stage in sorted(averages)},
+            "counters": counters,
+        }
+
+    def report(self, force: bool = True) -> Dict[str, Any]:
+        """Print a status line and write the metrics file now (line skipped if
+        nothing finished since the last one, unless forced)."""
+        self._last_report = time.perf_counter()
+        metrics = self.snapshot()
+        if self.printer is not None and (force or self.done != self._reported_done):
+            self.printer(self.format_line(metrics))
+        self._reported_done = self.done
+        if self.metrics_path is not None:
+            self.write_metrics(metrics)
+        return metrics
+
+    def close(self) -> Dict[str, Any]:
+        """Final report."""
+        return self.report(force=False)
+
+    def _maybe_report(self) -> None:
+        if time.perf_counter() - self._last_report >= self.interval:
+            self.report()
+
+    def format_line(self, metrics: Dict[str, Any]) -> str:
+        done, total = metrics["tasks_done"], metrics["tasks_total"]
+        parts = [f"  {done}/{total} tasks ({100.0 * done / total:.1f}%)" if total else f"  {done} tasks"]
+        parts.append(f"{metrics['tasks_per_second']:.1f} tasks/s")
+        if metrics["eta_seconds"] is not None:
+            parts.append(f"ETA {_format_duration(metrics['eta_seconds'])}")
+        stages = metrics["stage_seconds_per_task"]
+        if stages:
+            parts.append(", ".join(f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in stages.items()))
+        peaks = [v for k, v in metrics["counters"].items() if k.endswith(PEAK_SUFFIX)]
+        if peaks:
+            parts.append(f"peak {max(peaks) / MB:.0f} MB/worker")
+        return " | ".join(parts)
+
+    def write_metrics(self, metrics: Dict[str, Any]) -> Path:
+        """Atomically replace the metrics file."""
+        path = self.metrics_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".prom":
+            text = self._prometheus_text(metrics)
+        else:
+            text = json.dumps(metrics, indent=2)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(text)
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def _prometheus_text(metrics: Dict[str, Any]) -> str:
+        lines = []
+
+        def header(name: str, help_text: str) -> None:
+            lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+
+        for name, help_text in (
+            ("tasks_done", "Tasks finished"),
+            ("tasks_total", "Tasks planned"),
+            ("elapsed_seconds", "Seconds since the run started"),
+            ("tasks_per_second", "Average throughput"),
+            ("eta_seconds", "Estimated seconds until done"),
+        ):
+            if metrics[name] is not None:
+                header(name, help_text)
+                lines.append(f"{METRIC_PREFIX}{name} {metrics[name]}")
+        if metrics["stage_seconds_per_task"]:
+            header("stage_seconds_per_task", "Average seconds per task spent in a stage")
+            for stage, seconds in metrics["stage_seconds_per_task"].items():
+                lines.append(f'{METRIC_PREFIX}stage_seconds_per_task{{stage="{stage}"}} {seconds}')
+        for name, value in sorted(metrics["counters"].items()):
+            header(name, f"Run counter {name}")
+            lines.append(f"{METRIC_PREFIX}{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,91 @@
+"""
+Run summaries.
+
+Generators keep plain run statistics: integer counters, float stage totals
+named "<stage>_seconds", optional memory peaks named "<stage>_peak_bytes"
+(see core.memory), and a list of per-task latencies under "task_seconds". Stats from several processes are
+combined with merge_run_stats() and reduced to a JSON-friendly summary
+(counters plus latency percentiles) with summarize_run_stats().
+
+record_task() keeps the latency list a uniform sample of at most
+MAX_LATENCY_SAMPLES per process (reservoir sampling with a private RNG, so the
+generators' random stream is untouched), so streams and services that run
+indefinitely hold bounded stats; shorter runs keep every latency.
+"""
+
+import json
+import math
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .memory import PEAK_SUFFIX
+
+
+LATENCY_KEY = "task_seconds"
+RUN_SUMMARY_FILE = "run_summary.json"
+MAX_LATENCY_SAMPLES = 10_000
+
+_reservoir_rng = random.Random(0)
+
+
+def record_task(stats: Dict[str, Any], seconds: float) -> None:
+    """Count a finished task and add its latency to the bounded latency sample."""
+    stats["tasks"] = stats.get("tasks", 0) + 1
+    samples = stats.setdefault(LATENCY_KEY, [])
+    if len(samples) < MAX_LATENCY_SAMPLES:
+        samples.append(seconds)
+        return
+    # Reservoir sampling: every latency so far is kept with equal probability
+    slot = _reservoir_rng.randrange(stats["tasks"])
+    if slot < MAX_LATENCY_SAMPLES:
+        samples[slot] = seconds
+
+
+def merge_run_stats(*stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine run stats: numbers are summed (memory peaks maxed), lists concatenated."""
+    merged: Dict[str, Any] = {}
+    for s in stats:
+        for key, value in s.items():
+            if isinstance(value, list):
+                merged.setdefault(key, []).extend(value)
+            elif key.endswith(PEAK_SUFFIX):
+                merged[key] = max(merged.get(key, 0), value)
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_run_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Counters plus p50/p90/p99/max task latency in seconds."""
+    summary = {
+        k: round(v, 6) if isinstance(v, float) else v
+        for k, v in stats.items() if not isinstance(v, list)
+    }
+    seconds = stats.get(LATENCY_KEY, [])
+    if seconds:
+        summary["task_latency"] = {
+            "mean": round(sum(seconds) / len(seconds), 6),
+            "p50": round(percentile(seconds, 50), 6),
+            "p90": round(percentile(seconds, 90), 6),
+            "p99": round(percentile(seconds, 99), 6),
+            "max": round(max(seconds), 6),
+        }
+    return summary
+
+
+def write_run_summary(output_dir: Path, summary: Dict[str, Any]) -> Path:
+    """Write `<output_dir>/run_summary.json`."""
+    path = Path(output_dir) / RUN_SUMMARY_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(summary, indent=2))
+    return path
@@ -1,6 +1,6 @@
 """Pydantic schemas for task data."""
 
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Callable, Dict, List
 from pydantic import BaseModel
 
 
@@ -12,7 +12,77 @@ class TaskPair(BaseModel):
     first_image: Any  # PIL Image
     final_image: Optional[Any] = None  # PIL Image
     ground_truth_video: Optional[str] = None
+    video_variants: Optional[Dict[int, str]] = None  # Paths to the video at other frame rates, keyed by fps (optional)
     metadata: Optional[Dict[str, Any]] = None  # Task metadata for deduplication and tracking  # Path to video (optional)
+    frames: Optional[List[Any]] = None  # PIL Images of the ground-truth animation (optional)
+    animation: Optional[Dict[str, Any]] = None  # Keyframe parameters the video can be re-rendered from (optional)
+    svg: Optional[Dict[str, str]] = None  # SVG documents keyed by file name, e.g. "first_frame.svg" (optional)
+    variants: Optional[Dict[int, "TaskPair"]] = None  # Same task at other output widths (optional)
+    
+    class Config:
+        arbitrary_types_allowed = True
+
+
+class Deferred:
+    """A value computed on first use and cached until released."""
+    
+    __slots__ = ("_factory", "_value", "_ready")
+    
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._value = None
+        self._ready = False
+    
+    def __call__(self) -> Any:
+        if not self._ready:
+            self._value = self._factory()
+            self._ready = True
+        return self._value
+    
+    def release(self) -> None:
+        """Drop the cached value (it is recomputed if needed again)."""
+        self._value = None
+        self._ready = False
+
+
+LAZY_FIELDS = ("first_image", "final_image", "ground_truth_video", "video_variants", "frames")
+
+
+class LazyTaskPair(TaskPair):
+    """
+    TaskPair whose image, video and frame fields may be Deferred thunks.
+    
+    Deferred fields render on first attribute access, so consumers that only
+    read metadata never pay for rendering. release() frees them once written.
+    """
+    ground_truth_video: Optional[Any] = None  # Path, or Deferred producing one
+    video_variants: Optional[Any] = None  # {fps: path}, or Deferred producing one
+    frames: Optional[Any] = None  # List of PIL Images, or Deferred producing one
+    
+    def __getattribute__(self, name: str) -> Any:
+        value = super().__getattribute__(name)
+        if name in LAZY_FIELDS and isinstance(value, Deferred):
+            return value()
+        return value
+    
+    def release(self, *names: str) -> None:
+        """Free rendered fields (all lazy fields by default); they read as None afterwards."""
+        for name in names or LAZY_FIELDS:
+            value = self.__dict__.get(name)
+            if isinstance(value, Deferred):
+                value.release()
+            self.__dict__[name] = None
+
+
+class TaskSample(BaseModel):
+    """A decoded task streamed in memory (see core.task_stream)."""
+    task_id: str
+    domain: str
+    prompt: str
+    first_frame: Any  # (H, W, 3) uint8 numpy array, or PIL Image
+    final_frame: Optional[Any] = None
+    frames: Optional[List[Any]] = None  # Animation frames, same type as first_frame
+    metadata: Optional[Dict[str, Any]] = None
     
     class Config:
         arbitrary_types_allowed = True
@@ -0,0 +1,368 @@
+"""
+Local on-demand task generation service.
+
+Wraps a generator in a small HTTP server so several jobs can pull fresh tasks
+from one warm worker pool instead of each running examples/generate.py:
+
+    POST /tasks
+    {"seed": 42, "start": 0, "stop": 1000,
+     "options": {"generate_videos": false},    # any config field overrides
+     "format": "tar",                          # or "jsonl"
+     "png_mode": "RGB"}                        # or "P"
+
+The response is streamed (chunked) in index order: a tar archive with
+`<task_id>/<file>` members, or one JSON object per line with base64 files.
+Batches are submitted at most `max_ahead` tasks ahead of what the client has
+read, so a slow client holds back generation instead of piling up results.
+Task i is generated with `generate_task_at(i)` under config seed `seed`, so
+results are reproducible and can be served from an LRU cache. Requests are
+split into batches across the pool; concurrent requests for the same task
+share a single render.
+
+    GET /health   -> {"status": "ok", "cached": ..., "in_flight": ...}
+"""
+
+import base64
+import io
+import json
+import tarfile
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Type
+
+from .base_generator import BaseGenerator, GenerationConfig, config_with
+from .image_utils import ImageRenderer
+from .metadata_builder import dump_metadata, get_git_info
+from .schemas import TaskPair
+
+
+TaskFiles = Dict[str, bytes]
+
+# Config fields a request may not override
+_RESERVED_OPTIONS = {"num_samples", "output_dir", "random_seed", "domain", "git_info"}
+
+# Per worker process: the most recently used generators keyed by config,
+# reused across batches, and a scratch directory no other process writes to
+MAX_WORKER_GENERATORS = 8
+_worker_generators: "OrderedDict[str, BaseGenerator]" = OrderedDict()
+_worker_temp_dir: Optional[Path] = None
+
+
+def _task_files(pair: TaskPair, png_mode: str) -> TaskFiles:
+    """Encode a TaskPair into the files OutputWriter would write."""
+    files: TaskFiles = {}
+    for name, image in (("first_frame.png", pair.first_image), ("final_frame.png", pair.final_image)):
+        if image is not None:
+            buf = io.BytesIO()
+            ImageRenderer.save_png(image, buf, png_mode)
+            files[name] = buf.getvalue()
+    if pair.animation is not None:
+        files["animation.json"] = json.dumps(pair.animation, separators=(",", ":")).encode("utf-8")
+    for name, document in (pair.svg or {}).items():
+        files[name] = document.encode("utf-8")
+    files["prompt.txt"] = pair.prompt.encode("utf-8")
+    videos = [("ground_truth", pair.ground_truth_video)] if pair.ground_truth_video else []
+    videos += [(f"ground_truth_{fps}fps", path) for fps, path in sorted((pair.video_variants or {}).items())]
+    for name, path in videos:
+        video = Path(path)
+        # A missing video fails the task instead of caching it without one
+        if not video.exists():
+            raise FileNotFoundError(f"{pair.task_id}: video {video} was not written")
+        files[f"{name}{video.suffix}"] = video.read_bytes()
+        video.unlink()
+    if pair.metadata is not None:
+        files["metadata.json"] = dump_metadata(pair.metadata).encode("utf-8")
+    for width, variant in (pair.variants or {}).items():
+        for name, data in _task_files(variant, png_mode).items():
+            files[f"{width}px/{name}"] = data
+    return files
+
+
+def _render_batch(
+    generator_cls: Type[BaseGenerator],
+    config: GenerationConfig,
+    config_key: str,
+    indices: List[int],
+    png_mode: str,
+) -> List[Tuple[str, TaskFiles]]:
+    """Worker entry point: render a batch of task indices."""
+    global _worker_temp_dir
+    if _worker_temp_dir is None:
+        _worker_temp_dir = Path(tempfile.mkdtemp(prefix="task_service_"))
+    generator = _worker_generators.get(config_key)
+    if generator is None:
+        generator = _worker_generators[config_key] = generator_cls(config)
+        generator.temp_dir = _worker_temp_dir
+        while len(_worker_generators) > MAX_WORKER_GENERATORS:
+            _worker_generators.popitem(last=False)
+    _worker_generators.move_to_end(config_key)
+    results = []
+    for index in indices:
+        # A task depends only on (seed, index), not on what this worker rendered before
+        generator.reset_dedup()
+        pair = generator.generate_task_at(index)
+        results.append((pair.task_id, _task_files(pair, png_mode)))
+    generator.run_stats["task_seconds"].clear()
+    return results
+
+
+class TaskService:
+    """Batches task requests over a process pool, with an LRU cache of rendered tasks."""
+
+    def __init__(
+        self,
+        generator_cls: Type[BaseGenerator],
+        base_config: GenerationConfig,
+        num_workers: int = 4,
+        batch_size: int = 16,
+        cache_size: int = 2048,
+        max_request_tasks: int = 100_000,
+        max_ahead: Optional[int] = None,
+    ):
+        """
+        Args:
+            generator_cls: BaseGenerator subclass to run in the workers
+            base_config: Config that request options are applied on top of
+            num_workers: Worker processes
+            batch_size: Tasks per unit of work sent to a worker
+            cache_size: Rendered tasks kept in the LRU cache
+            max_request_tasks: Largest index range a single request may ask for
+            max_ahead: Tasks stream() keeps submitted ahead of its consumer
+                (default: two batches per worker)
+        """
+        self.generator_cls = generator_cls
+        # Resolve provenance once here rather than in every worker
+        if base_config.git_info is None:
+            base_config = config_with(base_config, git_info=get_git_info())
+        self.base_config = base_config
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.max_request_tasks = max_request_tasks
+        self.max_ahead = max_ahead or 2 * num_workers * batch_size
+        self._pool = ProcessPoolExecutor(max_workers=num_workers)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple, Tuple[str, TaskFiles]]" = OrderedDict()
+        self._in_flight: Dict[Tuple, Future] = {}
+
+    def make_config(self, seed: int, options: Dict[str, Any]) -> GenerationConfig:
+        """Apply request options to the base config (raises ValueError if invalid)."""
+        reserved = _RESERVED_OPTIONS.intersection(options)
+        if reserved:
+            raise ValueError(f"Options may not override {sorted(reserved)}")
+        unknown = set(options) - set(type(self.base_config).model_fields)
+        if unknown:
+            raise ValueError(f"Unknown options {sorted(unknown)}")
+        data = {**self.base_config.model_dump(), **options, "random_seed": seed}
+        return type(self.base_config).model_validate(data)
+
+    def _prepare(
+        self, seed: int, start: int, stop: int, options: Dict[str, Any], png_mode: str
+    ) -> Tuple[GenerationConfig, str]:
+        """Validate a request; returns its config and cache key (raises ValueError if invalid)."""
+        if png_mode not in ("RGB", "P"):
+            raise ValueError(f"png_mode must be 'RGB' or 'P', got {png_mode!r}")
+        if not 0 <= start <= stop or stop - start > self.max_request_tasks:
+            raise ValueError(f"Invalid range [{start}, {stop}) (max {self.max_request_tasks} tasks)")
+        config = self.make_config(seed, options)
+        return config, json.dumps(config.model_dump(mode="json"), sort_keys=True)
+
+    def submit(self, seed: int, start: int, stop: int, options: Dict[str, Any], png_mode: str = "RGB") -> List[Future]:
+        """
+        Request tasks [start, stop); returns one future per task, in index order.
+
+        Each future resolves to (task_id, files). Everything is submitted at
+        once; use stream() to bound how much is rendered ahead of the consumer.
+        """
+        config, config_key = self._prepare(seed, start, stop, options, png_mode)
+        return self._submit_range(config, config_key, png_mode, start, stop)
+
+    def stream(
+        self, seed: int, start: int, stop: int, options: Dict[str, Any], png_mode: str = "RGB"
+    ) -> Iterator[Tuple[str, TaskFiles]]:
+        """
+        Request tasks [start, stop); returns an iterator of (task_id, files) in index order.
+
+        The request is validated immediately (ValueError). Tasks are submitted
+        at most max_ahead ahead of the consumer, and each result is released
+        once it has been yielded.
+        """
+        config, config_key = self._prepare(seed, start, stop, options, png_mode)
+        return self._stream(config, config_key, png_mode, start, stop)
+
+    def _stream(
+        self, config: GenerationConfig, config_key: str, png_mode: str, start: int, stop: int
+    ) -> Iterator[Tuple[str, TaskFiles]]:
+        pending: Deque[Future] = deque()
+        next_index = start
+        while pending or next_index < stop:
+            # Top up in whole batches once there is room for one
+            if next_index < stop and (not pending or len(pending) + self.batch_size <= self.max_ahead):
+                chunk_stop = min(stop, next_index + self.max_ahead - len(pending))
+                pending.extend(self._submit_range(config, config_key, png_mode, next_index, chunk_stop))
+                next_index = chunk_stop
+            yield pending.popleft().result()
+
+    def _submit_range(
+        self, config: GenerationConfig, config_key: str, png_mode: str, start: int, stop: int
+    ) -> List[Future]:
+        futures: List[Future] = []
+        missing: List[Tuple[int, Future]] = []
+        with self._lock:
+            for index in range(start, stop):
+                key = (config_key, png_mode, index)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    future = Future()
+                    future.set_result(self._cache[key])
+                elif key in self._in_flight:
+                    future = self._in_flight[key]
+                else:
+                    future = self._in_flight[key] = Future()
+                    missing.append((index, future))
+                futures.append(future)
+
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            work = self._pool.submit(
+                _render_batch, self.generator_cls, config, config_key,
+                [index for index, _ in batch], png_mode,
+            )
+            work.add_done_callback(
+                lambda done, batch=batch: self._resolve(config_key, png_mode, batch, done)
+            )
+        return futures
+
+    def _resolve(self, config_key: str, png_mode: str, batch: List[Tuple[int, Future]], done: Future) -> None:
+        error = CancelledError() if done.cancelled() else done.exception()
+        results = done.result() if error is None else None
+        with self._lock:
+            for k, (index, future) in enumerate(batch):
+                key = (config_key, png_mode, index)
+                self._in_flight.pop(key, None)
+                if error is not None:
+                    future.set_exception(error)
+                    continue
+                self._cache[key] = results[k]
+                self._cache.move_to_end(key)
+                future.set_result(results[k])
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"cached": len(self._cache), "in_flight": len(self._in_flight)}
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        """Serve HTTP until interrupted."""
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+        server.service = self
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.close()
+
+
+class _ChunkedWriter(io.RawIOBase):
+    """File-like wrapper emitting HTTP/1.1 chunked transfer encoding."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if data:
+            self.wfile.write(b"%x\r\n" % len(data) + bytes(data) + b"\r\n")
+        return len(data)
+
+    def finish(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def _jsonl_record(task_id: str, files: TaskFiles) -> bytes:
+    record: Dict[str, Any] = {"task_id": task_id, "files": {}}
+    for name, data in files.items():
+        if name == "prompt.txt":
+            record["prompt"] = data.decode("utf-8")
+        elif name == "metadata.json":
+            record["metadata"] = json.loads(data)
+        else:
+            record["files"][name] = base64.b64encode(data).decode("ascii")
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {"status": "ok", **self.server.service.stats()})
+
+    def do_POST(self) -> None:
+        if self.path != "/tasks":
+            self._send_json(404, {"error": "not found"})
+            return
+        service: TaskService = self.server.service
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            fmt = request.get("format", "jsonl")
+            if fmt not in ("jsonl", "tar"):
+                raise ValueError(f"format must be 'jsonl' or 'tar', got {fmt!r}")
+            results = service.stream(
+                seed=int(request.get("seed", 0)),
+                start=int(request.get("start", 0)),
+                stop=int(request["stop"]),
+                options=request.get("options", {}),
+                png_mode=request.get("png_mode", "RGB"),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-tar" if fmt == "tar" else "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        out = _ChunkedWriter(self.wfile)
+        try:
+            if fmt == "tar":
+                with tarfile.open(fileobj=out, mode="w|") as tar:
+                    for task_id, files in results:
+                        for name, data in files.items():
+                            info = tarfile.TarInfo(f"{task_id}/{name}")
+                            info.size = len(data)
+                            tar.addfile(info, io.BytesIO(data))
+            else:
+                for task_id, files in results:
+                    out.write(_jsonl_record(task_id, files))
+            out.finish()
+        except Exception as e:
+            # Headers are already sent; dropping the connection signals the failure
+            self.log_error("Task generation failed: %r", e)
+            self.close_connection = True
+
+    def log_request(self, code: Any = "-", size: Any = "-") -> None:
+        # Keep per-request logging off the hot path; errors are still logged
+        pass
@@ -0,0 +1,175 @@
+"""
+Multi-node shard planning and manifest merging.
+
+A run of N tasks is split into K contiguous, disjoint index ranges. Shard i
+generates exactly the task IDs `{domain}_{index:08d}` for its range, each
+seeded from (random_seed, index) via generate_task_at(), so nodes need no
+coordination beyond agreeing on N, K and the seed:
+
+    python examples/generate.py --num-samples 100000 --seed 7 --num-shards 4 --shard-index 2 ...
+
+Each shard records its plan in `<output>/shard.json`. merge_shards() reads
+the shard outputs back, checks that they belong to the same plan, and writes
+one consolidated `manifest.jsonl` per domain plus `merge_report.json` listing
+missing indices, task IDs produced by more than one shard and duplicate
+scenes (same param_hash), within or across shards. Resolution variants
+(`<width>px/<domain>_task/`) are merged the same way into
+`<output_dir>/<width>px/<domain>_task/`.
+"""
+
+import json
+import os
+from pathlib import Path
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .layout import MANIFEST_FILE, iter_manifest, manifest_files, task_index
+
+
+SHARD_FILE = "shard.json"
+MERGE_REPORT_FILE = "merge_report.json"
+_PLAN_KEYS = ("num_samples", "num_shards", "seed")
+_VARIANT_DIR = re.compile(r"\d+px")
+
+
+def _domain_dirs(shard_dir: Path) -> Iterator[Tuple[str, Path]]:
+    """(name relative to the shard output, path) of every domain dir with a manifest, variants included."""
+    shard_dir = Path(shard_dir)
+    roots = [shard_dir] + sorted(
+        p for p in shard_dir.glob("*") if p.is_dir() and _VARIANT_DIR.fullmatch(p.name)
+    )
+    for root in roots:
+        for domain_dir in sorted(p for p in root.glob("*") if p.is_dir() and manifest_files(p)):
+            yield domain_dir.relative_to(shard_dir).as_posix(), domain_dir
+
+
+def shard_range(num_items: int, num_shards: int, shard_index: int) -> range:
+    """
+    Contiguous index range of one shard.
+
+    Ranges cover 0..num_items-1 without overlap; sizes differ by at most one
+    (the first num_items % num_shards shards get the extra item).
+    """
+    if num_shards < 1:
+        raise ValueError(f"num_shards must be >= 1, got {num_shards}")
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"shard_index must be in [0, {num_shards}), got {shard_index}")
+    base, extra = divmod(num_items, num_shards)
+    start = shard_index * base + min(shard_index, extra)
+    return range(start, start + base + (shard_index < extra))
+
+
+def write_shard_info(
+    output_dir: Path,
+    num_samples: int,
+    num_shards: int,
+    shard_index: int,
+    seed: Optional[int],
+) -> Path:
+    """Record a shard's plan in `<output_dir>/shard.json`."""
+    indices = shard_range(num_samples, num_shards, shard_index)
+    path = Path(output_dir) / SHARD_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "num_samples": num_samples,
+        "num_shards": num_shards,
+        "shard_index": shard_index,
+        "seed": seed,
+        "start": indices.start,
+        "stop": indices.stop,
+    }, indent=2))
+    return path
+
+
+def read_shard_info(output_dir: Path) -> Dict[str, Any]:
+    """Read `<output_dir>/shard.json`."""
+    return json.loads((Path(output_dir) / SHARD_FILE).read_text())
+
+
+def merge_shards(shard_dirs: Sequence[Path], output_dir: Path) -> Dict[str, Any]:
+    """
+    Merge per-shard manifests into one dataset index.
+
+    Every `<domain>_task/manifest.jsonl` found in the shard outputs (and in
+    their `<width>px/` variant directories) is combined into
+    `<output_dir>/<domain>_task/manifest.jsonl`, ordered by task index,
+    with paths rewritten relative to the merged domain directory (so
+    core.layout.iter_task_dirs() works on it without moving any data). Each
+    entry gains a `shard` field.
+
+    Args:
+        shard_dirs: Shard output directories (each containing shard.json)
+        output_dir: Where the merged manifests and merge_report.json go
+
+    Returns:
+        The merge report (also written to `<output_dir>/merge_report.json`)
+
+    Raises:
+        ValueError: If the shards were planned with different sample counts,
+            shard counts or seeds, or a shard index appears twice
+    """
+    output_dir = Path(output_dir)
+    infos = [read_shard_info(d) for d in shard_dirs]
+    for key in _PLAN_KEYS:
+        values = {info[key] for info in infos}
+        if len(values) > 1:
+            raise ValueError(f"Shards disagree on {key}: {sorted(values, key=str)}")
+    shard_indices = [info["shard_index"] for info in infos]
+    if len(set(shard_indices)) != len(shard_indices):
+        raise ValueError(f"Duplicate shard indices: {sorted(shard_indices)}")
+    plan = {key: infos[0][key] for key in _PLAN_KEYS} if infos else {}
+
+    # domain dir name -> entries from every shard
+    entries: Dict[str, List[Dict[str, Any]]] = {}
+    for shard_dir, info in zip(shard_dirs, infos):
+        for name, domain_dir in _domain_dirs(shard_dir):
+            merged_domain_dir = output_dir / name
+            seen = set()
+            for entry in iter_manifest(domain_dir):
+                # Re-runs append entries again; keep the first, as iter_task_dirs does
+                if entry["task_id"] in seen:
+                    continue
+                seen.add(entry["task_id"])
+                entry = dict(entry, shard=info["shard_index"])
+                entry["path"] = Path(
+                    os.path.relpath(domain_dir / entry["path"], merged_domain_dir)
+                ).as_posix()
+                entries.setdefault(name, []).append(entry)
+
+    report: Dict[str, Any] = {
+        **plan,
+        "shards": sorted(shard_indices),
+        "missing_shards": sorted(set(range(plan.get("num_shards", 0))) - set(shard_indices)),
+        "domains": {},
+    }
+    for name, domain_entries in sorted(entries.items()):
+        domain_entries.sort(key=lambda e: (task_index(e["task_id"]), e["shard"]))
+        by_task: Dict[str, List[int]] = {}
+        by_hash: Dict[str, List[str]] = {}
+        merged: List[Dict[str, Any]] = []
+        for entry in domain_entries:
+            shards = by_task.setdefault(entry["task_id"], [])
+            shards.append(entry["shard"])
+            if len(shards) > 1:
+                continue
+            merged.append(entry)
+            if "param_hash" in entry:
+                by_hash.setdefault(entry["param_hash"], []).append(entry["task_id"])
+
+        present = {task_index(e["task_id"]) for e in merged}
+        merged_domain_dir = output_dir / name
+        merged_domain_dir.mkdir(parents=True, exist_ok=True)
+        with open(merged_domain_dir / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            for entry in merged:
+                f.write(json.dumps(entry) + "\n")
+
+        report["domains"][name] = {
+            "tasks": len(merged),
+            "missing_indices": sorted(set(range(plan.get("num_samples", 0))) - present),
+            "overlapping_tasks": {t: s for t, s in by_task.items() if len(s) > 1},
+            "duplicate_scenes": [ids for ids in by_hash.values() if len(ids) > 1],
+        }
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / MERGE_REPORT_FILE).write_text(json.dumps(report, indent=2))
+    return report
@@ -0,0 +1,247 @@
+"""
+Render/encode pipeline over a shared-memory frame ring.
+
+Renderer processes generate tasks, write their images/metadata through
+OutputWriter and copy the animation frames into a free slot of a
+`multiprocessing.shared_memory` ring. Encoder processes read frames straight
+out of that slot into VideoGenerator and hand the slot back. Only slot indices
+(plus a small frame map) cross process boundaries, never pixels.
+
+Flow control comes from the free-slot queue: renderers block when every slot
+is waiting to be encoded, so render and encode worker counts can be scaled
+independently without unbounded memory growth.
+"""
+
+import multiprocessing
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from .base_generator import BaseGenerator, GenerationConfig, config_with
+from .image_utils import ImageRenderer
+from .metadata_builder import get_git_info
+from .output_writer import OutputWriter
+
+
+STATS_INTERVAL = 1.0  # Seconds between renderer progress updates
+
+
+def _scalar_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """run_stats without the (growing) per-task lists, for progress updates."""
+    return {k: v for k, v in stats.items() if not isinstance(v, list)}
+
+
+def _render_worker(
+    worker: int,
+    generator_cls: Type[BaseGenerator],
+    config: GenerationConfig,
+    writer: OutputWriter,
+    indices: Sequence[int],
+    shm_name: str,
+    slot_bytes: int,
+    frame_bytes: int,
+    max_frames: int,
+    free_slots,
+    to_encode,
+    events,
+) -> None:
+    shm = None
+    try:
+        # Children share the parent's resource tracker; the parent unlinks
+        shm = shared_memory.SharedMemory(name=shm_name)
+        config = config_with(config, generate_videos=False, keep_frames=True)
+        generator = generator_cls(config)
+        last_stats = time.perf_counter()
+        for index in indices:
+            pair = generator.generate_task_at(index)
+            if time.perf_counter() - last_stats >= STATS_INTERVAL:
+                last_stats = time.perf_counter()
+                events.put(("stats", (worker, _scalar_stats(generator.run_stats))))
+            frames = pair.frames
+            pair.frames = None
+            task_dir = writer.write_task_pair(pair)
+            if not frames:
+                events.put(("encoded", pair.task_id))
+                continue
+
+            # Hold frames repeat the same image; copy those once
+            unique = []
+            frame_map = []
+            for k, frame in enumerate(frames):
+                if k == 0 or frame is not frames[k - 1]:
+                    unique.append(frame)
+                frame_map.append(len(unique) - 1)
+            if len(unique) > max_frames:
+                raise ValueError(f"{pair.task_id} has {len(unique)} frames; ring slots hold {max_frames}")
+
+            slot = free_slots.get()
+            base = slot * slot_bytes
+            for k, frame in enumerate(unique):
+                start = base + k * frame_bytes
+                shm.buf[start:start + frame_bytes] = ImageRenderer.ensure_rgb(frame).tobytes()
+            to_encode.put((slot, len(unique), frame_map, pair.task_id, str(task_dir / "ground_truth.mp4")))
+        # Flush queued work before reporting, so encoder sentinels arrive after it
+        to_encode.close()
+        to_encode.join_thread()
+        events.put(("renderer_done", (worker, generator.run_stats)))
+    except Exception:
+        events.put(("error", traceback.format_exc()))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+def _encode_worker(
+    shm_name: str,
+    slot_bytes: int,
+    image_size: Tuple[int, int],
+    fps: int,
+    free_slots,
+    to_encode,
+    events,
+) -> None:
+    shm = None
+    try:
+        import numpy as np
+        from .video_utils import VideoGenerator
+
+        # Children share the parent's resource tracker; the parent unlinks
+        shm = shared_memory.SharedMemory(name=shm_name)
+        video_generator = VideoGenerator(fps=fps, output_format="mp4")
+        width, height = image_size
+        while True:
+            item = to_encode.get()
+            if item is None:
+                break
+            slot, num_unique, frame_map, task_id, video_path = item
+            slot_frames = np.ndarray(
+                (num_unique, height, width, 3), dtype=np.uint8,
+                buffer=shm.buf, offset=slot * slot_bytes,
+            )
+            video_generator.create_video_from_arrays(
+                (slot_frames[i] for i in frame_map), video_path, image_size
+            )
+            del slot_frames
+            free_slots.put(slot)
+            events.put(("encoded", task_id))
+    except Exception:
+        events.put(("error", traceback.format_exc()))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+def run_render_encode_pipeline(
+    generator_cls: Type[BaseGenerator],
+    config: GenerationConfig,
+    writer: OutputWriter,
+    indices: Sequence[int],
+    max_frames: int,
+    fps: int,
+    num_renderers: int = 2,
+    num_encoders: int = 2,
+    ring_slots: Optional[int] = None,
+    on_task_done: Optional[Callable[[str], None]] = None,
+    on_worker_stats: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_worker_progress: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    mp_context: Optional[str] = None,
+) -> int:
+    """
+    Generate tasks at `indices` with separate render and encode processes.
+
+    Args:
+        generator_cls: BaseGenerator subclass (must honor keep_frames)
+        config: Generator config; videos are encoded by the pipeline instead
+        writer: OutputWriter for images, prompts and metadata
+        indices: Task indices, generated with generate_task_at()
+        max_frames: Upper bound on distinct frames per task (slot capacity)
+        fps: Video frame rate
+        num_renderers: Renderer processes
+        num_encoders: Encoder processes
+        ring_slots: Task slots in the ring (default: renderers + encoders)
+        on_task_done: Called with each task_id once it is fully written
+        on_worker_stats: Called with each renderer's generator.run_stats when it finishes
+        on_worker_progress: Called with (renderer index, run_stats counters) about
+            every STATS_INTERVAL seconds and once more when the renderer finishes
+        mp_context: multiprocessing start method (default: platform default)
+
+    Returns:
+        Number of tasks written
+    """
+    if config.git_info is None:
+        config = config_with(config, git_info=get_git_info())
+    width, height = config.image_size
+    frame_bytes = width * height * 3
+    slot_bytes = frame_bytes * max_frames
+    ring_slots = ring_slots or (num_renderers + num_encoders)
+    ctx = multiprocessing.get_context(mp_context)
+
+    shm = shared_memory.SharedMemory(create=True, size=slot_bytes * ring_slots)
+    free_slots = ctx.Queue()
+    for slot in range(ring_slots):
+        free_slots.put(slot)
+    to_encode = ctx.Queue()
+    events = ctx.Queue()
+
+    renderers: List[Any] = [
+        ctx.Process(
+            target=_render_worker,
+            args=(r, generator_cls, config, writer, list(indices[r::num_renderers]), shm.name,
+                  slot_bytes, frame_bytes, max_frames, free_slots, to_encode, events),
+            daemon=True,
+        )
+        for r in range(num_renderers)
+    ]
+    encoders: List[Any] = [
+        ctx.Process(
+            target=_encode_worker,
+            args=(shm.name, slot_bytes, (width, height), fps, free_slots, to_encode, events),
+            daemon=True,
+        )
+        for _ in range(num_encoders)
+    ]
+
+    done = 0
+    try:
+        for p in renderers + encoders:
+            p.start()
+        renderers_left = num_renderers
+        while done < len(indices) or renderers_left:
+            try:
+                kind, payload = events.get(timeout=1.0)
+            except queue.Empty:
+                crashed = [p for p in renderers + encoders if p.exitcode not in (None, 0)]
+                if crashed:
+                    raise RuntimeError(f"Pipeline worker exited with code {crashed[0].exitcode}")
+                continue
+            if kind == "error":
+                raise RuntimeError(f"Pipeline worker failed:\n{payload}")
+            if kind == "renderer_done":
+                renderers_left -= 1
+                worker, stats = payload
+                if on_worker_stats is not None:
+                    on_worker_stats(stats)
+                if on_worker_progress is not None:
+                    on_worker_progress(worker, _scalar_stats(stats))
+                if not renderers_left:
+                    for _ in encoders:
+                        to_encode.put(None)
+            elif kind == "stats":
+                if on_worker_progress is not None:
+                    on_worker_progress(*payload)
+            elif kind == "encoded":
+                done += 1
+                if on_task_done is not None:
+                    on_task_done(payload)
+        for p in renderers + encoders:
+            p.join()
+    finally:
+        for p in renderers + encoders:
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        shm.close()
+        shm.unlink()
+    return done
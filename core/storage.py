@@ -0,0 +1,321 @@
+"""
+Storage backends for task output.
+
+OutputWriter writes every file through a StorageBackend, addressed by a
+POSIX key relative to the output root (`<domain>_task/<task_id>/prompt.txt`),
+so a dataset can go straight to its final location instead of being written
+locally and uploaded file by file afterwards:
+
+    LocalStorage("data/questions")                       plain files (default)
+    S3Storage("s3://bucket/datasets/run1",               any S3-compatible store,
+              endpoint_url="http://localhost:9000")      e.g. a local MinIO
+
+    storage = open_storage("s3://bucket/datasets/run1")
+    writer = OutputWriter(Path("data/questions"), storage=storage)
+    ...
+    writer.close()    # waits for pending uploads; raises the first failure
+
+S3Storage uploads in the background: small files with one PUT each, files
+above `multipart_threshold` (videos) as multipart uploads whose parts go up
+`multipart_concurrency` at a time, at most `max_pending` uploads queued so a
+fast generator can't queue unbounded data. Object stores have no multi-object
+PUT, so small files are pipelined over pooled keep-alive connections rather
+than batched; requests are retried with backoff by botocore.
+examples/check_storage.py exercises this against a real MinIO. Objects can't be appended to, so appends (manifest.jsonl)
+are buffered and uploaded as numbered segments (manifest-00000.jsonl, ...,
+see segment_key) whenever `append_segment_bytes` accumulate and on flush():
+memory stays bounded and a crashed run keeps all but its last segment.
+boto3 is only imported when an S3Storage is created.
+"""
+
+import io
+import os
+import posixpath
+import re
+import shutil
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Union
+
+from .memory import MB
+
+
+def segment_key(key: str, n: int) -> str:
+    """Key of the n-th appended segment of `key`: manifest.jsonl -> manifest-00003.jsonl."""
+    root, ext = posixpath.splitext(key)
+    return f"{root}-{n:05d}{ext}"
+
+
+class StorageBackend(ABC):
+    """Write-mostly key/value file storage rooted at some location."""
+
+    @abstractmethod
+    def write_bytes(self, key: str, data: bytes, atomic: bool = False) -> None:
+        """Store `data` under `key` (atomic: readers never see a partial file)."""
+
+    @abstractmethod
+    def put_file(self, key: str, path: Path, move: bool = False) -> None:
+        """Store an existing local file under `key` (move: the source may be deleted)."""
+
+    @abstractmethod
+    def append_text(self, key: str, text: str) -> None:
+        """Append text to `key`, creating it if needed (object stores write numbered segments of it, see segment_key)."""
+
+    @abstractmethod
+    def read_text(self, key: str) -> Optional[str]:
+        """Contents of `key`, or None if it doesn't exist."""
+
+    def write_text(self, key: str, text: str, atomic: bool = False) -> None:
+        self.write_bytes(key, text.encode("utf-8"), atomic=atomic)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path of `key` if this backend stores plain local files."""
+        return None
+
+    def child(self, prefix: str) -> "StorageBackend":
+        """View of this storage with every key under `prefix/`."""
+        return _PrefixedStorage(self, prefix)
+
+    def flush(self) -> None:
+        """Finish pending writes."""
+
+    def close(self) -> None:
+        """Finish pending writes and release resources."""
+        self.flush()
+
+
+class _PrefixedStorage(StorageBackend):
+    """Keys under a prefix of a parent backend, which owns pending writes."""
+
+    def __init__(self, parent: StorageBackend, prefix: str):
+        self.parent = parent
+        self.prefix = prefix.strip("/") + "/"
+
+    def write_bytes(self, key: str, data: bytes, atomic: bool = False) -> None:
+        self.parent.write_bytes(self.prefix + key, data, atomic=atomic)
+
+    def put_file(self, key: str, path: Path, move: bool = False) -> None:
+        self.parent.put_file(self.prefix + key, path, move=move)
+
+    def append_text(self, key: str, text: str) -> None:
+        self.parent.append_text(self.prefix + key, text)
+
+    def read_text(self, key: str) -> Optional[str]:
+        return self.parent.read_text(self.prefix + key)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.parent.local_path(self.prefix + key)
+
+    def child(self, prefix: str) -> StorageBackend:
+        return _PrefixedStorage(self.parent, self.prefix + prefix)
+
+    def flush(self) -> None:
+        self.parent.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class LocalStorage(StorageBackend):
+    """Plain files under a root directory."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+
+    def _prepare(self, key: str) -> Path:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def write_bytes(self, key: str, data: bytes, atomic: bool = False) -> None:
+        path = self._prepare(key)
+        if not atomic:
+            path.write_bytes(data)
+            return
+        # Unique per process, so concurrent writers never share a temp file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def put_file(self, key: str, path: Path, move: bool = False) -> None:
+        dst = self._prepare(key)
+        src = Path(path)
+        # If the file was already written in place, don't copy it onto itself
+        try:
+            if src.resolve() == dst.resolve():
+                return
+        except OSError:
+            pass
+        if move:
+            shutil.move(src, dst)
+        else:
+            shutil.copy(src, dst)
+
+    def append_text(self, key: str, text: str) -> None:
+        with open(self._prepare(key), "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def read_text(self, key: str) -> Optional[str]:
+        path = self.root / key
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+
+class S3Storage(StorageBackend):
+    """Objects under `s3://bucket/prefix/`, uploaded concurrently in the background."""
+
+    def __init__(
+        self,
+        url: str,
+        endpoint_url: Optional[str] = None,
+        max_concurrency: int = 16,
+        max_pending: int = 256,
+        multipart_threshold: int = 8 * MB,
+        multipart_chunksize: int = 8 * MB,
+        multipart_concurrency: int = 4,
+        max_attempts: int = 5,
+        append_segment_bytes: int = 1 * MB,
+        client=None,
+    ):
+        """
+        Args:
+            url: `s3://bucket` or `s3://bucket/prefix`
+            endpoint_url: S3-compatible endpoint (e.g. MinIO); None = AWS
+            max_concurrency: Upload threads, and pooled connections
+            max_pending: Uploads queued before writers wait for the oldest
+            multipart_threshold: Files at least this large use multipart uploads
+            multipart_chunksize: Multipart part size
+            multipart_concurrency: Parts of one multipart upload sent at once
+            max_attempts: Attempts per request, with exponential backoff
+            append_segment_bytes: Appended text buffered per key before it is
+                uploaded as the next segment
+            client: Preconfigured boto3 S3 client (endpoint/retry args unused)
+
+        Credentials come from the usual boto3 sources (environment variables,
+        ~/.aws, instance roles).
+        """
+        if not url.startswith("s3://"):
+            raise ValueError(f"S3 URL must start with s3://, got {url!r}")
+        bucket, _, prefix = url[len("s3://"):].partition("/")
+        if not bucket:
+            raise ValueError(f"S3 URL has no bucket: {url!r}")
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+        except ImportError:
+            raise ImportError("boto3 is required for S3 storage (pip install boto3)") from None
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.multipart_threshold = multipart_threshold
+        self.max_pending = max_pending
+        self.append_segment_bytes = append_segment_bytes
+        if client is None:
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                config=Config(
+                    # Every upload thread may be sending a multipart upload's parts
+                    max_pool_connections=max_concurrency * multipart_concurrency,
+                    retries={"max_attempts": max_attempts, "mode": "standard"},
+                ),
+            )
+        self.client = client
+        # Parts of one file upload in parallel, bounded so big files can't take every connection
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=multipart_concurrency,
+            use_threads=multipart_concurrency > 1,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="s3-upload")
+        self._pending: Deque = deque()
+        self._appends: Dict[str, List[str]] = {}
+        self._append_bytes: Dict[str, int] = {}
+        self._next_segment: Dict[str, int] = {}
+
+    def _submit(self, fn, *args) -> None:
+        self._pending.append(self._executor.submit(fn, *args))
+        # Backpressure; also surfaces upload failures early
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft().result()
+
+    def _put(self, key: str, data: bytes) -> None:
+        if len(data) < self.multipart_threshold:
+            self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+        else:
+            self.client.upload_fileobj(
+                io.BytesIO(data), self.bucket, self.prefix + key, Config=self.transfer_config
+            )
+
+    def _upload_file(self, key: str, path: Path, move: bool) -> None:
+        self.client.upload_file(str(path), self.bucket, self.prefix + key, Config=self.transfer_config)
+        if move:
+            Path(path).unlink()
+
+    def write_bytes(self, key: str, data: bytes, atomic: bool = False) -> None:
+        # Single objects are always replaced atomically
+        self._submit(self._put, key, bytes(data))
+
+    def put_file(self, key: str, path: Path, move: bool = False) -> None:
+        self._submit(self._upload_file, key, Path(path), move)
+
+    def _existing_segments(self, key: str) -> int:
+        """Number of the first segment of `key` not written yet (re-runs continue after earlier ones)."""
+        root, ext = posixpath.splitext(self.prefix + key)
+        pattern = re.compile(re.escape(root) + r"-(\d+)" + re.escape(ext) + "$")
+        last = -1
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=root + "-"):
+            for obj in page.get("Contents", []):
+                match = pattern.match(obj["Key"])
+                if match:
+                    last = max(last, int(match.group(1)))
+        return last + 1
+
+    def append_text(self, key: str, text: str) -> None:
+        if key not in self._next_segment:
+            self._next_segment[key] = self._existing_segments(key)
+        self._appends.setdefault(key, []).append(text)
+        self._append_bytes[key] = self._append_bytes.get(key, 0) + len(text)
+        if self._append_bytes[key] >= self.append_segment_bytes:
+            self._flush_appends(key)
+
+    def _flush_appends(self, key: str) -> None:
+        """Upload the text appended to `key` since the last segment as the next one."""
+        parts = self._appends.pop(key, None)
+        self._append_bytes[key] = 0
+        if parts:
+            self._submit(self._put, segment_key(key, self._next_segment[key]), "".join(parts).encode("utf-8"))
+            self._next_segment[key] += 1
+
+    def read_text(self, key: str) -> Optional[str]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read().decode("utf-8")
+
+    def flush(self) -> None:
+        for key in list(self._appends):
+            self._flush_appends(key)
+        while self._pending:
+            self._pending.popleft().result()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+def open_storage(url: Union[str, Path], **s3_options) -> StorageBackend:
+    """S3Storage for `s3://` URLs, otherwise LocalStorage for a directory path."""
+    if str(url).startswith("s3://"):
+        return S3Storage(str(url), **s3_options)
+    return LocalStorage(url)
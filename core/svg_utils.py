@@ -0,0 +1,100 @@
+"""
+Minimal SVG building helpers.
+
+Generators whose scenes are plain vector geometry can emit SVG documents
+straight from their scene data, without rasterizing anything. Helpers return
+markup strings; svg_document() wraps them into a standalone file.
+"""
+
+from typing import Iterable, Optional, Sequence, Tuple
+
+
+Color = Tuple[int, int, int]
+
+# cubic-bezier control points of smoothstep 3t^2 - 2t^3 (exact with x linear in t)
+SMOOTHSTEP_SPLINE = "0.333333 0 0.666667 1"
+
+
+def svg_number(value: float, digits: int = 3) -> str:
+    """Format a number compactly (at most `digits` decimals, no trailing zeros)."""
+    text = f"{value:.{digits}f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def svg_color(color: Sequence[int]) -> str:
+    """RGB tuple as a #rrggbb color."""
+    r, g, b = (int(c) for c in color[:3])
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def svg_circle(
+    cx: float,
+    cy: float,
+    r: float,
+    fill: Color,
+    stroke: Optional[Color] = None,
+    stroke_width: float = 0,
+    children: Iterable[str] = (),
+) -> str:
+    """A <circle> element, optionally containing animation elements."""
+    attrs = f'cx="{svg_number(cx)}" cy="{svg_number(cy)}" r="{svg_number(r)}" fill="{svg_color(fill)}"'
+    if stroke is not None and stroke_width > 0:
+        attrs += f' stroke="{svg_color(stroke)}" stroke-width="{svg_number(stroke_width)}"'
+    inner = "".join(children)
+    if not inner:
+        return f"<circle {attrs}/>"
+    return f"<circle {attrs}>{inner}</circle>"
+
+
+def svg_animate(
+    attribute: str,
+    values: Sequence[float],
+    key_times: Sequence[float],
+    duration: float,
+    key_splines: Optional[Sequence[str]] = None,
+    repeat: bool = True,
+) -> str:
+    """
+    A SMIL <animate> element interpolating `attribute` through keyframes.
+
+    Args:
+        attribute: Attribute to animate (e.g. "cx")
+        values: Value at each key time
+        key_times: Key times as fractions of the duration, from 0 to 1
+        duration: Animation length in seconds
+        key_splines: One cubic-bezier spline per interval ("x1 y1 x2 y2");
+            linear interpolation if omitted
+        repeat: Loop indefinitely instead of freezing on the last value
+    """
+    if len(values) != len(key_times):
+        raise ValueError("values and key_times must have the same length")
+    attrs = (
+        f'attributeName="{attribute}" dur="{svg_number(duration)}s" '
+        f'values="{";".join(svg_number(v) for v in values)}" '
+        f'keyTimes="{";".join(svg_number(t, 6) for t in key_times)}"'
+    )
+    if key_splines is not None:
+        if len(key_splines) != len(values) - 1:
+            raise ValueError("key_splines needs one spline per keyframe interval")
+        attrs += f' calcMode="spline" keySplines="{";".join(key_splines)}"'
+    attrs += ' repeatCount="indefinite"' if repeat else ' fill="freeze"'
+    return f"<animate {attrs}/>"
+
+
+def svg_document(
+    size: Tuple[int, int],
+    elements: Iterable[str],
+    background: Optional[Color] = (255, 255, 255),
+) -> str:
+    """A standalone SVG document of `size` pixels holding `elements`."""
+    width, height = size
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">\n',
+    ]
+    if background is not None:
+        parts.append(f'<rect width="{width}" height="{height}" fill="{svg_color(background)}"/>\n')
+    parts.extend(f"{element}\n" for element in elements)
+    parts.append("</svg>\n")
+    return "".join(parts)
@@ -0,0 +1,259 @@
+"""
+In-memory task streaming for online training.
+
+TaskStream runs generators in worker processes that prefetch tasks into
+bounded queues and yields decoded arrays, without anything touching disk:
+
+    stream = TaskStream(TaskGenerator, TaskConfig(num_samples=0), num_workers=4, seed=7)
+    for sample in stream:           # infinite
+        sample.first_frame          # (H, W, 3) uint8 numpy array
+        ...
+
+Worker w of epoch e seeds its generator with derive_seed(seed, w, e) and
+produces task indices w, w + num_workers, w + 2 * num_workers, ...; the consumer
+reads the workers round-robin, so the stream is deterministic per
+(seed, epoch, num_workers). Each worker deduplicates scenes within windows of
+`dedup_window` tasks (reset_dedup() in between), so an endless stream keeps
+bounded dedup state and never exhausts the scene space. Git provenance is
+resolved once in the parent and handed to workers via config.git_info. With a memory_budget, prefetch and then
+num_workers are lowered until the estimated footprint fits (see
+core.memory.plan_stream); the stream then follows the reduced num_workers.
+"""
+
+import multiprocessing
+import queue
+import time
+import traceback
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from .base_generator import BaseGenerator, GenerationConfig, config_with, derive_seed
+from .image_utils import ImageRenderer
+from .memory import DEDUP_TASK_BYTES, plan_stream
+from .metadata_builder import get_git_info
+from .schemas import TaskPair, TaskSample
+
+
+# Encoded image: (width, height, raw RGB bytes)
+_Encoded = Tuple[int, int, bytes]
+
+
+def _encode_image(image) -> _Encoded:
+    rgb = ImageRenderer.ensure_rgb(image)
+    return rgb.size[0], rgb.size[1], rgb.tobytes()
+
+
+def _encode_pair(pair: TaskPair) -> Dict[str, Any]:
+    """Turn a TaskPair into plain picklable data (raw RGB bytes)."""
+    frames = None
+    if pair.frames:
+        # Hold frames repeat the same object; send those once
+        unique: List[_Encoded] = []
+        frame_map: List[int] = []
+        for k, frame in enumerate(pair.frames):
+            if k == 0 or frame is not pair.frames[k - 1]:
+                unique.append(_encode_image(frame))
+            frame_map.append(len(unique) - 1)
+        frames = (unique, frame_map)
+    return {
+        "task_id": pair.task_id,
+        "domain": pair.domain,
+        "prompt": pair.prompt,
+        "first_frame": _encode_image(pair.first_image),
+        "final_frame": _encode_image(pair.final_image) if pair.final_image is not None else None,
+        "frames": frames,
+        "metadata": pair.metadata,
+    }
+
+
+def _decode_image(encoded: _Encoded, as_numpy: bool):
+    width, height, data = encoded
+    if as_numpy:
+        import numpy as np
+
+        return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+    from PIL import Image
+
+    return Image.frombytes("RGB", (width, height), data)
+
+
+def _decode_sample(item: Dict[str, Any], as_numpy: bool) -> TaskSample:
+    frames = None
+    if item["frames"] is not None:
+        unique, frame_map = item["frames"]
+        decoded = [_decode_image(e, as_numpy) for e in unique]
+        frames = [decoded[i] for i in frame_map]
+    return TaskSample(
+        task_id=item["task_id"],
+        domain=item["domain"],
+        prompt=item["prompt"],
+        first_frame=_decode_image(item["first_frame"], as_numpy),
+        final_frame=_decode_image(item["final_frame"], as_numpy) if item["final_frame"] else None,
+        frames=frames,
+        metadata=item["metadata"],
+    )
+
+
+def _stream_worker(
+    generator_cls: Type[BaseGenerator],
+    config: GenerationConfig,
+    worker: int,
+    num_workers: int,
+    seed: int,
+    epoch: int,
+    include_frames: bool,
+    dedup_window: int,
+    out: "multiprocessing.Queue",
+    stop,
+) -> None:
+    """Generate tasks forever into `out` until `stop` is set."""
+    try:
+        config = config_with(
+            config,
+            random_seed=derive_seed(seed, worker, epoch),
+            generate_videos=False,
+            keep_frames=include_frames,
+        )
+        generator = generator_cls(config)
+
+        index = worker
+        produced = 0
+        while not stop.is_set():
+            if produced % dedup_window == 0:
+                generator.reset_dedup()
+            produced += 1
+            task_id = f"{config.domain}_{index:08d}"
+            item = ("task", _encode_pair(generator.generate_task_pair(task_id)))
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            index += num_workers
+    except Exception:
+        out.put(("error", traceback.format_exc()))
+
+
+class TaskStream:
+    """Infinite, deterministic stream of decoded tasks from prefetching worker processes."""
+
+    def __init__(
+        self,
+        generator_cls: Type[BaseGenerator],
+        config: GenerationConfig,
+        num_workers: int = 2,
+        prefetch: int = 4,
+        seed: Optional[int] = None,
+        epoch: int = 0,
+        include_frames: bool = False,
+        as_numpy: bool = True,
+        mp_context: Optional[str] = None,
+        dedup_window: int = 10_000,
+        memory_budget: Optional[int] = None,
+        max_frames: int = 0,
+    ):
+        """
+        Args:
+            generator_cls: BaseGenerator subclass, constructed once per worker
+            config: Base config; each worker overrides random_seed (and disables
+                video files, keeping frames in memory if include_frames)
+            num_workers: Worker processes
+            prefetch: Tasks each worker may have queued ahead of the consumer
+            seed: Stream seed (defaults to config.random_seed, else 0)
+            epoch: Epoch number mixed into every worker seed
+            include_frames: Also yield the animation frames
+            as_numpy: Yield numpy arrays (zero-copy over the received bytes)
+                instead of PIL Images
+            mp_context: multiprocessing start method (default: platform default)
+            dedup_window: Tasks per worker after which its dedup state is reset
+            memory_budget: Bytes the stream may use; lowers prefetch, then
+                num_workers, to fit (raises ValueError if even one of each won't)
+            max_frames: Animation frames per task, for the memory_budget
+                estimate with include_frames
+        """
+        if num_workers < 1 or prefetch < 1 or dedup_window < 1:
+            raise ValueError("num_workers, prefetch and dedup_window must be >= 1")
+        if memory_budget is not None:
+            width, height = config.image_size
+            task_bytes = width * height * 3 * (2 + (max_frames if include_frames else 0))
+            num_workers, prefetch = plan_stream(
+                memory_budget, task_bytes, num_workers, prefetch,
+                dedup_bytes=dedup_window * DEDUP_TASK_BYTES,
+            )
+        if config.git_info is None:
+            # Resolve provenance once here so workers never shell out to git
+            config = config_with(config, git_info=get_git_info())
+        self.generator_cls = generator_cls
+        self.config = config
+        self.num_workers = num_workers
+        self.prefetch = prefetch
+        self.seed = seed if seed is not None else (config.random_seed or 0)
+        self.epoch = epoch
+        self.include_frames = include_frames
+        self.dedup_window = dedup_window
+        self.as_numpy = as_numpy
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._workers: List[Any] = []
+        self._queues: List[Any] = []
+        self._stop = None
+
+    def set_epoch(self, epoch: int) -> None:
+        """Switch epoch; workers restart with new seeds on the next iteration."""
+        self.close()
+        self.epoch = epoch
+
+    def _start(self) -> None:
+        self._stop = self._ctx.Event()
+        for worker in range(self.num_workers):
+            q = self._ctx.Queue(maxsize=self.prefetch)
+            p = self._ctx.Process(
+                target=_stream_worker,
+                args=(
+                    self.generator_cls, self.config, worker, self.num_workers,
+                    self.seed, self.epoch, self.include_frames, self.dedup_window, q, self._stop,
+                ),
+                daemon=True,
+            )
+            p.start()
+            self._queues.append(q)
+            self._workers.append(p)
+
+    def __iter__(self) -> Iterator[TaskSample]:
+        if not self._workers:
+            self._start()
+        while True:
+            for q in self._queues:
+                kind, payload = q.get()
+                if kind == "error":
+                    self.close()
+                    raise RuntimeError(f"TaskStream worker failed:\n{payload}")
+                yield _decode_sample(payload, self.as_numpy)
+
+    def close(self) -> None:
+        """Stop and join all workers, discarding prefetched tasks."""
+        if self._stop is not None:
+            self._stop.set()
+        # Workers only exit once their queued items are flushed, so keep draining
+        deadline = time.monotonic() + 10
+        while any(p.is_alive() for p in self._workers) and time.monotonic() < deadline:
+            for q in self._queues:
+                try:
+                    while True:
+                        q.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+        for p in self._workers:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        for q in self._queues:
+            q.close()
+        self._workers = []
+        self._queues = []
+        self._stop = None
+
+    def __enter__(self) -> "TaskStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
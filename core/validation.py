@@ -0,0 +1,246 @@
+"""
+Parallel dataset validation.
+
+validate_dataset() walks a `<domain>_task/` directory (manifest or layout,
+see core.layout.iter_task_dirs) and runs a per-task check in a process pool,
+in chunks so millions of tasks cost only a few thousand round trips. A check
+is any picklable callable returning a list of error strings for one task
+directory; validate_task_dir() covers the generic files:
+
+    - first_frame.png / final_frame.png decode and have the expected size
+    - ground_truth.mp4 (if present or required) opens, decodes and has the
+      expected frame count and fps
+    - metadata.json passes metadata_builder.verify_metadata (compact metadata
+      together with the run.json of its `<domain>_task/` directory)
+
+Task generators add their own checks (e.g. geometry) on top.
+"""
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from .layout import iter_task_dirs
+from .metadata_builder import RUN_HEADER_FILE, is_compact_metadata, verify_metadata
+
+
+VALIDATION_REPORT_FILE = "validation_report.json"
+
+TaskCheck = Callable[[Path], List[str]]
+
+
+def check_png(path: Path, image_size: Tuple[int, int]) -> Optional[str]:
+    """Error message if the PNG is missing, corrupt or the wrong size."""
+    if not path.exists():
+        return f"missing {path.name}"
+    try:
+        with Image.open(path) as image:
+            size = image.size
+            image.load()
+    except Exception as e:
+        return f"{path.name} does not decode: {e}"
+    if size != tuple(image_size):
+        return f"{path.name} is {size[0]}x{size[1]}, expected {image_size[0]}x{image_size[1]}"
+    return None
+
+
+def check_video(path: Path, num_frames: int, fps: int, frame_size: Tuple[int, int]) -> Optional[str]:
+    """Error message if the video does not open/decode or has the wrong frame count, fps or size."""
+    try:
+        import cv2
+    except ImportError:
+        return "opencv-python is required to validate videos"
+    capture = cv2.VideoCapture(str(path))
+    try:
+        if not capture.isOpened():
+            return f"{path.name} does not open"
+        ok, _ = capture.read()
+        if not ok:
+            return f"{path.name} has no decodable frames"
+        count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        actual_fps = capture.get(cv2.CAP_PROP_FPS)
+        size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    finally:
+        capture.release()
+    if count != num_frames:
+        return f"{path.name} has {count} frames, expected {num_frames}"
+    if abs(actual_fps - fps) > 0.01:
+        return f"{path.name} is {actual_fps:g} fps, expected {fps}"
+    if size != tuple(frame_size):
+        return f"{path.name} is {size[0]}x{size[1]}, expected {frame_size[0]}x{frame_size[1]}"
+    return None
+
+
+@lru_cache(maxsize=64)
+def _read_run_header(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def find_run_header(task_dir: Path) -> Optional[Path]:
+    """The run.json of the `<domain>_task/` directory above a task (any layout)."""
+    # Flat tasks sit directly in the domain directory, fanned-out ones two levels deeper
+    for parent in Path(task_dir).parents[:3]:
+        if (parent / RUN_HEADER_FILE).exists():
+            return parent / RUN_HEADER_FILE
+    return None
+
+
+def load_metadata(task_dir: Path, errors: List[str]) -> Optional[Dict[str, Any]]:
+    """Read and verify metadata.json (and the run header of compact metadata),
+    appending problems to errors."""
+    path = task_dir / "metadata.json"
+    if not path.exists():
+        errors.append("missing metadata.json")
+        return None
+    try:
+        metadata = json.loads(path.read_text())
+    except ValueError as e:
+        errors.append(f"metadata.json is not valid JSON: {e}")
+        return None
+    run_header = None
+    if isinstance(metadata, dict) and is_compact_metadata(metadata):
+        header_path = find_run_header(task_dir)
+        if header_path is None:
+            errors.append(f"compact metadata.json but no {RUN_HEADER_FILE} above the task")
+            return metadata
+        run_header = _read_run_header(header_path)
+        if run_header is None:
+            errors.append(f"{header_path} is not valid JSON")
+            return metadata
+    if not verify_metadata(metadata, run_header):
+        errors.append("metadata.json fails verify_metadata")
+    elif metadata["task_id"] != task_dir.name:
+        errors.append(f"metadata.json task_id {metadata['task_id']!r} does not match the directory")
+    return metadata
+
+
+def validate_task_dir(
+    task_dir: Path,
+    image_size: Tuple[int, int],
+    num_frames: Optional[int] = None,
+    fps: Optional[int] = None,
+    require_video: bool = False,
+) -> List[str]:
+    """
+    Generic checks of one task directory.
+
+    Args:
+        task_dir: Task directory
+        image_size: Expected (width, height) of images and video frames
+        num_frames: Expected video frame count (None = don't check videos)
+        fps: Expected video frame rate
+        require_video: Report a missing ground_truth.mp4 as an error
+
+    Returns:
+        Error messages (empty if the task is valid)
+    """
+    task_dir = Path(task_dir)
+    errors: List[str] = []
+    for name in ("first_frame.png", "final_frame.png"):
+        error = check_png(task_dir / name, image_size)
+        if error:
+            errors.append(error)
+    if not (task_dir / "prompt.txt").exists():
+        errors.append("missing prompt.txt")
+    video = task_dir / "ground_truth.mp4"
+    if video.exists():
+        if num_frames is not None:
+            error = check_video(video, num_frames, fps, image_size)
+            if error:
+                errors.append(error)
+    elif require_video:
+        errors.append("missing ground_truth.mp4")
+    load_metadata(task_dir, errors)
+    return errors
+
+
+def _check_chunk(check: TaskCheck, task_dirs: List[Path]) -> List[Tuple[str, List[str]]]:
+    results = []
+    for task_dir in task_dirs:
+        try:
+            errors = check(task_dir)
+        except Exception as e:
+            errors = [f"check raised {type(e).__name__}: {e}"]
+        results.append((task_dir.name, errors))
+    return results
+
+
+def _chunks(items: Iterable[Path], size: int) -> Iterator[List[Path]]:
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_dataset(
+    domain_dir: Path,
+    check: TaskCheck,
+    workers: int = 4,
+    chunk_size: int = 64,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run `check` over every task directory under `<domain>_task/`.
+
+    Args:
+        domain_dir: The `<domain>_task/` directory
+        check: Picklable callable (e.g. functools.partial of a module-level
+            function) returning error strings for one task directory
+        workers: Worker processes (0 = check in this process)
+        chunk_size: Task directories sent to a worker at a time
+        on_progress: Called with (tasks checked, failures so far) after each chunk
+
+    Returns:
+        {"tasks", "failed", "seconds", "failures": {task_id: [errors]}}
+    """
+    started = time.perf_counter()
+    chunks = _chunks(iter_task_dirs(domain_dir), chunk_size)
+    checked = 0
+    failures: Dict[str, List[str]] = {}
+
+    def collect(results: List[Tuple[str, List[str]]]) -> None:
+        nonlocal checked
+        checked += len(results)
+        failures.update((task_id, errors) for task_id, errors in results if errors)
+        if on_progress is not None:
+            on_progress(checked, len(failures))
+
+    if workers:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep a bounded number of chunks in flight so huge manifests aren't materialized
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(_check_chunk, check, chunk))
+                if len(pending) >= 4 * workers:
+                    collect(pending.pop(0).result())
+            for future in pending:
+                collect(future.result())
+    else:
+        for chunk in chunks:
+            collect(_check_chunk(check, chunk))
+
+    return {
+        "tasks": checked,
+        "failed": len(failures),
+        "seconds": round(time.perf_counter() - started, 3),
+        "failures": dict(sorted(failures.items())),
+    }
+
+
+def write_validation_report(path: Path, report: Dict[str, Any]) -> Path:
+    """Write a validation report as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    return path
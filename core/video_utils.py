@@ -1,22 +1,207 @@
 """Video generation utilities - Generic framework code (DO NOT MODIFY)."""
 
+import heapq
+from collections import Counter
 from pathlib import Path
-from typing import List, Tuple, Optional
+from itertools import repeat
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple, Optional
 from PIL import Image
 
-# Check if cv2 is available
+# Check if cv2 is available without importing it: cv2 and numpy are loaded on
+# first use (see _backends), so importing core stays cheap for image-only runs
 import importlib.util
 
 CV2_AVAILABLE = importlib.util.find_spec("cv2") is not None
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
 
-if CV2_AVAILABLE:
+_warned_missing_cv2 = False
+
+
+def _backends():
+    """Import and return (cv2, numpy) on first use."""
     import cv2
     import numpy as np
-else:
-    cv2 = None
-    np = None
-    print("⚠️  Warning: opencv-python not installed. Video generation disabled.")
-    print("   Install with: pip install opencv-python==4.8.1.78")
+    return cv2, np
+
+
+def _warn_missing_cv2() -> None:
+    global _warned_missing_cv2
+    if not _warned_missing_cv2:
+        _warned_missing_cv2 = True
+        print("⚠️  Warning: opencv-python not installed. Video generation disabled.")
+        print("   Install with: pip install opencv-python==4.8.1.78")
+
+
+def _timeline(stream: int, frames: Sequence[Image.Image], fps: int) -> Iterator[Tuple[float, int, Image.Image]]:
+    """(timestamp, stream, frame) for every frame of one stream."""
+    for k, frame in enumerate(frames):
+        yield k / fps, stream, frame
+
+
+def _transition_alphas(steps: int) -> List[float]:
+    """Blend factors 0..1 for a transition of `steps` frames."""
+    return [i / (steps - 1) if steps > 1 else 1.0 for i in range(steps)]
+
+
+def _fade_opacities(alphas: Sequence[float]) -> List[float]:
+    """Sliding-fade opacity curve: 1.0 -> 0.2 over the first half, back to 1.0 over the second."""
+    return [
+        1.0 - (p * 2) * 0.8 if p < 0.5 else 0.2 + ((p - 0.5) * 2) * 0.8
+        for p in alphas
+    ]
+
+
+def _blend_arrays(
+    start_rgba: Image.Image,
+    end_rgba: Image.Image,
+    alphas: Sequence[float],
+    opacities: Optional[Sequence[float]] = None,
+) -> Iterator[Any]:
+    """
+    Yield Image.blend(start, end, alpha) for every alpha as (height, width, 3)
+    uint8 RGB arrays, optionally faded to black by the matching opacity.
+    
+    The (end - start) difference is computed once; each frame is then one
+    vectorized multiply-add into a reused float32 buffer. This is Pillow's own
+    blend arithmetic (float32 `start + alpha * (end - start)`, truncated to
+    uint8), so frames are identical to _blend_images().
+    """
+    import numpy as np
+    base = np.asarray(start_rgba)[..., :3].astype(np.float32)
+    diff = np.asarray(end_rgba)[..., :3].astype(np.float32) - base
+    buffer = np.empty_like(base)
+    for i, alpha in enumerate(alphas):
+        np.multiply(diff, np.float32(alpha), out=buffer)
+        buffer += base
+        frame = buffer.astype(np.uint8)
+        if opacities is not None:
+            # Pillow blends with a transparent image: opacity * value, truncated
+            np.multiply(frame, np.float32(opacities[i]), out=buffer)
+            frame = buffer.astype(np.uint8)
+        yield frame
+
+
+def _blend_images(
+    start_rgba: Image.Image,
+    end_rgba: Image.Image,
+    alphas: Sequence[float],
+    opacities: Optional[Sequence[float]] = None,
+) -> Iterator[Image.Image]:
+    """Pillow fallback for _blend_arrays() (no numpy), yielding RGB images."""
+    transparent = Image.new('RGBA', start_rgba.size, (0, 0, 0, 0))
+    for i, alpha in enumerate(alphas):
+        blended = Image.blend(start_rgba, end_rgba, alpha)
+        if opacities is not None:
+            blended = Image.blend(transparent, blended, opacities[i])
+        yield blended.convert('RGB')
+
+
+def _transition_pair(start_image: Image.Image, end_image: Image.Image) -> Tuple[Image.Image, Image.Image]:
+    """RGBA copies of both images, the end one resized to the start size if needed."""
+    start_rgba = start_image.convert('RGBA')
+    end_rgba = end_image.convert('RGBA')
+    if start_rgba.size != end_rgba.size:
+        end_rgba = end_rgba.resize(start_rgba.size, Image.Resampling.LANCZOS)
+    return start_rgba, end_rgba
+
+
+class PreviewWriter:
+    """
+    Write lightweight animated GIF/WebP previews straight from in-memory frames.
+    
+    Every frame is mapped onto one precomputed palette (frames already drawn on
+    that palette are used as-is), consecutive identical frames are merged into a
+    single longer frame, and the encoders store only the region that changed
+    since the previous frame. No video is decoded and no per-frame palette is
+    computed.
+    """
+    
+    FORMATS = ("gif", "webp")
+    
+    def __init__(
+        self,
+        palette: List[int],
+        fps: int = 16,
+        output_format: str = "gif",
+        scale: float = 1.0,
+        frame_step: int = 1,
+    ):
+        """
+        Args:
+            palette: Flat [r, g, b, ...] palette (see ImageRenderer.build_palette)
+            fps: Frame rate of the source frames
+            output_format: "gif" or "webp"
+            scale: Downscale factor applied to every frame (1.0 = full size)
+            frame_step: Keep every n-th frame (the last frame is always kept)
+        """
+        if output_format not in self.FORMATS:
+            raise ValueError(f"output_format must be one of {self.FORMATS}, got {output_format!r}")
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        if frame_step < 1:
+            raise ValueError(f"frame_step must be >= 1, got {frame_step}")
+        self.palette = list(palette)
+        self.fps = fps
+        self.output_format = output_format
+        self.extension = f".{output_format}"
+        self.scale = scale
+        self.frame_step = frame_step
+        self._palette_image = Image.new("P", (1, 1))
+        self._palette_image.putpalette(self.palette)
+    
+    def _to_palette(self, frame: Image.Image) -> Image.Image:
+        """Map a frame onto the shared palette, downscaling first if configured."""
+        if self.scale != 1.0:
+            size = (max(1, round(frame.width * self.scale)), max(1, round(frame.height * self.scale)))
+            # reducing_gap: integer box-reduce first, then a cheap final resize
+            frame = frame.convert("RGB").resize(size, Image.Resampling.BOX, reducing_gap=1.0)
+        elif frame.mode == "P" and frame.getpalette()[:len(self.palette)] == self.palette:
+            return frame
+        return frame.convert("RGB").quantize(palette=self._palette_image, dither=Image.Dither.NONE)
+    
+    def write(self, frames: List[Image.Image], output_path: Path) -> Path:
+        """
+        Write frames as an animated preview.
+        
+        Args:
+            frames: PIL Images; repeated hold frames should be the same object
+            output_path: Path to save the preview (extension will be corrected)
+            
+        Returns:
+            Path to the preview file
+        """
+        if not frames:
+            raise ValueError("No frames provided")
+        indices = list(range(0, len(frames), self.frame_step))
+        if indices[-1] != len(frames) - 1:
+            indices.append(len(frames) - 1)
+        
+        # Frame boundaries on the format's clock (GIF counts centiseconds), rounded
+        # cumulatively so per-frame rounding doesn't drift the total duration
+        unit = 10 if self.output_format == "gif" else 1
+        clock = lambda k: int(round(k * 1000.0 / self.fps / unit)) * unit
+        images: List[Image.Image] = []
+        durations: List[int] = []
+        previous = None
+        for k, index in enumerate(indices):
+            end = indices[k + 1] if k + 1 < len(indices) else len(frames)
+            duration = clock(end) - clock(index)
+            if frames[index] is previous:
+                durations[-1] += duration
+                continue
+            previous = frames[index]
+            images.append(self._to_palette(previous))
+            durations.append(duration)
+        
+        output_path = Path(output_path).with_suffix(self.extension)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        options = dict(save_all=True, append_images=images[1:], duration=durations, loop=0)
+        if self.output_format == "gif":
+            # Keep the shared global palette instead of per-frame optimized ones
+            images[0].save(output_path, format="GIF", optimize=False, **options)
+        else:
+            images[0].save(output_path, format="WEBP", lossless=True, **options)
+        return output_path
 
 
 class VideoGenerator:
@@ -50,7 +235,9 @@ class VideoGenerator:
     
     @staticmethod
     def is_available() -> bool:
-        """Check if video generation is available."""
+        """Check if video generation is available (warns once if not)."""
+        if not CV2_AVAILABLE:
+            _warn_missing_cv2()
         return CV2_AVAILABLE
     
     def create_video_from_frames(
@@ -85,6 +272,7 @@ class VideoGenerator:
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Initialize video writer
+        cv2, np = _backends()
         fourcc = cv2.VideoWriter_fourcc(*self.codec)
         
         writer = cv2.VideoWriter(
@@ -110,6 +298,96 @@ class VideoGenerator:
         writer.release()
         return output_path
     
+    def create_videos_from_frames(
+        self,
+        streams: Sequence[Tuple[Sequence[Image.Image], Path, int]],
+        size: Optional[Tuple[int, int]] = None,
+    ) -> List[Path]:
+        """
+        Encode several videos in one pass, e.g. one animation at several frame rates.
+        
+        Args:
+            streams: (frames, output_path, fps) per video. Frames may be shared
+                (the same Image object) within and between streams.
+            size: Optional (width, height) tuple. If None, uses first frame size
+            
+        Returns:
+            Paths of the created videos, in stream order
+        
+        The streams are interleaved by timestamp; each distinct frame is
+        converted to the encoder's format once and dropped after its last use.
+        """
+        if not streams or not all(frames for frames, _, _ in streams):
+            raise ValueError("No frames provided")
+        if size is None:
+            size = streams[0][0][0].size
+        
+        cv2, np = _backends()
+        fourcc = cv2.VideoWriter_fourcc(*self.codec)
+        paths = []
+        writers = []
+        try:
+            for _, output_path, fps in streams:
+                path = Path(output_path).with_suffix(self.extension)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                paths.append(path)
+                writers.append(cv2.VideoWriter(str(path), fourcc, fps, size))
+            
+            uses = Counter(id(frame) for frames, _, _ in streams for frame in frames)
+            converted = {}
+            timeline = heapq.merge(
+                *(_timeline(s, frames, fps) for s, (frames, _, fps) in enumerate(streams)),
+                key=lambda entry: entry[:2],
+            )
+            for _, s, frame in timeline:
+                key = id(frame)
+                if key not in converted:
+                    if frame.size != size:
+                        frame = frame.resize(size, Image.Resampling.LANCZOS)
+                    converted[key] = cv2.cvtColor(np.array(frame.convert('RGB')), cv2.COLOR_RGB2BGR)
+                writers[s].write(converted[key])
+                uses[key] -= 1
+                if not uses[key]:
+                    del converted[key]
+        finally:
+            for writer in writers:
+                writer.release()
+        return paths
+    
+    def create_video_from_arrays(
+        self,
+        frames: Iterable[Any],
+        output_path: Path,
+        size: Tuple[int, int],
+    ) -> Path:
+        """
+        Create video from raw RGB frames, e.g. views into shared memory.
+        
+        Args:
+            frames: Iterable of (height, width, 3) uint8 RGB arrays
+            output_path: Path to save video (extension will be corrected)
+            size: (width, height) of every frame
+            
+        Returns:
+            Path to created video file
+        """
+        output_path = Path(output_path).with_suffix(self.extension)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        cv2, np = _backends()
+        fourcc = cv2.VideoWriter_fourcc(*self.codec)
+        writer = cv2.VideoWriter(str(output_path), fourcc, self.fps, size)
+        try:
+            written = 0
+            for frame in frames:
+                writer.write(cv2.cvtColor(np.asarray(frame), cv2.COLOR_RGB2BGR))
+                written += 1
+        finally:
+            writer.release()
+        if not written:
+            raise ValueError("No frames provided")
+        return output_path
+    
     def create_crossfade_video(
         self,
         start_image: Image.Image,
@@ -121,6 +399,8 @@ class VideoGenerator:
         """
         Create video with smooth cross-fade transition between two images.
         
+        Frames are computed one at a time and streamed to the encoder.
+        
         Args:
             start_image: Initial image
             end_image: Final image
@@ -134,30 +414,8 @@ class VideoGenerator:
         if not CV2_AVAILABLE:
             return None
         
-        frames = []
-        
-        # Hold initial position
-        for _ in range(hold_frames):
-            frames.append(start_image.copy())
-        
-        # Smooth cross-fade transition
-        start_rgba = start_image.convert('RGBA')
-        end_rgba = end_image.convert('RGBA')
-        
-        # Ensure same size
-        if start_rgba.size != end_rgba.size:
-            end_rgba = end_rgba.resize(start_rgba.size, Image.Resampling.LANCZOS)
-        
-        for i in range(transition_frames):
-            alpha = i / (transition_frames - 1) if transition_frames > 1 else 1.0
-            blended = Image.blend(start_rgba, end_rgba, alpha)
-            frames.append(blended.convert('RGB'))
-        
-        # Hold final position
-        for _ in range(hold_frames):
-            frames.append(end_image.copy())
-        
-        return self.create_video_from_frames(frames, output_path)
+        alphas = _transition_alphas(transition_frames)
+        return self._write_transition(start_image, end_image, output_path, hold_frames, alphas)
     
     def create_sliding_fade_video(
         self,
@@ -187,47 +445,37 @@ class VideoGenerator:
         if not CV2_AVAILABLE:
             return None
         
-        frames = []
-        
-        # Hold initial position
-        for _ in range(hold_frames):
-            frames.append(start_image.copy())
-        
-        # Sliding transition with fade out/fade in
-        start_rgba = start_image.convert('RGBA')
-        end_rgba = end_image.convert('RGBA')
-        
-        # Ensure same size
-        if start_rgba.size != end_rgba.size:
-            end_rgba = end_rgba.resize(start_rgba.size, Image.Resampling.LANCZOS)
-        
-        for i in range(transition_frames):
-            # Progress through transition (0 to 1)
-            progress = i / (transition_frames - 1) if transition_frames > 1 else 1.0
-            
-            # Fade curve: fade out in first half, fade in in second half
-            # Creates a dip in opacity in the middle
-            if progress < 0.5:
-                # Fading out: opacity goes from 1.0 to 0.2
-                opacity = 1.0 - (progress * 2) * 0.8
-            else:
-                # Fading in: opacity goes from 0.2 to 1.0
-                opacity = 0.2 + ((progress - 0.5) * 2) * 0.8
-            
-            # Blend the positions (sliding motion)
-            blended = Image.blend(start_rgba, end_rgba, progress)
-            
-            # Apply opacity effect by blending with semi-transparent version
-            transparent = Image.new('RGBA', blended.size, (0, 0, 0, 0))
-            faded = Image.blend(transparent, blended, opacity)
-            
-            frames.append(faded.convert('RGB'))
-        
-        # Hold final position
-        for _ in range(hold_frames):
-            frames.append(end_image.copy())
-        
-        return self.create_video_from_frames(frames, output_path)
+        # Blend the positions (sliding motion) and dip the opacity in the middle
+        alphas = _transition_alphas(transition_frames)
+        return self._write_transition(
+            start_image, end_image, output_path, hold_frames, alphas, _fade_opacities(alphas)
+        )
+    
+    def _write_transition(
+        self,
+        start_image: Image.Image,
+        end_image: Image.Image,
+        output_path: Path,
+        hold_frames: int,
+        alphas: Sequence[float],
+        opacities: Optional[Sequence[float]] = None,
+    ) -> Path:
+        """Encode hold / blended transition / hold frames without materializing them."""
+        # cv2 depends on numpy, so the vectorized blend is always available here
+        _, np = _backends()
+        size = start_image.size
+        start_rgba, end_rgba = _transition_pair(start_image, end_image)
+        start_hold = np.asarray(start_image.convert('RGB'))
+        if end_image.size != size:
+            end_image = end_image.resize(size, Image.Resampling.LANCZOS)
+        end_hold = np.asarray(end_image.convert('RGB'))
+        
+        def frames() -> Iterator[Any]:
+            yield from repeat(start_hold, hold_frames)
+            yield from _blend_arrays(start_rgba, end_rgba, alphas, opacities)
+            yield from repeat(end_hold, hold_frames)
+        
+        return self.create_video_from_arrays(frames(), output_path, size)
     
     def interpolate_frames(
         self,
@@ -246,20 +494,13 @@ class VideoGenerator:
         Returns:
             List of frames including start, intermediates, and end
         """
-        frames = [start_frame]
-        
         # Ensure same size and mode
         if start_frame.size != end_frame.size:
             end_frame = end_frame.resize(start_frame.size, Image.Resampling.LANCZOS)
-        
-        start_frame = start_frame.convert('RGBA')
-        end_frame = end_frame.convert('RGBA')
-        
-        # Generate intermediate frames
-        for i in range(1, num_intermediate + 1):
-            alpha = i / (num_intermediate + 1)
-            blended = Image.blend(start_frame, end_frame, alpha)
-            frames.append(blended.convert('RGB'))
-        
-        frames.append(end_frame.convert('RGB'))
-        return frames
+        start_rgba, end_rgba = _transition_pair(start_frame, end_frame)
+        alphas = [i / (num_intermediate + 1) for i in range(1, num_intermediate + 1)]
+        if NUMPY_AVAILABLE:
+            intermediates = [Image.fromarray(a) for a in _blend_arrays(start_rgba, end_rgba, alphas)]
+        else:
+            intermediates = list(_blend_images(start_rgba, end_rgba, alphas))
+        return [start_frame] + intermediates + [end_rgba.convert('RGB')]
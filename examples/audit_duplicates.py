@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                         NEAR-DUPLICATE AUDIT SCRIPT                           ║
+║                                                                               ║
+║  Find scenes in a generated dataset that differ by only a few pixels.         ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Usage:
+    python examples/audit_duplicates.py data/questions/arrange_circles_by_circumference_task
+    python examples/audit_duplicates.py data/merged/arrange_circles_by_circumference_task --tolerance 0.02 --report dups.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import TaskConfig
+from src.near_duplicates import audit_task_dirs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit a dataset for near-duplicate scenes")
+    parser.add_argument("domain_dir", type=str, help="A <domain>_task/ directory (manifest or layout is used to find tasks)")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.01,
+        help="Max radius/center difference as a fraction of image width (default: 0.01)"
+    )
+    parser.add_argument(
+        "--image-width",
+        type=int,
+        default=TaskConfig.model_fields["image_size"].default[0],
+        help="Width the scenes were generated at (default: TaskConfig.image_size)"
+    )
+    parser.add_argument("--report", type=str, default=None, help="Write the clusters as JSON to this path")
+    args = parser.parse_args()
+
+    report = audit_task_dirs(Path(args.domain_dir), args.tolerance, args.image_width)
+    duplicates = sum(len(ids) - 1 for ids in report["clusters"])
+    print(f"🔍 {report['tasks']} tasks, {len(report['clusters'])} near-duplicate clusters ({duplicates} redundant tasks)")
+    for ids in report["clusters"][:10]:
+        print(f"   {', '.join(ids)}")
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"✅ Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                          STARTUP BUDGET CHECK                                 ║
+║                                                                               ║
+║  Measure the cold-import cost of `core` and `src` in fresh interpreters and   ║
+║  fail if it exceeds a budget or if a lazy backend gets imported eagerly.      ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Usage:
+    python examples/check_startup.py
+    python examples/check_startup.py --budget-ms 50 --runs 9
+
+Each fresh interpreter first imports an explicit baseline of the required
+dependencies (`import PIL.Image`, `from pydantic import BaseModel` and building
+one pydantic model, since pydantic's first-model cost is paid by any config
+class), then times `import core, src` alone. The budget applies to that
+repo-only time, taking the best (minimum) of --runs interpreters, so scheduler
+noise and machine speed largely cancel out. Interpreter startup, site imports
+and the baseline are excluded.
+"""
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+ROOT = Path(__file__).parent.parent
+
+# Imported on first use only; none of these may load during `import core, src`
+LAZY_MODULES = ("cv2", "multiprocessing.shared_memory", "concurrent.futures.process", "http.server", "boto3")
+
+_BASELINE = "import PIL.Image; from pydantic import BaseModel; type('M', (BaseModel,), {'__annotations__': {'x': int}})"
+_TIMER = (
+    "import time; {setup}; t = time.perf_counter(); {imports}; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def _import_ms(imports: str, setup: str = "pass") -> float:
+    """Milliseconds to run `imports` after `setup` in a fresh interpreter."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", _TIMER.format(setup=setup, imports=imports)], cwd=ROOT, text=True
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import-time budget of core and src")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Allowed ms on top of pydantic + Pillow (default: 100)")
+    parser.add_argument("--runs", type=int, default=9, help="Fresh interpreters per measurement; the best is used (default: 9)")
+    args = parser.parse_args()
+
+    baseline = min(_import_ms(_BASELINE) for _ in range(args.runs))
+    own_runs = [_import_ms("import core, src", setup=_BASELINE) for _ in range(args.runs)]
+    own = min(own_runs)
+    print(f"⏱️  import core, src: {own:.1f} ms on top of the baseline, best of {args.runs} "
+          f"(median {statistics.median(own_runs):.1f} ms)")
+    print(f"   baseline {baseline:.1f} ms, not counted: {_BASELINE}")
+
+    loaded = subprocess.check_output(
+        [sys.executable, "-c", f"import sys, core, src; print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"],
+        cwd=ROOT, text=True,
+    ).split()
+    ok = True
+    if loaded:
+        ok = False
+        print(f"❌ Eagerly imported: {', '.join(loaded)}")
+    if own > args.budget_ms:
+        ok = False
+        print(f"❌ Over budget: {own:.1f} ms > {args.budget_ms:.0f} ms")
+    if ok:
+        print(f"✅ Within budget ({args.budget_ms:.0f} ms) and no eager backend imports")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
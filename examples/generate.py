@@ -19,8 +19,16 @@ import sys
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core import OutputWriter
+from core import ImageRenderer, OutputWriter
+from core.frame_store import FrameStoreWriter
+from core.memory import MB, MEMORY_MODES, PEAK_SUFFIX, current_rss, plan_concurrency
+from core.progress import ProgressReporter
+from core.shards import shard_range, write_shard_info
+from core.storage import open_storage
+from core.run_summary import merge_run_stats, summarize_run_stats, write_run_summary
+from core.video_utils import PreviewWriter
 from src import TaskGenerator, TaskConfig
+from src.difficulty import DIFFICULTY_LEVELS
 
 
 def main():
@@ -56,10 +64,226 @@ Examples:
         action="store_true",
         help="Disable video generation"
     )
+    parser.add_argument(
+        "--parametric-video",
+        action="store_true",
+        help="Store animation.json keyframe parameters instead of encoding ground_truth.mp4"
+    )
+    parser.add_argument(
+        "--lazy-render",
+        action="store_true",
+        help="Render each task's images, frames and video only when the writer needs them, and free them once written"
+    )
+    parser.add_argument(
+        "--video-fps-variants",
+        type=int,
+        nargs="+",
+        default=[],
+        metavar="FPS",
+        help="Also encode the ground-truth video at these frame rates (ground_truth_<fps>fps.mp4), sharing frames"
+    )
+    parser.add_argument(
+        "--palette-png",
+        action="store_true",
+        help="Save indexed-color (palette) PNGs instead of 24-bit RGB"
+    )
+    parser.add_argument(
+        "--png-compress-level",
+        type=int,
+        default=6,
+        help="PNG zlib compression level 0-9 (default: 6)"
+    )
+    parser.add_argument(
+        "--png-optimize",
+        action="store_true",
+        help="Search for the smallest PNG encoding (slower)"
+    )
+    parser.add_argument(
+        "--svg",
+        action="store_true",
+        help="Also write first_frame.svg / final_frame.svg from the scene geometry"
+    )
+    parser.add_argument(
+        "--svg-animation",
+        action="store_true",
+        help="Also write ground_truth.svg, an animated SVG of the solution"
+    )
+    parser.add_argument(
+        "--output-resolutions",
+        type=int,
+        nargs="+",
+        default=[],
+        metavar="WIDTH",
+        help="Also render each scene natively at these widths, into <output>/<width>px/"
+    )
+    parser.add_argument(
+        "--compact-metadata",
+        action="store_true",
+        help="Write run-level provenance and config once to <domain>_task/run.json; metadata.json keeps task fields only"
+    )
+    parser.add_argument(
+        "--storage-url",
+        type=str,
+        default=None,
+        help="Write task files here instead of --output, e.g. s3://bucket/prefix (run summary stays in --output)"
+    )
+    parser.add_argument(
+        "--storage-endpoint",
+        type=str,
+        default=None,
+        help="S3-compatible endpoint URL for --storage-url, e.g. a local MinIO at http://localhost:9000"
+    )
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=16,
+        help="Concurrent uploads and pooled connections for s3:// storage (default: 16)"
+    )
+    parser.add_argument(
+        "--layout",
+        choices=["flat", "index", "hash"],
+        default="flat",
+        help="Task directory layout; index/hash fan out into 2-level buckets (default: flat)"
+    )
+    parser.add_argument(
+        "--frame-store",
+        action="store_true",
+        help="Also write raw animation frames to a memory-mappable store (<output>/<domain>_frames/)"
+    )
+    parser.add_argument(
+        "--preview",
+        choices=list(PreviewWriter.FORMATS),
+        default=None,
+        help="Also write an animated preview (preview.gif / preview.webp) per task"
+    )
+    parser.add_argument(
+        "--preview-scale",
+        type=float,
+        default=0.5,
+        help="Downscale factor for previews (default: 0.5)"
+    )
+    parser.add_argument(
+        "--preview-frame-step",
+        type=int,
+        default=2,
+        help="Keep every n-th animation frame in previews (default: 2)"
+    )
+    parser.add_argument(
+        "--task-attempt-budget",
+        type=int,
+        default=500,
+        help="Scene-sampling attempts per task before the bounded fallback layout (default: 500)"
+    )
+    parser.add_argument(
+        "--task-time-budget",
+        type=float,
+        default=None,
+        help="Seconds of scene sampling per task before the bounded fallback layout (not reproducible)"
+    )
+    parser.add_argument(
+        "--difficulty",
+        choices=list(DIFFICULTY_LEVELS),
+        default=None,
+        help="Difficulty preset: easy (fewest circles, clear size gaps) to hard (most circles, tight gaps)"
+    )
+    parser.add_argument(
+        "--difficulty-quota",
+        action="append",
+        default=[],
+        metavar="BUCKET=WEIGHT",
+        help="Share or exact count of tasks per bucket <count>-<tight|loose>, e.g. 5-loose=0.3 (repeatable; overrides --difficulty)"
+    )
+    parser.add_argument(
+        "--num-shards",
+        type=int,
+        default=None,
+        help="Split --num-samples into this many contiguous shards (one per node; requires --seed)"
+    )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=0,
+        help="Which shard this node generates, 0-based (default: 0)"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between progress lines (default: 2.0)"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        help="Also keep live metrics in this file for a local scraper (.prom = Prometheus textfile, else JSON)"
+    )
+    parser.add_argument(
+        "--memory-profile",
+        choices=list(MEMORY_MODES),
+        default=None,
+        help="Record peak memory per stage and worker into run_summary.json (rss is cheap; tracemalloc is slower)"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        metavar="MB",
+        help=(
+            "With --render-workers, reduce render/encode workers and ring slots until the estimated "
+            "footprint fits (MB); in-process runs hold one task at a time and only warn if it won't fit"
+        )
+    )
+    
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=0,
+        help="Render in N processes and encode videos in separate processes via shared memory (default: 0 = in-process)"
+    )
+    parser.add_argument(
+        "--encode-workers",
+        type=int,
+        default=2,
+        help="Video encoder processes when --render-workers is set (default: 2)"
+    )
+    parser.add_argument(
+        "--ring-slots",
+        type=int,
+        default=None,
+        help="Task slots in the shared-memory frame ring (default: render + encode workers)"
+    )
     
     args = parser.parse_args()
+    if args.render_workers and (
+        args.no_videos or args.parametric_video or args.frame_store or args.preview
+        or args.output_resolutions or args.video_fps_variants
+    ):
+        parser.error(
+            "--render-workers requires MP4 videos and cannot be combined with --parametric-video, "
+            "--frame-store, --preview, --output-resolutions or --video-fps-variants"
+        )
+    if args.render_workers and args.storage_url:
+        parser.error("--render-workers encodes videos in place and requires local output (no --storage-url)")
+    difficulty_quotas = None
+    if args.difficulty_quota:
+        difficulty_quotas = {}
+        for quota in args.difficulty_quota:
+            name, _, weight = quota.partition("=")
+            try:
+                difficulty_quotas[name] = float(weight)
+            except ValueError:
+                parser.error(f"--difficulty-quota expects BUCKET=WEIGHT, got {quota!r}")
+    indices = None
+    if args.num_shards is not None:
+        if args.seed is None:
+            parser.error("--num-shards requires --seed so every node derives the same per-task seeds")
+        try:
+            indices = shard_range(args.num_samples, args.num_shards, args.shard_index)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"🧩 Shard {args.shard_index}/{args.num_shards}: task indices {indices.start}-{indices.stop - 1}")
     
-    print(f"🎲 Generating {args.num_samples} tasks...")
+    print(f"🎲 Generating {len(indices) if indices is not None else args.num_samples} tasks...")
     
     # ──────────────────────────────────────────────────────────────────────────
     #  Configure your task here
@@ -71,17 +295,133 @@ Examples:
         random_seed=args.seed,
         output_dir=Path(args.output),
         generate_videos=not args.no_videos,
+        parametric_video=args.parametric_video,
+        video_fps_variants=args.video_fps_variants,
+        lazy_render=args.lazy_render,
+        palette_png=args.palette_png,
+        png_compress_level=args.png_compress_level,
+        png_optimize=args.png_optimize,
+        svg_frames=args.svg,
+        svg_animation=args.svg_animation,
+        output_resolutions=args.output_resolutions,
+        keep_frames=args.frame_store or bool(args.preview),
+        task_attempt_budget=args.task_attempt_budget,
+        task_time_budget=args.task_time_budget,
+        memory_profile=args.memory_profile,
+        compact_metadata=args.compact_metadata,
+        difficulty=args.difficulty,
+        difficulty_quotas=difficulty_quotas,
     )
     
-    # Generate tasks
     generator = TaskGenerator(config)
-    tasks = generator.generate_dataset()
     
-    # Write to disk
-    writer = OutputWriter(Path(args.output))
-    writer.write_dataset(tasks)
+    frame_store = None
+    if args.frame_store:
+        frame_store = FrameStoreWriter(
+            Path(args.output) / f"{config.domain}_frames", config.image_size
+        )
+    
+    preview_writer = None
+    if args.preview:
+        # One palette for every preview: background, outlines and circle colors
+        preview_writer = PreviewWriter(
+            ImageRenderer.build_palette([(255, 255, 255), (0, 0, 0)] + list(config.circle_colors)),
+            fps=config.video_fps,
+            output_format=args.preview,
+            scale=args.preview_scale,
+            frame_step=args.preview_frame_step,
+        )
     
-    print(f"✅ Done! Generated {len(tasks)} tasks in {args.output}/{config.domain}_task/")
+    writer = OutputWriter(
+        Path(args.output),
+        png_mode="P" if config.palette_png else "RGB",
+        compress_level=config.png_compress_level,
+        optimize=config.png_optimize,
+        layout=args.layout,
+        frame_store=frame_store,
+        preview_writer=preview_writer,
+        storage=open_storage(
+            args.storage_url, endpoint_url=args.storage_endpoint, max_concurrency=args.upload_concurrency
+        ) if args.storage_url else None,
+        run_header=generator.run_header() if config.compact_metadata else None,
+    )
+    
+    progress = ProgressReporter(
+        total=len(indices) if indices is not None else config.num_samples,
+        interval=args.progress_interval,
+        metrics_path=args.metrics_file,
+    )
+    worker_stats = []
+    width, height = config.image_size
+    max_frames = generator.animation_frame_count()
+    if args.memory_budget and args.render_workers:
+        requested = (args.render_workers, args.encode_workers, args.ring_slots or args.render_workers + args.encode_workers)
+        try:
+            planned = plan_concurrency(args.memory_budget * MB, width * height * 3, max_frames, *requested)
+        except ValueError as e:
+            parser.error(str(e))
+        if planned != requested:
+            print(
+                f"🧮 Memory budget {args.memory_budget} MB: {planned[0]} render workers, "
+                f"{planned[1]} encode workers, {planned[2]} ring slots (requested {requested[0]}/{requested[1]}/{requested[2]})"
+            )
+        args.render_workers, args.encode_workers, args.ring_slots = planned
+    elif args.memory_budget:
+        # One task in flight; warn if even that is estimated not to fit
+        estimate = current_rss() + (width * height * 3 * max_frames if config.generate_videos or config.keep_frames else 0)
+        if estimate > args.memory_budget * MB:
+            print(f"⚠️  Estimated footprint {estimate / MB:.0f} MB exceeds the {args.memory_budget} MB memory budget")
+    
+    if args.render_workers:
+        # Renderers and encoders run in separate processes, sharing frames via shared memory
+        # (imported here so in-process runs don't load multiprocessing)
+        from core.shm_pipeline import run_render_encode_pipeline
+        num_written = run_render_encode_pipeline(
+            TaskGenerator,
+            config,
+            writer,
+            indices=indices if indices is not None else range(config.num_samples),
+            max_frames=max_frames,
+            fps=config.video_fps,
+            num_renderers=args.render_workers,
+            num_encoders=args.encode_workers,
+            ring_slots=args.ring_slots,
+            on_task_done=lambda task_id: progress.update(),
+            on_worker_stats=worker_stats.append,
+            on_worker_progress=progress.set_worker_stats,
+        )
+        writer.close()
+    else:
+        # Generate and write tasks one at a time so frames and images don't pile up
+        num_written = 0
+        for task in generator.iter_dataset(indices, progress=progress):
+            with generator.stage("write"):
+                writer.write_task_pair(task)
+            num_written += 1
+        with generator.stage("write"):
+            writer.close()
+        worker_stats.append(generator.run_stats)
+    
+    progress.close()
+    summary = summarize_run_stats(merge_run_stats(*worker_stats))
+    if args.memory_profile:
+        summary["worker_memory"] = [
+            {k: v for k, v in stats.items() if k.endswith(PEAK_SUFFIX)} for stats in worker_stats
+        ]
+    write_run_summary(Path(args.output), summary)
+    if indices is not None:
+        write_shard_info(Path(args.output), args.num_samples, args.num_shards, args.shard_index, args.seed)
+    latency = summary.get("task_latency", {})
+    print(
+        f"⏱️  Task latency p50 {latency.get('p50', 0.0) * 1000:.1f} ms, "
+        f"p99 {latency.get('p99', 0.0) * 1000:.1f} ms, max {latency.get('max', 0.0) * 1000:.1f} ms; "
+        f"{summary.get('budget_overruns', 0)} budget overruns, "
+        f"{summary.get('fallback_scenes', 0)} fallback scenes"
+    )
+    peaks = {k[:-len(PEAK_SUFFIX)]: v for k, v in summary.items() if k.endswith(PEAK_SUFFIX)}
+    if peaks:
+        print("🧠 Peak memory per worker: " + ", ".join(f"{k} {v / MB:.0f} MB" for k, v in peaks.items()))
+    print(f"✅ Done! Generated {num_written} tasks in {args.storage_url or args.output}/{config.domain}_task/")
 
 
 if __name__ == "__main__":
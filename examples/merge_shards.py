@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                             SHARD MERGE SCRIPT                                ║
+║                                                                               ║
+║  Combine the outputs of `generate.py --num-shards K --shard-index i` runs     ║
+║  into one dataset index and check them for gaps and duplicates.               ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Usage:
+    python examples/merge_shards.py data/shard_0 data/shard_1 data/shard_2 --output data/merged
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.shards import MERGE_REPORT_FILE, merge_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge per-shard manifests into one dataset index")
+    parser.add_argument("shards", type=str, nargs="+", help="Shard output directories (each with shard.json)")
+    parser.add_argument("--output", type=str, required=True, help="Directory for the merged manifests and report")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if anything is missing or duplicated")
+    args = parser.parse_args()
+
+    try:
+        report = merge_shards([Path(s) for s in args.shards], Path(args.output))
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+
+    problems = bool(report["missing_shards"])
+    if report["missing_shards"]:
+        print(f"⚠️  Missing shards: {report['missing_shards']}")
+    for name, domain in report["domains"].items():
+        print(f"📦 {name}: {domain['tasks']} tasks")
+        if domain["missing_indices"]:
+            problems = True
+            print(f"   ⚠️  {len(domain['missing_indices'])} missing indices (first: {domain['missing_indices'][:10]})")
+        if domain["overlapping_tasks"]:
+            problems = True
+            print(f"   ⚠️  {len(domain['overlapping_tasks'])} task IDs written by more than one shard")
+        if domain["duplicate_scenes"]:
+            problems = True
+            print(f"   ⚠️  {len(domain['duplicate_scenes'])} groups of duplicate scenes (same param_hash)")
+    print(f"✅ Merged {len(report['shards'])} shards; report in {Path(args.output) / MERGE_REPORT_FILE}")
+    if args.strict and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                        LOCAL TASK GENERATION SERVICE                          ║
+║                                                                               ║
+║  Serves freshly generated tasks over HTTP from one warm worker pool.          ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Usage:
+    python examples/serve.py --port 8765 --workers 8
+
+    curl -s localhost:8765/tasks -d '{"seed": 1, "start": 0, "stop": 100, "format": "tar"}' > tasks.tar
+    curl -s localhost:8765/tasks -d '{"seed": 1, "stop": 10, "options": {"generate_videos": false}}'
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.service import TaskService
+from src import TaskGenerator, TaskConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve generated tasks over HTTP")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Tasks per worker batch (default: 16)")
+    parser.add_argument("--cache-size", type=int, default=2048, help="Rendered tasks kept in the LRU cache (default: 2048)")
+    parser.add_argument(
+        "--max-ahead", type=int, default=None,
+        help="Tasks rendered ahead of what a client has read (default: two batches per worker)"
+    )
+    args = parser.parse_args()
+
+    service = TaskService(
+        TaskGenerator,
+        TaskConfig(num_samples=0),
+        num_workers=args.workers,
+        batch_size=args.batch_size,
+        cache_size=args.cache_size,
+        max_ahead=args.max_ahead,
+    )
+    print(f"🛰️  Serving tasks on http://{args.host}:{args.port}/tasks")
+    try:
+        service.serve(args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
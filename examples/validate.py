@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                          DATASET VALIDATION SCRIPT                            ║
+║                                                                               ║
+║  Check every task of a generated dataset in parallel: images, video,          ║
+║  metadata and circle geometry. Writes a JSON report of failures.              ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Usage:
+    python examples/validate.py data/questions/arrange_circles_by_circumference_task --workers 16
+    python examples/validate.py data/questions/arrange_circles_by_circumference_task --parametric-video --report qa.json
+    python examples/validate.py data/questions/512px/arrange_circles_by_circumference_task
+
+The TaskConfig recorded in the domain's run.json (--compact-metadata runs) is
+used when present; the flags below override it or stand in for it. A domain
+under a `<width>px/` resolution variant directory is checked at that width.
+"""
+
+import argparse
+from functools import partial
+import json
+from pathlib import Path
+import re
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.metadata_builder import RUN_HEADER_FILE
+from core.validation import VALIDATION_REPORT_FILE, validate_dataset, write_validation_report
+from src import TaskConfig, TaskGenerator
+from src.validation import check_task
+
+
+def _load_config(domain_dir: Path, overrides: dict) -> TaskConfig:
+    """The config recorded in run.json (if any) with `overrides` applied."""
+    header = domain_dir / RUN_HEADER_FILE
+    recorded = json.loads(header.read_text(encoding="utf-8")).get("config", {}) if header.exists() else {}
+    fields = {k: v for k, v in recorded.items() if k in TaskConfig.model_fields}
+    return TaskConfig(**{"num_samples": 0, **fields, **overrides})
+
+
+def _variant_image_size(domain_dir: Path, config: TaskConfig):
+    """Image size of a domain under `<width>px/`, as the generator derives it (None for the base size)."""
+    match = re.fullmatch(r"(\d+)px", domain_dir.parent.name)
+    if not match:
+        return None
+    width = int(match.group(1))
+    base_width, base_height = config.image_size
+    return (width, round(base_height * width / base_width))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a generated dataset")
+    parser.add_argument("domain_dir", type=str, help="A <domain>_task/ directory")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4; 0 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Tasks per worker batch (default: 64)")
+    parser.add_argument("--no-videos", action="store_true", default=None, help="The dataset was generated with --no-videos")
+    parser.add_argument(
+        "--parametric-video", action="store_true", default=None, help="The dataset was generated with --parametric-video"
+    )
+    parser.add_argument(
+        "--video-fps-variants", type=int, nargs="+", default=None, metavar="FPS",
+        help="The dataset was generated with these --video-fps-variants"
+    )
+    parser.add_argument(
+        "--image-size", type=int, nargs=2, default=None, metavar=("WIDTH", "HEIGHT"),
+        help="Image size of the checked tasks, e.g. of a resolution variant (default: derived from a "
+             "<width>px/ parent directory, else the config's image_size)"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help=f"Report path (default: <domain_dir>/{VALIDATION_REPORT_FILE})"
+    )
+    args = parser.parse_args()
+
+    domain_dir = Path(args.domain_dir)
+    overrides = {}
+    if args.no_videos:
+        overrides["generate_videos"] = False
+    if args.parametric_video:
+        overrides["parametric_video"] = True
+    if args.video_fps_variants is not None:
+        overrides["video_fps_variants"] = args.video_fps_variants
+    config = _load_config(domain_dir, overrides)
+    image_size = tuple(args.image_size) if args.image_size else _variant_image_size(domain_dir, config)
+    num_frames = TaskGenerator(config).animation_frame_count()
+
+    report = validate_dataset(
+        domain_dir,
+        partial(check_task, config=config, num_frames=num_frames, image_size=image_size),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    report_path = write_validation_report(
+        Path(args.report) if args.report else Path(args.domain_dir) / VALIDATION_REPORT_FILE, report
+    )
+
+    print(f"🔎 Checked {report['tasks']} tasks in {report['seconds']:.1f}s: {report['failed']} failed")
+    for task_id, errors in list(report["failures"].items())[:10]:
+        print(f"   {task_id}: {'; '.join(errors)}")
+    print(f"📝 Report written to {report_path}")
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
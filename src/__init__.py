@@ -5,10 +5,16 @@ Files to customize:
     - config.py   : Task-specific configuration (TaskConfig)
     - generator.py: Task generation logic (TaskGenerator)
     - prompts.py  : Task prompts/instructions (get_prompt)
+    - scene.py    : Immutable circle layout shared by sampler and renderers (Scene)
+    - animation.py: Keyframe parameters and single-frame synthesis (Animation)
+    - validation.py: Task-specific dataset checks (check_task)
+    - difficulty.py: Difficulty buckets and the stratified quota schedule (DifficultySchedule)
 """
 
 from .config import TaskConfig
 from .generator import TaskGenerator
 from .prompts import get_prompt
+from .scene import Scene
+from .animation import Animation
 
-__all__ = ["TaskConfig", "TaskGenerator", "get_prompt"]
+__all__ = ["TaskConfig", "TaskGenerator", "get_prompt", "Scene", "Animation"]
@@ -0,0 +1,203 @@
+"""
+Parametric ground-truth animation.
+
+The solution video is fully determined by the scene and its timing: circles
+hold still, move along straight lines with smoothstep easing, then hold again.
+Animation stores just those keyframe parameters (a few hundred bytes as
+animation.json) and renders any single frame on demand:
+
+    animation = Animation.load(task_dir / "animation.json")
+    frame = animation.render_frame(17)       # PIL Image, same pixels as video frame 17
+
+The timing is fixed in seconds by the keyframe rate `fps`. Rendering at
+another rate resamples the same motion: frame k at `fps=30` shows the
+animation at k / 30 s, and the video lasts as long (see frame_count).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from core import ImageRenderer
+from .scene import Scene
+
+ANIMATION_FILE = "animation.json"
+MAX_DURATION = 5.0  # Seconds; hard cap on every ground-truth video
+MAX_TRANSITION_FRAMES = 40  # Cap on moving frames, for faster generation
+
+
+def smoothstep(t: float) -> float:
+    """Ease in/out: 3t^2 - 2t^3."""
+    return t * t * (3 - 2 * t)
+
+
+EASINGS: Dict[str, Callable[[float], float]] = {"smoothstep": smoothstep}
+
+
+def animation_timing(fps: int, duration: float) -> Tuple[int, int]:
+    """(hold_frames, transition_frames) of an animation of `duration` seconds at `fps`."""
+    total_frames = max(3, int(fps * min(float(duration), MAX_DURATION)))
+    hold_frames = int(total_frames * 0.1)
+    transition_frames = min(total_frames - 2 * hold_frames, MAX_TRANSITION_FRAMES)
+    return hold_frames, transition_frames
+
+
+def resampled_frame_count(num_frames: int, source_fps: int, fps: int) -> int:
+    """Frames at `fps` covering the duration of `num_frames` frames at `source_fps`."""
+    if fps == source_fps:
+        return num_frames
+    return max(1, round(num_frames * fps / source_fps))
+
+
+class Animation:
+    """Keyframe parameters of one task's animation, with a single-frame synthesizer."""
+
+    __slots__ = ("scene", "image_size", "fps", "hold_frames", "transition_frames", "outline_width", "easing")
+
+    def __init__(
+        self,
+        scene: Scene,
+        image_size: Tuple[int, int],
+        fps: int,
+        hold_frames: int,
+        transition_frames: int,
+        outline_width: int = 2,
+        easing: str = "smoothstep",
+    ):
+        """
+        Args:
+            scene: Circle start/end positions (in image_size pixels)
+            image_size: (width, height) of every frame
+            fps: Playback frame rate
+            hold_frames: Frames the start (and end) state is held
+            transition_frames: Frames of the move, first at progress 0, last at 1
+            outline_width: Circle outline width in pixels
+            easing: Name of the easing curve (see EASINGS)
+        """
+        if easing not in EASINGS:
+            raise ValueError(f"Unknown easing {easing!r}; expected one of {sorted(EASINGS)}")
+        self.scene = scene
+        self.image_size = tuple(image_size)
+        self.fps = fps
+        self.hold_frames = hold_frames
+        self.transition_frames = transition_frames
+        self.outline_width = outline_width
+        self.easing = easing
+
+    @property
+    def num_frames(self) -> int:
+        return 2 * self.hold_frames + self.transition_frames
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return self.num_frames / self.fps
+
+    def frame_count(self, fps: Optional[int] = None) -> int:
+        """Frames of a rendering at `fps` (default: the keyframe rate), same duration."""
+        return resampled_frame_count(self.num_frames, self.fps, fps or self.fps)
+
+    def keyframe_position(self, k: int, fps: Optional[int] = None) -> float:
+        """Where frame k of a rendering at `fps` falls, in keyframes (k itself at the keyframe rate)."""
+        count = self.frame_count(fps)
+        if not 0 <= k < count:
+            raise IndexError(f"Frame {k} out of range ({count} frames)")
+        if fps is None or fps == self.fps:
+            return k
+        return k * self.fps / fps
+
+    def is_end_hold(self, k: int, fps: Optional[int] = None) -> bool:
+        """Whether frame k (at `fps`) is part of the final hold."""
+        return self.keyframe_position(k, fps) >= self.hold_frames + self.transition_frames
+
+    def progress(self, k: int, fps: Optional[int] = None) -> float:
+        """Eased progress (0 = start, 1 = end) of frame k (of a rendering at `fps`)."""
+        i = self.keyframe_position(k, fps) - self.hold_frames
+        if i < 0:
+            return 0.0
+        if i >= self.transition_frames:
+            return 1.0
+        t = min(i / (self.transition_frames - 1), 1.0) if self.transition_frames > 1 else 1.0
+        return EASINGS[self.easing](t)
+
+    def positions(self, k: int, fps: Optional[int] = None) -> List[Tuple[float, float]]:
+        """Circle centers in frame k (of a rendering at `fps`), in scene (id) order."""
+        p = self.progress(k, fps)
+        scene = self.scene
+        return [
+            (x + (fx - x) * p, y + (fy - y) * p)
+            for x, y, fx, fy in zip(scene.xs, scene.ys, scene.final_xs, scene.final_ys)
+        ]
+
+    def render_frame(
+        self, k: int, renderer: Optional[ImageRenderer] = None, fps: Optional[int] = None
+    ) -> Image.Image:
+        """Render frame k (of a rendering at `fps`) directly, pixel-identical to the generator's."""
+        renderer = renderer or ImageRenderer(image_size=self.image_size)
+        scene = self.scene
+        if self.is_end_hold(k, fps):
+            # The end hold is drawn left to right, like _render_final_state
+            circles = [(x, y, r, color) for _, x, y, r, color in scene.final_circles()]
+        else:
+            circles = [
+                (x, y, r, color)
+                for (x, y), r, color in zip(self.positions(k, fps), scene.radii, scene.colors)
+            ]
+        image = renderer.create_blank_image()
+        draw = ImageDraw.Draw(image)
+        for x, y, r, color in circles:
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=color, outline=(0, 0, 0), width=self.outline_width)
+        return image
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON-serializable parameters (see from_dict)."""
+        scene = self.scene
+        return {
+            "image_size": list(self.image_size),
+            "fps": self.fps,
+            "hold_frames": self.hold_frames,
+            "transition_frames": self.transition_frames,
+            "easing": self.easing,
+            "outline_width": self.outline_width,
+            "circles": [
+                [r, list(c), x, y, fx, fy]
+                for r, c, x, y, fx, fy in zip(
+                    scene.radii, scene.colors, scene.xs, scene.ys, scene.final_xs, scene.final_ys
+                )
+            ],
+            "order": list(scene.order),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Animation":
+        circles = data["circles"]
+        final_ys = [c[5] for c in circles]
+        scene = Scene(
+            radii=[c[0] for c in circles],
+            colors=[tuple(c[1]) for c in circles],
+            xs=[c[2] for c in circles],
+            ys=[c[3] for c in circles],
+            final_xs=[c[4] for c in circles],
+            final_ys=final_ys,
+            line_y=final_ys[0] if final_ys else 0,
+            order=data["order"],
+        )
+        return cls(
+            scene,
+            image_size=tuple(data["image_size"]),
+            fps=data["fps"],
+            hold_frames=data["hold_frames"],
+            transition_frames=data["transition_frames"],
+            outline_width=data["outline_width"],
+            easing=data["easing"],
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Animation":
+        """Load animation.json (or a task directory containing one)."""
+        path = Path(path)
+        if path.is_dir():
+            path = path / ANIMATION_FILE
+        return cls.from_dict(json.loads(path.read_text()))
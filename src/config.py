@@ -7,8 +7,13 @@
 ╚══════════════════════════════════════════════════════════════════════════════╝
 """
 
-from pydantic import Field
+import warnings
+from typing import Optional
+
+from pydantic import Field, PrivateAttr, model_validator
 from core import GenerationConfig
+from .difficulty import validate_quotas
+from .feasibility import FeasibilityReport, analyze
 
 
 class TaskConfig(GenerationConfig):
@@ -20,7 +25,7 @@ class TaskConfig(GenerationConfig):
     Inherited from GenerationConfig:
         - num_samples: int          # Number of samples to generate
         - domain: str               # Task domain name
-        - difficulty: Optional[str] # Difficulty level
+        - difficulty: Optional[str] # Difficulty preset: easy, medium or hard
         - random_seed: Optional[int] # For reproducibility
         - output_dir: Path          # Where to save outputs
         - image_size: tuple[int, int] # Image dimensions
@@ -55,6 +60,136 @@ class TaskConfig(GenerationConfig):
         description="Target video duration in seconds (capped at 5s)"
     )
     
+    video_fps_variants: list[int] = Field(
+        default_factory=list,
+        description=(
+            "Extra frame rates of the ground-truth video, each written as "
+            "ground_truth_<fps>fps.mp4. Every rate samples the same eased motion at "
+            "its own timestamps; frames that coincide (holds, start and end) are "
+            "rendered once and all videos of a task are encoded in one pass."
+        ),
+    )
+    
+    parametric_video: bool = Field(
+        default=False,
+        description=(
+            "Write animation.json (hold/transition frames, easing and per-circle "
+            "start/end positions) instead of encoding ground_truth.mp4; any frame can "
+            "be re-rendered with src.animation.Animation."
+        ),
+    )
+    
+    keep_frames: bool = Field(
+        default=False,
+        description=(
+            "Attach the rendered animation frames to each TaskPair "
+            "(e.g. for a raw frame store) instead of discarding them after encoding."
+        ),
+    )
+    
+    lazy_render: bool = Field(
+        default=False,
+        description=(
+            "Return LazyTaskPairs whose images, frames and video render on first "
+            "access and are released once OutputWriter has written them."
+        ),
+    )
+    
+    # ══════════════════════════════════════════════════════════════════════════
+    #  OUTPUT SETTINGS
+    # ══════════════════════════════════════════════════════════════════════════
+    
+    palette_png: bool = Field(
+        default=False,
+        description=(
+            "Render onto a fixed shared palette (white, black, circle_colors) and "
+            "save indexed-color PNGs. Decoded pixels are identical to RGB output."
+        ),
+    )
+    
+    png_compress_level: int = Field(
+        default=6,
+        ge=0,
+        le=9,
+        description="zlib compression level for PNG output",
+    )
+    
+    png_optimize: bool = Field(
+        default=False,
+        description="Search for the smallest PNG encoding (slower)",
+    )
+
+    svg_frames: bool = Field(
+        default=False,
+        description=(
+            "Also write first_frame.svg and final_frame.svg, built directly from "
+            "the scene geometry (no rasterization)."
+        ),
+    )
+    
+    svg_animation: bool = Field(
+        default=False,
+        description="Also write ground_truth.svg, a keyframed (SMIL) animated SVG of the solution.",
+    )
+    
+    output_resolutions: list[int] = Field(
+        default_factory=list,
+        description=(
+            "Extra output widths in pixels. Each scene is sampled once at image_size "
+            "and also rasterized natively (no resampling) at every listed width, "
+            "keeping the aspect ratio. Written under <output>/<width>px/."
+        ),
+    )
+
+    # ══════════════════════════════════════════════════════════════════════════
+    #  SAMPLING BUDGET
+    # ══════════════════════════════════════════════════════════════════════════
+    
+    task_attempt_budget: Optional[int] = Field(
+        default=500,
+        ge=1,
+        description=(
+            "Scene-sampling attempts per task (across dedup retries) before switching "
+            "to the constructive row layout. Deterministic; None = unbounded."
+        ),
+    )
+    
+    task_time_budget: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Wall-clock seconds of scene sampling per task before switching to the "
+            "constructive row layout. Bounds latency but depends on machine speed, "
+            "so runs using it are not bit-reproducible."
+        ),
+    )
+    
+    near_duplicate_tolerance: Optional[float] = Field(
+        default=None,
+        gt=0,
+        lt=1,
+        description=(
+            "Also reject scenes whose radii and centers are all within this fraction "
+            "of the image width of an earlier scene in the run (LSH index; "
+            "None = exact duplicates only)"
+        ),
+    )
+    
+    # ══════════════════════════════════════════════════════════════════════════
+    #  DIFFICULTY
+    # ══════════════════════════════════════════════════════════════════════════
+    
+    difficulty_quotas: Optional[dict[str, float]] = Field(
+        default=None,
+        description=(
+            "Target share (or exact count) of tasks per difficulty bucket "
+            "'<count>-<tight|loose>', e.g. {'5-loose': 0.5, '7-tight': 0.5}. Apportioned "
+            "to exact counts and assigned to task indices deterministically "
+            "(see src.difficulty). Overrides the `difficulty` preset "
+            "('easy', 'medium' or 'hard'); None = free sampling."
+        ),
+    )
+    
     # ══════════════════════════════════════════════════════════════════════════
     #  TASK-SPECIFIC SETTINGS
     # ══════════════════════════════════════════════════════════════════════════
@@ -65,8 +200,11 @@ class TaskConfig(GenerationConfig):
     )
     
     max_circles: int = Field(
-        default=10,
-        description="Maximum number of circles"
+        default=7,
+        description=(
+            "Maximum number of circles (clamped to what the radius/spacing "
+            "settings can fit; with the defaults 8+ circles never fit)"
+        ),
     )
     
     min_radius: int = Field(
@@ -109,3 +247,51 @@ class TaskConfig(GenerationConfig):
         ],
         description="Available colors for circles"
     )
+    
+    # ══════════════════════════════════════════════════════════════════════════
+    #  FEASIBILITY
+    # ══════════════════════════════════════════════════════════════════════════
+    
+    _feasibility: Optional[FeasibilityReport] = PrivateAttr(default=None)
+    
+    # After-validators run in definition order: quotas see the clamped max_circles
+
+    @model_validator(mode="after")
+    def _check_feasibility(self) -> "TaskConfig":
+        """Reject impossible settings and clamp max_circles before anything is sampled."""
+        report = analyze(self)
+        if report.max_circles < self.max_circles:
+            warnings.warn(
+                f"max_circles={self.max_circles} cannot fit with these settings; "
+                f"clamped to {report.max_circles}"
+            )
+            self.max_circles = report.max_circles
+        if report.fallback_probability > 0.01:
+            warnings.warn(
+                f"Expected scene acceptance rate is {report.attempt_acceptance:.1%}; about "
+                f"{report.fallback_probability:.1%} of tasks will use the constructive row layout"
+            )
+        self._feasibility = report
+        return self
+
+    @model_validator(mode="after")
+    def _check_quotas(self) -> "TaskConfig":
+        """Reject difficulty quotas or presets naming buckets these settings can't produce."""
+        validate_quotas(self)
+        return self
+
+    @model_validator(mode="after")
+    def _check_fps_variants(self) -> "TaskConfig":
+        """Extra video rates must be distinct, positive and differ from video_fps."""
+        bad_rates = [fps for fps in self.video_fps_variants if fps < 1 or fps == self.video_fps]
+        if bad_rates or len(set(self.video_fps_variants)) != len(self.video_fps_variants):
+            raise ValueError(
+                f"video_fps_variants must be distinct positive rates other than "
+                f"video_fps={self.video_fps}, got {self.video_fps_variants}"
+            )
+        return self
+    
+    @property
+    def feasibility(self) -> FeasibilityReport:
+        """Achievable circle counts and expected acceptance rate (see src.feasibility)."""
+        return self._feasibility
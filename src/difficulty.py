@@ -0,0 +1,256 @@
+"""
+Stratified difficulty scheduling.
+
+A difficulty bucket fixes the two things that make a task hard: the circle
+count and how tight the size differences are. Tightness is a band of the
+radius progression ratio the sampler draws from (growth_ratio_range() split
+into TIGHTNESS_BANDS), and the scene's smallest adjacent radius ratio
+(the hardest comparison) always falls inside the band:
+
+    "5-loose"   5 circles, clearly different sizes
+    "7-tight"   7 circles, adjacent sizes close to min_radius_ratio
+
+Quotas (TaskConfig.difficulty_quotas, or a TaskConfig.difficulty preset) are
+apportioned to exact task counts and interleaved over the task indices, so
+every prefix and every contiguous shard is close to the target mix, and the
+bucket of a task depends only on its index. Open-ended runs (num_samples=0,
+e.g. TaskStream or the service) have no counts to apportion; task i then
+takes the bucket at position frac(i * golden ratio) of the cumulative quota
+shares, a low-discrepancy sequence that keeps every window close to the mix.
+The sampler is steered to the
+bucket (fixed count, ratio band, matching constructive fallback) instead of
+sampling freely and discarding scenes, so the quotas are met exactly.
+"""
+
+import bisect
+import heapq
+import math
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .feasibility import SAMPLER_MARGIN, growth_ratio_range, radius_chain, row_fits
+
+# Fractions of the sampler's progression-ratio range, tightest first
+TIGHTNESS_BANDS = {
+    "tight": (0.0, 0.5),
+    "loose": (0.5, 1.0),
+}
+
+# TaskConfig.difficulty presets: bucket weights chosen from the admissible buckets
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+
+# Step of the open-ended (num_samples=0) assignment sequence
+_GOLDEN_STEP = (math.sqrt(5) - 1) / 2
+
+
+class DifficultyBucket:
+    """A circle count and a band of adjacent radius ratios."""
+
+    __slots__ = ("num_circles", "tightness", "ratio_lo", "ratio_hi", "closed")
+
+    def __init__(self, num_circles: int, tightness: str, ratio_range: Tuple[float, float], closed: bool):
+        """
+        Args:
+            num_circles: Exact circle count
+            tightness: Key of TIGHTNESS_BANDS
+            ratio_range: Band of the smallest adjacent radius ratio
+            closed: Whether the band includes its upper end (the loosest band)
+        """
+        self.num_circles = num_circles
+        self.tightness = tightness
+        self.ratio_lo, self.ratio_hi = ratio_range
+        self.closed = closed
+
+    @property
+    def name(self) -> str:
+        return f"{self.num_circles}-{self.tightness}"
+
+    def contains_ratio(self, ratio: float) -> bool:
+        """Whether a smallest adjacent radius ratio falls in this bucket's band."""
+        return self.ratio_lo <= ratio < self.ratio_hi or (self.closed and ratio == self.ratio_hi)
+
+    def __repr__(self) -> str:
+        return f"DifficultyBucket({self.name!r}, ratio {self.ratio_lo:.3f}-{self.ratio_hi:.3f})"
+
+
+def min_adjacent_ratio(radii: Sequence[int]) -> float:
+    """Smallest ratio between neighbouring radii once sorted (inf for one circle)."""
+    ordered = sorted(radii, reverse=True)
+    return min((a / b for a, b in zip(ordered, ordered[1:])), default=math.inf)
+
+
+def make_bucket(config, name: str) -> DifficultyBucket:
+    """Parse a `<count>-<tightness>` bucket name for a config."""
+    count, _, tightness = name.partition("-")
+    if not count.isdigit() or tightness not in TIGHTNESS_BANDS:
+        raise ValueError(
+            f"Unknown difficulty bucket {name!r}; expected '<count>-<tightness>' "
+            f"with tightness one of {list(TIGHTNESS_BANDS)}"
+        )
+    lo, hi = growth_ratio_range(float(config.min_radius_ratio))
+    start, stop = TIGHTNESS_BANDS[tightness]
+    return DifficultyBucket(
+        int(count), tightness, (lo + (hi - lo) * start, lo + (hi - lo) * stop), closed=stop == 1.0
+    )
+
+
+def fallback_starts(config, bucket: DifficultyBucket) -> List[int]:
+    """
+    Smallest radii from which the bucket's constructive row layout fits.
+
+    The row uses the tightest progression of the band (radius_chain at the
+    band's lower ratio), so it is also the bucket's guaranteed fallback.
+    """
+    width, height = config.image_size
+    usable = (width - 2 * SAMPLER_MARGIN, height - 2 * SAMPLER_MARGIN)
+    max_r = int(config.max_radius)
+    ratio = max(bucket.ratio_lo, float(config.min_radius_ratio))
+    starts = []
+    for r in range(int(config.min_radius), max_r + 1):
+        radii = radius_chain(r, bucket.num_circles, int(config.min_radius_gap), ratio)
+        if radii[-1] <= max_r and row_fits(radii, int(config.min_spacing), usable) and (
+            bucket.num_circles == 1 or bucket.contains_ratio(min_adjacent_ratio(radii))
+        ):
+            starts.append(r)
+    return starts
+
+
+def admissible_buckets(config) -> List[DifficultyBucket]:
+    """Buckets within the config's circle counts whose quota can always be met."""
+    buckets = []
+    for n in range(int(config.min_circles), int(config.max_circles) + 1):
+        for tightness in TIGHTNESS_BANDS:
+            bucket = make_bucket(config, f"{n}-{tightness}")
+            if fallback_starts(config, bucket):
+                buckets.append(bucket)
+    return buckets
+
+
+def preset_quotas(config, level: str) -> Dict[str, float]:
+    """
+    Bucket weights of a difficulty preset:
+
+        easy   : loose buckets at the smallest admissible count
+        medium : every admissible bucket equally
+        hard   : tight buckets at the largest admissible count
+    """
+    if level not in DIFFICULTY_LEVELS:
+        raise ValueError(f"Unknown difficulty {level!r}; expected one of {DIFFICULTY_LEVELS}")
+    buckets = admissible_buckets(config)
+    if not buckets:
+        raise ValueError("No difficulty bucket fits these TaskConfig settings")
+    if level == "medium":
+        return {b.name: 1.0 for b in buckets}
+    if level == "easy":
+        n = min(b.num_circles for b in buckets)
+        preferred = "loose"
+    else:
+        n = max(b.num_circles for b in buckets)
+        preferred = "tight"
+    chosen = [b for b in buckets if b.num_circles == n]
+    return {b.name: 1.0 for b in chosen if b.tightness == preferred} or {b.name: 1.0 for b in chosen}
+
+
+def apportion(weights: Dict[str, float], total: int) -> Dict[str, int]:
+    """
+    Exact integer counts summing to `total`, proportional to `weights`
+    (largest remainder; ties go to the earlier key). Counts that already sum
+    to `total` are kept as they are.
+    """
+    if any(w < 0 for w in weights.values()) or not sum(weights.values()) > 0:
+        raise ValueError(f"Difficulty quotas must be non-negative with a positive sum, got {weights}")
+    scale = total / sum(weights.values())
+    exact = {name: w * scale for name, w in weights.items()}
+    counts = {name: int(math.floor(x)) for name, x in exact.items()}
+    by_remainder = sorted(weights, key=lambda name: counts[name] - exact[name])
+    for name in by_remainder[:total - sum(counts.values())]:
+        counts[name] += 1
+    return counts
+
+
+def _positions(bucket: int, count: int) -> Iterator[Tuple[float, int]]:
+    for k in range(count):
+        yield (k + 0.5) / count, bucket
+
+
+class DifficultySchedule:
+    """Deterministic assignment of task indices to difficulty buckets."""
+
+    def __init__(
+        self,
+        buckets: Sequence[DifficultyBucket],
+        counts: Sequence[int],
+        weights: Optional[Sequence[float]] = None,
+    ):
+        """
+        Args:
+            buckets: Buckets, in quota order
+            counts: Exact number of tasks per bucket (their sum is the dataset
+                size; 0 for an open-ended run)
+            weights: Quota shares per bucket for open-ended runs (default: counts)
+
+        The k-th task of bucket b sits at relative position (k + 0.5) / count_b;
+        merging all buckets by position interleaves them evenly (ties go to the
+        earlier bucket).
+        """
+        self.buckets = list(buckets)
+        self.counts = list(counts)
+        self.total = sum(self.counts)
+        weights = list(weights) if weights is not None else self.counts
+        running = 0.0
+        self._cumulative = []
+        for weight in weights:
+            running += weight
+            self._cumulative.append(running / sum(weights))
+        self._assignment = None
+        if self.total:
+            # Each bucket's positions are already sorted; merging streams them
+            # without materializing one tuple per task
+            positions = heapq.merge(*(_positions(b, count) for b, count in enumerate(self.counts)))
+            self._assignment = array("H", (b for _, b in positions))
+
+    @classmethod
+    def from_config(cls, config) -> Optional["DifficultySchedule"]:
+        """Schedule for config.difficulty_quotas or the config.difficulty preset (None if neither)."""
+        quotas = config.difficulty_quotas
+        if quotas is None and config.difficulty is not None:
+            quotas = preset_quotas(config, config.difficulty)
+        if quotas is None:
+            return None
+        buckets = [make_bucket(config, name) for name in quotas]
+        counts = apportion(quotas, int(config.num_samples))
+        return cls(buckets, [counts[b.name] for b in buckets], [quotas[b.name] for b in buckets])
+
+    def bucket_at(self, index: int) -> DifficultyBucket:
+        """
+        Bucket of task `index`. Indices beyond the dataset size wrap around;
+        open-ended runs follow the quota shares (see the module docstring).
+        """
+        if self._assignment is None:
+            position = (index * _GOLDEN_STEP) % 1.0
+            b = bisect.bisect_right(self._cumulative, position)
+            return self.buckets[min(b, len(self.buckets) - 1)]
+        return self.buckets[self._assignment[index % self.total]]
+
+    def quota_counts(self) -> Dict[str, int]:
+        return {b.name: count for b, count in zip(self.buckets, self.counts)}
+
+
+def validate_quotas(config) -> None:
+    """Raise ValueError if the config's quotas or preset name impossible buckets."""
+    quotas = config.difficulty_quotas
+    if quotas is None and config.difficulty is not None:
+        preset_quotas(config, config.difficulty)
+        return
+    if quotas is None:
+        return
+    for name in quotas:
+        make_bucket(config, name)
+    apportion(quotas, int(config.num_samples))
+    admissible = [b.name for b in admissible_buckets(config)]
+    impossible = [name for name, weight in quotas.items() if weight > 0 and name not in admissible]
+    if impossible:
+        raise ValueError(
+            f"Difficulty buckets {impossible} cannot be generated with these settings; "
+            f"admissible buckets: {admissible}"
+        )
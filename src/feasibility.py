@@ -0,0 +1,258 @@
+"""
+Up-front feasibility analysis of TaskConfig.
+
+The scene sampler (TaskGenerator._generate_circles_data) draws a circle
+count, a radius progression and random non-overlapping positions, retrying a
+bounded number of times. With tight settings it can never succeed, and
+that only shows up after the CPU time is spent. analyze() mirrors the sampler's
+constraints to compute, before anything is generated:
+
+    - the circle counts that can actually be produced, and
+    - the expected acceptance rate of one sampling attempt.
+
+TaskConfig runs it on construction: impossible configs are rejected,
+unreachable max_circles are clamped, and low acceptance rates are warned
+about. Every count that passes also fits the constructive row layout the
+sampler falls back to, so generation always returns a valid scene. Reports are
+cached by the geometry fields they depend on, so building many configs (one per
+service request or worker) runs the simulated placement once.
+"""
+
+from functools import lru_cache
+import math
+import random
+from typing import List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+
+# Sampler constants (shared with src/generator.py)
+SAMPLER_MARGIN = 100        # Minimum distance of every circle from the image border
+OVERLAP_PADDING = 10        # Minimum gap between circles in the initial layout
+GENERATION_ATTEMPTS = 30    # Full scene attempts before the constructive fallback
+RADII_ATTEMPTS = 100        # Radius progressions tried per circle count
+PLACEMENT_ATTEMPTS = 150    # Random positions tried per circle
+COUNT_TRIES = 3             # Circle counts tried per attempt (requested, then one lower...)
+MAX_GROWTH_RATIO = 1.35     # Upper bound of the sampled progression ratio
+GROWTH_RATIO_SPAN = 0.18    # ...which is at most min_radius_ratio + this
+
+_GRID = 24              # Grid points per dimension for the radius estimate
+_PLACEMENT_SAMPLES = 6  # Radius sets per count whose placement is simulated
+_PLACEMENT_TRIALS = 16  # Simulated placements per radius set
+
+
+class FeasibilityReport(BaseModel):
+    """Result of analyzing a TaskConfig."""
+    min_circles: int                 # Smallest count that can be produced
+    max_circles: int                 # Largest count that can be produced
+    attempt_acceptance: float        # P(one sampling attempt yields a valid scene)
+    fallback_probability: float      # P(all attempts fail; the row layout is used)
+
+
+def radius_chain(r_start: int, n: int, gap: int, ratio_min: float) -> List[int]:
+    """Smallest increasing radii from r_start honoring min gap and min ratio."""
+    radii = [r_start]
+    for _ in range(n - 1):
+        radii.append(max(radii[-1] + gap, int(math.ceil(radii[-1] * ratio_min))))
+    return radii
+
+
+def snap_radii(
+    raw: List[float],
+    *,
+    min_r: int,
+    max_r: int,
+    gap: int,
+    ratio_min: float,
+    spacing: int,
+    usable_width: int,
+) -> Optional[List[int]]:
+    """
+    Round a radius progression to integers with obvious size gaps.
+
+    Returns radii largest first, or None if they exceed max_r or the final
+    lineup (diameters plus spacing) does not fit in usable_width.
+    """
+    radii = sorted(int(round(x)) for x in raw)
+    fixed: List[int] = []
+    for r in radii:
+        if not fixed:
+            fixed.append(max(min_r, min(max_r, r)))
+        else:
+            next_r = max(fixed[-1] + gap, int(math.ceil(fixed[-1] * ratio_min)))
+            next_r = max(next_r, r)
+            if next_r > max_r:
+                return None
+            fixed.append(next_r)
+
+    fixed_sorted = sorted(fixed, reverse=True)
+    for a, b in zip(fixed_sorted, fixed_sorted[1:]):
+        if a / b < ratio_min - 1e-6:
+            return None
+    total_width = sum(2 * r for r in fixed_sorted) + spacing * (len(fixed_sorted) - 1)
+    if total_width > usable_width:
+        return None
+    return fixed_sorted
+
+
+def growth_ratio_range(ratio_min: float) -> Tuple[float, float]:
+    """Range the sampler draws the progression ratio from."""
+    return ratio_min, min(MAX_GROWTH_RATIO, ratio_min + GROWTH_RATIO_SPAN)
+
+
+def rmin_upper(n: int, ratio: float, max_r: int, avail: float) -> float:
+    """Largest smallest-radius for which an n-term progression fits width and max_r."""
+    geom_sum = (ratio**n - 1.0) / (ratio - 1.0)
+    return min(avail / (2.0 * geom_sum), max_r / (ratio ** (n - 1)))
+
+
+def row_gap(spacing: int) -> int:
+    """Gap between neighbours in the constructive row layout."""
+    return max(spacing, OVERLAP_PADDING)
+
+
+def row_fits(radii: List[int], spacing: int, usable: Tuple[int, int]) -> bool:
+    """Whether radii fit side by side (row gap) and vertically in the usable area."""
+    usable_width, usable_height = usable
+    width = sum(2 * r for r in radii) + row_gap(spacing) * (len(radii) - 1)
+    return width <= usable_width and 2 * max(radii) <= usable_height
+
+
+def _radii_probability(config, n: int, usable_width: int) -> Tuple[float, List[List[int]]]:
+    """Chance one radius draw succeeds for count n, plus sample successful radii."""
+    min_r, max_r = int(config.min_radius), int(config.max_radius)
+    spacing = int(config.min_spacing)
+    avail = usable_width - spacing * (n - 1)
+    if avail <= 0 or n < 1:
+        return 0.0, []
+    lo, hi = growth_ratio_range(float(config.min_radius_ratio))
+    successes, total = 0, 0
+    samples: List[List[int]] = []
+    for i in range(_GRID):
+        ratio = lo + (hi - lo) * (i + 0.5) / _GRID
+        upper = rmin_upper(n, ratio, max_r, avail)
+        for j in range(_GRID):
+            total += 1
+            if upper < min_r:
+                continue
+            r_min = min_r + (upper - min_r) * (j + 0.5) / _GRID
+            radii = snap_radii(
+                [r_min * (ratio**k) for k in range(n)],
+                min_r=min_r, max_r=max_r, gap=int(config.min_radius_gap),
+                ratio_min=float(config.min_radius_ratio), spacing=spacing,
+                usable_width=usable_width,
+            )
+            if radii is not None:
+                successes += 1
+                samples.append(radii)
+    # Spread the kept samples over the whole ratio/size grid
+    step = max(1, len(samples) // _PLACEMENT_SAMPLES)
+    return successes / total, samples[::step][:_PLACEMENT_SAMPLES]
+
+
+def _placement_probability(radii: List[int], usable: Tuple[int, int], rng: random.Random) -> float:
+    """Chance of placing radii (largest first) the way the sampler does, by simulation."""
+    usable_width, usable_height = usable
+    if 2 * max(radii) > min(usable_width, usable_height):
+        return 0.0
+    successes = 0
+    for _ in range(_PLACEMENT_TRIALS):
+        placed: List[Tuple[int, int, int]] = []
+        for r in radii:
+            for _ in range(PLACEMENT_ATTEMPTS):
+                x = rng.randint(r, usable_width - r)
+                y = rng.randint(r, usable_height - r)
+                if all(
+                    (x - cx) ** 2 + (y - cy) ** 2 >= (r + cr + OVERLAP_PADDING) ** 2
+                    for cx, cy, cr in placed
+                ):
+                    placed.append((x, y, r))
+                    break
+            else:
+                break
+        successes += len(placed) == len(radii)
+    return successes / _PLACEMENT_TRIALS
+
+
+class _Geometry(NamedTuple):
+    """The TaskConfig fields analyze() depends on (hashable cache key)."""
+    image_size: Tuple[int, int]
+    min_circles: int
+    max_circles: int
+    min_radius: int
+    max_radius: int
+    min_radius_gap: int
+    min_radius_ratio: float
+    min_spacing: int
+
+
+def analyze(config) -> FeasibilityReport:
+    """
+    Analyze a TaskConfig without sampling anything.
+
+    Raises:
+        ValueError: If no requested circle count can ever be produced.
+    """
+    geometry = _Geometry(
+        tuple(config.image_size), int(config.min_circles), int(config.max_circles),
+        int(config.min_radius), int(config.max_radius), int(config.min_radius_gap),
+        float(config.min_radius_ratio), int(config.min_spacing),
+    )
+    return _analyze(geometry).model_copy()
+
+
+@lru_cache(maxsize=256)
+def _analyze(config: _Geometry) -> FeasibilityReport:
+    width, height = config.image_size
+    usable = (width - 2 * SAMPLER_MARGIN, height - 2 * SAMPLER_MARGIN)
+    lo_n, hi_n = int(config.min_circles), int(config.max_circles)
+    min_r, max_r = int(config.min_radius), int(config.max_radius)
+    if usable[0] <= 0 or usable[1] <= 0:
+        raise ValueError(
+            f"image_size {config.image_size} leaves no room inside the "
+            f"{SAMPLER_MARGIN}px sampling margin"
+        )
+    if not 1 <= lo_n <= hi_n:
+        raise ValueError(f"Need 1 <= min_circles <= max_circles, got {lo_n}..{hi_n}")
+    if not 1 <= min_r <= max_r:
+        raise ValueError(f"Need 1 <= min_radius <= max_radius, got {min_r}..{max_r}")
+
+    # Largest count whose smallest radius progression fits the row layout
+    # (used both by the random sampler's final lineup and the fallback)
+    feasible_max = 0
+    for n in range(1, hi_n + 1):
+        chain = radius_chain(min_r, n, int(config.min_radius_gap), float(config.min_radius_ratio))
+        if chain[-1] > max_r or not row_fits(chain, int(config.min_spacing), usable):
+            break
+        feasible_max = n
+    if feasible_max < lo_n:
+        raise ValueError(
+            f"min_circles={lo_n} cannot fit: with radii {min_r}-{max_r}px, gap "
+            f"{config.min_radius_gap}px, ratio {config.min_radius_ratio} and spacing "
+            f"{config.min_spacing}px, at most {feasible_max} circles fit in "
+            f"{config.image_size[0]}x{config.image_size[1]} (margin {SAMPLER_MARGIN}px)"
+        )
+    hi_n = feasible_max
+
+    # Expected acceptance of one attempt: the requested count is uniform and is
+    # lowered (COUNT_TRIES counts in total) while no radius progression is found
+    radii_cache = {n: _radii_probability(config, n, usable[0]) for n in range(lo_n, hi_n + 1)}
+    # Seeded private RNG: the estimate is deterministic and leaves `random` untouched
+    rng = random.Random(0)
+    place_cache = {
+        n: (sum(_placement_probability(r, usable, rng) for r in samples) / len(samples)) if samples else 0.0
+        for n, (_, samples) in radii_cache.items()
+    }
+    acceptance = 0.0
+    for requested in range(lo_n, hi_n + 1):
+        p_reach = 1.0
+        for n in range(requested, max(lo_n, requested - COUNT_TRIES + 1) - 1, -1):
+            p_radii = 1.0 - (1.0 - radii_cache[n][0]) ** RADII_ATTEMPTS
+            acceptance += p_reach * p_radii * place_cache[n] / (hi_n - lo_n + 1)
+            p_reach *= 1.0 - p_radii
+
+    return FeasibilityReport(
+        min_circles=lo_n,
+        max_circles=hi_n,
+        attempt_acceptance=acceptance,
+        fallback_probability=(1.0 - acceptance) ** GENERATION_ATTEMPTS,
+    )
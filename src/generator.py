@@ -9,16 +9,50 @@
 
 import random
 import tempfile
-import math
+import time
 from pathlib import Path
 from PIL import Image, ImageDraw
 
-from core import BaseGenerator, TaskPair, ImageRenderer
+from core import BaseGenerator, TaskPair, LazyTaskPair, Deferred, ImageRenderer
+from core.layout import task_index
+from core.run_summary import record_task
+from core.svg_utils import SMOOTHSTEP_SPLINE, svg_animate, svg_circle, svg_document
 from core.video_utils import VideoGenerator
 from .config import TaskConfig
 from .prompts import get_prompt
+from .scene import Scene, final_lineup
+from .near_duplicates import SceneIndex
+from .animation import Animation, animation_timing, smoothstep
+from .difficulty import DifficultyBucket, DifficultySchedule, fallback_starts, min_adjacent_ratio
+from .feasibility import (
+    COUNT_TRIES, GENERATION_ATTEMPTS, OVERLAP_PADDING, PLACEMENT_ATTEMPTS, RADII_ATTEMPTS,
+    SAMPLER_MARGIN, growth_ratio_range, radius_chain, rmin_upper, row_fits, row_gap, snap_radii,
+)
 
 TARGET_DATASET_SIZE = 10_000
+OUTLINE_WIDTH = 2  # Circle outline width in pixels at config.image_size
+DEDUP_ATTEMPTS = 200  # Scenes sampled per task while looking for an unseen one
+
+
+class SamplingBudget:
+    """Scene-sampling attempts (and optionally wall-clock time) left for one task."""
+    
+    __slots__ = ("attempts_left", "deadline", "exceeded")
+    
+    def __init__(self, max_attempts: int | None, max_seconds: float | None):
+        self.attempts_left = max_attempts
+        self.deadline = time.perf_counter() + max_seconds if max_seconds is not None else None
+        self.exceeded = False
+    
+    def spend(self) -> bool:
+        """Take one attempt; False (and exceeded) once the budget is used up."""
+        if not self.exceeded:
+            if self.attempts_left is not None:
+                self.attempts_left -= 1
+                self.exceeded = self.attempts_left < 0
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                self.exceeded = True
+        return not self.exceeded
 
 
 class TaskGenerator(BaseGenerator):
@@ -32,62 +66,156 @@ class TaskGenerator(BaseGenerator):
     
     def __init__(self, config: TaskConfig):
         super().__init__(config)
-        self.renderer = ImageRenderer(image_size=config.image_size)
+        palette = None
+        if config.palette_png:
+            # Scenes only ever contain the background, outlines and circle colors
+            palette = ImageRenderer.build_palette(
+                [(255, 255, 255), (0, 0, 0)] + list(config.circle_colors)
+            )
+        self.renderer = ImageRenderer(image_size=config.image_size, palette=palette)
+        
+        # Native renderers for the extra output resolutions, keyed by width.
+        # Scenes are sampled at image_size and scaled, never resampled.
+        self.variant_renderers: dict[int, ImageRenderer] = {}
+        base_width, base_height = config.image_size
+        for width in config.output_resolutions:
+            if width <= 0:
+                raise ValueError(f"output_resolutions must be positive, got {width}")
+            if width == base_width:
+                continue
+            height = round(base_height * width / base_width)
+            self.variant_renderers[width] = ImageRenderer(image_size=(width, height), palette=palette)
 
         # Best-effort deduplication within a run
         self.seen_combinations = set()
+        self.scene_index = None
+        if config.near_duplicate_tolerance is not None:
+            self.scene_index = SceneIndex(config.near_duplicate_tolerance, config.image_size[0])
+        self.run_stats.update(
+            budget_overruns=0, fallback_scenes=0, near_duplicates=0,
+            sample_seconds=0.0, render_seconds=0.0,
+        )
+        # Stratified difficulty: task index -> bucket (None = free sampling)
+        self.schedule = DifficultySchedule.from_config(config)
         
         # Initialize video generator if enabled (uses opencv to create MP4)
         self.video_generator = None
         if config.generate_videos and VideoGenerator.is_available():
             self.video_generator = VideoGenerator(fps=config.video_fps, output_format="mp4")
     
+    def reset_dedup(self) -> None:
+        """Forget the scenes seen so far (exact and near-duplicate index)."""
+        self.seen_combinations.clear()
+        if self.scene_index is not None:
+            self.scene_index = SceneIndex(self.config.near_duplicate_tolerance, self.config.image_size[0])
+    
     def generate_task_pair(self, task_id: str) -> TaskPair:
         """Generate one task pair."""
-        task_data = None
+        started = time.perf_counter()
+        with self.stage("sample"):
+            scene = self._sample_scene(task_id)
+        
+        with self.stage("render"):
+            pair = self._render_task_pair(task_id, scene)
+        record_task(self.run_stats, time.perf_counter() - started)
+        return pair
+    
+    def _difficulty_bucket(self, task_id: str) -> DifficultyBucket | None:
+        """The scheduled difficulty bucket of a task (None without quotas)."""
+        if self.schedule is None:
+            return None
+        return self.schedule.bucket_at(task_index(task_id))
+    
+    def _sample_scene(self, task_id: str) -> Scene:
+        """Sample a scene not seen before in this run, within the task's sampling budget."""
+        budget = SamplingBudget(self.config.task_attempt_budget, self.config.task_time_budget)
+        bucket = self._difficulty_bucket(task_id)
+        scene = None
         sig = None
-        for _ in range(200):
-            candidate = self._generate_circles_data()
+        for _ in range(DEDUP_ATTEMPTS):
+            candidate = self._generate_circles_data(budget, bucket)
             candidate_sig = self._task_signature(candidate)
-            if candidate_sig not in self.seen_combinations:
-                task_data = candidate
+            if candidate_sig not in self.seen_combinations and not self._is_near_duplicate(candidate):
+                scene = candidate
                 sig = candidate_sig
                 break
-        if task_data is None:
-            task_data = self._generate_circles_data()
-            sig = self._task_signature(task_data)
+            if budget.exceeded:
+                break
+        if scene is None:
+            if budget.exceeded:
+                # Out of budget: accept the (fallback) duplicate rather than keep sampling
+                scene, sig = candidate, candidate_sig
+            else:
+                scene = self._generate_circles_data(budget, bucket)
+                sig = self._task_signature(scene)
         self.seen_combinations.add(sig)
+        if self.scene_index is not None:
+            self.scene_index.add(task_id, scene)
+        if budget.exceeded:
+            self.run_stats["budget_overruns"] += 1
+        if bucket is not None:
+            key = f"difficulty_{bucket.name}"
+            self.run_stats[key] = self.run_stats.get(key, 0) + 1
+        return scene
+    
+    def _render_task_pair(self, task_id: str, scene: Scene) -> TaskPair:
+        """Build the task pair (and its resolution variants) for a sampled scene."""
+        prompt = get_prompt("default", num_circles=scene.num_circles)
         
-        first_image = self._render_initial_state(task_data)
-        final_image = self._render_final_state(task_data)
-        
-        video_path = None
-        if self.config.generate_videos and self.video_generator:
-            video_path = self._generate_video(first_image, final_image, task_id, task_data)
+        # Metadata keeps only non-derivable fields (sort order, count, line_y and
+        # circumference all follow from the circles)
+        bucket = self._difficulty_bucket(task_id)
+        metadata = self._build_metadata(task_id, self._task_parameters(scene, bucket))
         
-        prompt = get_prompt("default", num_circles=int(task_data.get("num_circles", 0)))
+        make_video = bool(
+            self.config.generate_videos and self.video_generator and not self.config.parametric_video
+        )
+        pair = self._build_task_pair(
+            task_id, scene, prompt, metadata, self.renderer, make_video, self.config.keep_frames
+        )
+        if self.variant_renderers:
+            pair.variants = {}
+            for width, renderer in self.variant_renderers.items():
+                scaled = scene.scaled(width / self.config.image_size[0])
+                pair.variants[width] = self._build_task_pair(
+                    task_id, scaled, prompt, self._build_metadata(task_id, self._task_parameters(scaled, bucket)),
+                    renderer, make_video, keep_frames=False,
+                )
+        return pair
+    
+    @staticmethod
+    def _task_parameters(scene: Scene, bucket: DifficultyBucket | None) -> dict:
+        """metadata.json parameters: the circles, plus the difficulty bucket if scheduled."""
+        parameters = scene.to_metadata()
+        if bucket is not None:
+            parameters["difficulty"] = bucket.name
+        return parameters
+    
+    def _build_task_pair(
+        self,
+        task_id: str,
+        scene: Scene,
+        prompt: str,
+        metadata: dict,
+        renderer: ImageRenderer,
+        make_video: bool,
+        keep_frames: bool,
+    ) -> TaskPair:
+        """Render a scene (already in the renderer's coordinates) into a task pair."""
+        if self.config.lazy_render:
+            return self._lazy_task_pair(task_id, scene, prompt, metadata, renderer, make_video, keep_frames)
         
-        # Remove redundant fields from task_data for metadata
-        # Remove 'signature' (redundant), 'sorted_circles' (derivable from circles by circumference)
-        # Remove 'num_circles' (derivable as len(circles)), 'line_y' (derivable from final_y)
-        # Remove 'circumference' (derivable from radius: 2 * π * radius)
-        optimized_task_data = {
-            "circles": [
-                {
-                    "id": circle["id"],
-                    "radius": circle["radius"],
-                    "color": list(circle["color"]),
-                    "initial_position": [circle["x"], circle["y"]],
-                    "final_position": [circle["final_x"], circle["final_y"]],
-                }
-                for circle in task_data["circles"]
-            ],
-        }
-
-        # Build metadata
-        metadata = self._build_metadata(task_id, optimized_task_data)
+        first_image = self._render_initial_state(scene, renderer)
+        final_image = self._render_final_state(scene, renderer)
         
+        frames = None
+        if make_video or keep_frames:
+            frames = self._create_animation_frames(scene, renderer)
         
+        video_path = None
+        video_variants = None
+        if make_video:
+            video_path, video_variants = self._generate_videos(task_id, scene, frames, renderer)
         
         return TaskPair(
             task_id=task_id,
@@ -96,64 +224,113 @@ class TaskGenerator(BaseGenerator):
             first_image=first_image,
             final_image=final_image,
             ground_truth_video=video_path,
-            metadata=metadata
+            video_variants=video_variants,
+            metadata=metadata,
+            frames=frames if keep_frames else None,
+            svg=self._svg_documents(scene, renderer),
+            animation=self._animation(scene, renderer).to_dict() if self.config.parametric_video else None,
+        )
+    
+    def _lazy_task_pair(
+        self,
+        task_id: str,
+        scene: Scene,
+        prompt: str,
+        metadata: dict,
+        renderer: ImageRenderer,
+        make_video: bool,
+        keep_frames: bool,
+    ) -> LazyTaskPair:
+        """Task pair whose images, frames and video render on first access."""
+        frames = Deferred(lambda: self._create_animation_frames(scene, renderer))
+        video = None
+        video_variants = None
+        if make_video:
+            # One encoding pass produces the video and its frame-rate variants
+            videos = Deferred(lambda: self._generate_videos(task_id, scene, frames(), renderer))
+            video = Deferred(lambda: videos()[0])
+            if self.config.video_fps_variants:
+                video_variants = Deferred(lambda: videos()[1])
+        return LazyTaskPair(
+            task_id=task_id,
+            domain=self.config.domain,
+            prompt=prompt,
+            first_image=Deferred(lambda: self._render_initial_state(scene, renderer)),
+            final_image=Deferred(lambda: self._render_final_state(scene, renderer)),
+            ground_truth_video=video,
+            video_variants=video_variants,
+            metadata=metadata,
+            frames=frames if keep_frames else None,
+            svg=self._svg_documents(scene, renderer),
+            animation=self._animation(scene, renderer).to_dict() if self.config.parametric_video else None,
         )
 
-    def _task_signature(self, task_data: dict) -> tuple:
+    def _is_near_duplicate(self, scene: Scene) -> bool:
+        """Whether the LSH index (if enabled) already holds a near-identical scene."""
+        if self.scene_index is None or not self.scene_index.query(scene):
+            return False
+        self.run_stats["near_duplicates"] += 1
+        return True
+    
+    def _task_signature(self, scene: Scene) -> tuple:
         # Signature reflects visible content: count + radii + start positions + colors + final order.
-        circles = task_data["circles"]
-        # Use rounded ints for stability.
-        start = tuple(sorted((int(c["id"]), int(c["x"]), int(c["y"]), int(c["radius"]), tuple(c["color"])) for c in circles))
-        order = tuple(int(c["id"]) for c in task_data["sorted_circles"])
-        return (int(task_data["num_circles"]), start, order, int(task_data["line_y"]))
+        return scene.signature()
     
-    def _generate_circles_data(self) -> dict:
-        """Generate non-overlapping circles with random positions and radii."""
+    def _generate_circles_data(
+        self, budget: SamplingBudget | None = None, bucket: DifficultyBucket | None = None
+    ) -> Scene:
+        """
+        Generate non-overlapping circles with random positions and radii.
+        
+        Each rejection-sampling attempt spends one unit of `budget`; once it is
+        exhausted the bounded constructive layout is used instead. With a
+        difficulty `bucket`, the circle count and adjacent radius ratios are
+        the bucket's (the count is never reduced).
+        """
         width, height = self.config.image_size
-        margin = 100
+        margin = SAMPLER_MARGIN
         spacing = int(self.config.min_spacing)
         
-        max_attempts_generation = 30  # Reduced from 100 to improve performance
-        
-        for gen_attempt in range(max_attempts_generation):
-            requested = random.randint(self.config.min_circles, self.config.max_circles)
+        for gen_attempt in range(GENERATION_ATTEMPTS):
+            if budget is not None and not budget.spend():
+                break
+            if bucket is not None:
+                requested = bucket.num_circles
+            else:
+                requested = random.randint(self.config.min_circles, self.config.max_circles)
 
             # Enforce visually obvious size gaps; if not feasible with requested count,
             # gradually reduce the count until we can construct a valid radius set.
             # Limit reduction attempts to avoid excessive computation
             radii = None
             num_circles = requested
-            max_reduction_attempts = 3  # Limit reduction attempts
             reduction_count = 0
-            while num_circles >= int(self.config.min_circles) and reduction_count < max_reduction_attempts:
-                radii = self._sample_radii_with_obvious_gaps(num_circles, width=width, margin=margin, spacing=spacing)
-                if radii is not None:
+            while num_circles >= int(self.config.min_circles) and reduction_count < COUNT_TRIES:
+                radii = self._sample_radii_with_obvious_gaps(
+                    num_circles, width=width, margin=margin, spacing=spacing, bucket=bucket
+                )
+                if radii is not None or bucket is not None:
                     break
                 num_circles -= 1
                 reduction_count += 1
             if radii is None:
                 continue
             
-            circles = []
-            max_attempts = 150  # Further reduced from 300 to improve performance
-            
+            xs: list[int] = []
+            ys: list[int] = []
+            placed_radii: list[int] = []
+            colors: list[tuple] = []
             for radius in radii:
                 placed = False
-                for attempt in range(max_attempts):
+                for attempt in range(PLACEMENT_ATTEMPTS):
                     x = random.randint(margin + radius, width - margin - radius)
                     y = random.randint(margin + radius, height - margin - radius)
                     
-                    if not self._check_overlap(x, y, radius, circles):
-                        color = random.choice(self.config.circle_colors)
-                        circumference = 2 * math.pi * radius
-                        circles.append({
-                            'x': x,
-                            'y': y,
-                            'radius': radius,
-                            'color': color,
-                            'circumference': circumference,
-                            'id': len(circles)
-                        })
+                    if not self._check_overlap(x, y, radius, xs, ys, placed_radii):
+                        xs.append(x)
+                        ys.append(y)
+                        placed_radii.append(radius)
+                        colors.append(tuple(random.choice(self.config.circle_colors)))
                         placed = True
                         break
                 
@@ -162,39 +339,99 @@ class TaskGenerator(BaseGenerator):
                     break
             
             # Early exit if not all circles were placed
-            if len(circles) != len(radii):
+            if len(placed_radii) != len(radii):
                 continue
             
-            sorted_circles = sorted(circles, key=lambda c: c['circumference'], reverse=True)
-            
-            line_y = height // 2
-            total_width = sum(c['radius'] * 2 for c in sorted_circles) + spacing * (len(sorted_circles) - 1)
-            
-            if total_width <= width - 2 * margin:
-                start_x = (width - total_width) // 2
-                
-                current_x = start_x
-                for circle in sorted_circles:
-                    circle['final_x'] = current_x + circle['radius']
-                    circle['final_y'] = line_y
-                    current_x += circle['radius'] * 2 + spacing
-                
-                return {
-                    'circles': circles,
-                    'sorted_circles': sorted_circles,
-                    'line_y': line_y,
-                    'num_circles': num_circles
-                }
+            scene = self._sorted_scene(placed_radii, colors, xs, ys)
+            if scene is not None:
+                return scene
+        
+        # TaskConfig's feasibility analysis guarantees this layout fits
+        self.run_stats["fallback_scenes"] += 1
+        return self._construct_circles_data(bucket)
+    
+    def _sorted_scene(self, radii: list[int], colors: list, xs: list, ys: list) -> Scene | None:
+        """Scene with the final lineup computed, or None if the lineup doesn't fit."""
+        width = self.config.image_size[0]
+        spacing = int(self.config.min_spacing)
+        
+        total_width = sum(r * 2 for r in radii) + spacing * (len(radii) - 1)
+        if total_width > width - 2 * SAMPLER_MARGIN:
+            return None
+        
+        # Sorted by circumference (2 * pi * r), i.e. by radius, largest first
+        order, final_xs, line_y = final_lineup(radii, self.config.image_size, spacing)
+        return Scene(
+            radii=radii,
+            colors=colors,
+            xs=xs,
+            ys=ys,
+            final_xs=final_xs,
+            final_ys=[line_y] * len(radii),
+            line_y=line_y,
+            order=order,
+        )
+    
+    def _construct_circles_data(self, bucket: DifficultyBucket | None = None) -> Scene:
+        """
+        Constructive fallback: circles in a shuffled row at random heights.
+        
+        Neighbours are row_gap() apart horizontally, so circles can't overlap, and
+        the radii are the minimal gap/ratio progression from a random start
+        (with a difficulty `bucket`: the bucket's count and tightest ratio).
+        """
+        width, height = self.config.image_size
+        usable = (width - 2 * SAMPLER_MARGIN, height - 2 * SAMPLER_MARGIN)
+        min_r, max_r = int(self.config.min_radius), int(self.config.max_radius)
+        gap, ratio_min = int(self.config.min_radius_gap), float(self.config.min_radius_ratio)
+        spacing = int(self.config.min_spacing)
+        
+        def chain(r_start: int, n: int) -> list[int]:
+            return radius_chain(r_start, n, gap, ratio_min)
         
-        return {
-            'circles': circles,
-            'sorted_circles': sorted_circles,
-            'line_y': line_y,
-            'num_circles': num_circles
-        }
+        def fits(radii: list[int]) -> bool:
+            return radii[-1] <= max_r and row_fits(radii, spacing, usable)
+        
+        if bucket is not None:
+            # Admissible buckets (see src.difficulty) always have a start
+            n = bucket.num_circles
+            ratio_min = max(ratio_min, bucket.ratio_lo)
+            starts = fallback_starts(self.config, bucket)
+        else:
+            counts = [
+                n for n in range(int(self.config.min_circles), int(self.config.max_circles) + 1)
+                if fits(chain(min_r, n))
+            ]
+            if not counts:
+                raise RuntimeError("No circle count fits; TaskConfig feasibility analysis was bypassed")
+            n = random.randint(counts[0], counts[-1])
+            starts = [r for r in range(min_r, max_r + 1) if fits(chain(r, n))]
+        if not starts:
+            raise RuntimeError(f"No constructive layout for {bucket}; TaskConfig validation was bypassed")
+        radii = chain(random.choice(starts), n)
+        random.shuffle(radii)
+        
+        xs, ys, colors = [], [], []
+        row_width = sum(2 * r for r in radii) + row_gap(spacing) * (n - 1)
+        x = SAMPLER_MARGIN + random.randint(0, usable[0] - row_width)
+        for r in radii:
+            xs.append(x + r)
+            ys.append(random.randint(SAMPLER_MARGIN + r, height - SAMPLER_MARGIN - r))
+            colors.append(tuple(random.choice(self.config.circle_colors)))
+            x += 2 * r + row_gap(spacing)
+        
+        scene = self._sorted_scene(radii, colors, xs, ys)
+        if scene is None:
+            raise RuntimeError("Constructive layout does not fit; TaskConfig feasibility analysis was bypassed")
+        return scene
 
-    def _sample_radii_with_obvious_gaps(self, n: int, *, width: int, margin: int, spacing: int) -> list[int] | None:
-        """Sample radii so adjacent sizes are clearly different AND final lineup fits."""
+    def _sample_radii_with_obvious_gaps(
+        self, n: int, *, width: int, margin: int, spacing: int, bucket: DifficultyBucket | None = None
+    ) -> list[int] | None:
+        """
+        Sample radii so adjacent sizes are clearly different AND final lineup fits
+        (and, with a difficulty `bucket`, the smallest adjacent ratio is in its band).
+        """
         min_r = int(self.config.min_radius)
         max_r = int(self.config.max_radius)
         gap = int(self.config.min_radius_gap)
@@ -206,61 +443,36 @@ class TaskGenerator(BaseGenerator):
             return None
 
         # Try a geometric progression (ensures visible differences).
-        for _ in range(100):  # Reduced from 300 to improve performance
-            ratio = random.uniform(ratio_min, min(1.35, ratio_min + 0.18))
-            # Geometric sum for radii (smallest -> largest)
-            geom_sum = (ratio**n - 1.0) / (ratio - 1.0)
-            # From width constraint: 2 * r_min * geom_sum <= avail
-            rmin_upper_from_width = avail / (2.0 * geom_sum)
-            # From max radius constraint: r_min * ratio^(n-1) <= max_r
-            rmin_upper_from_max = max_r / (ratio ** (n - 1))
-            rmin_upper = min(rmin_upper_from_width, rmin_upper_from_max)
-            if rmin_upper < min_r:
-                continue
-
-            r_min = random.uniform(min_r, rmin_upper)
-            raw = [r_min * (ratio**i) for i in range(n)]
-            # Convert to ints, then enforce strict increasing (unique) with minimum gap.
-            radii = [int(round(x)) for x in raw]
-            radii.sort()
-            fixed: list[int] = []
-            for r in radii:
-                if not fixed:
-                    fixed.append(max(min_r, min(max_r, r)))
-                else:
-                    next_r = max(fixed[-1] + gap, int(math.ceil(fixed[-1] * ratio_min)))
-                    next_r = max(next_r, r)
-                    if next_r > max_r:
-                        fixed = []
-                        break
-                    fixed.append(next_r)
-            if not fixed:
-                continue
-
-            # Now we have increasing radii; convert to list for placement (unsorted ok)
-            # and verify adjacent ratio in the final sorted order.
-            fixed_sorted = sorted(fixed, reverse=True)
-            ok_ratio = True
-            for a, b in zip(fixed_sorted, fixed_sorted[1:]):
-                if a / b < ratio_min - 1e-6:
-                    ok_ratio = False
-                    break
-            if not ok_ratio:
+        ratio_lo, ratio_hi = growth_ratio_range(ratio_min)
+        if bucket is not None:
+            ratio_lo, ratio_hi = max(ratio_lo, bucket.ratio_lo), min(ratio_hi, bucket.ratio_hi)
+        for _ in range(RADII_ATTEMPTS):
+            ratio = random.uniform(ratio_lo, ratio_hi)
+            # r_min bound from the width (2 * r_min * geometric sum <= avail)
+            # and max radius (r_min * ratio^(n-1) <= max_r) constraints
+            upper = rmin_upper(n, ratio, max_r, avail)
+            if upper < min_r:
                 continue
 
-            total_width = sum(2 * r for r in fixed_sorted) + spacing * (n - 1)
-            if total_width > width - 2 * margin:
-                continue
-            return fixed_sorted  # return largest->smallest
+            r_min = random.uniform(min_r, upper)
+            # Round to ints with strictly increasing, clearly different sizes;
+            # returned largest->smallest, or None if they don't fit
+            radii = snap_radii(
+                [r_min * (ratio**i) for i in range(n)],
+                min_r=min_r, max_r=max_r, gap=gap, ratio_min=ratio_min,
+                spacing=spacing, usable_width=width - 2 * margin,
+            )
+            if radii is not None and (bucket is None or bucket.contains_ratio(min_adjacent_ratio(radii))):
+                return radii
 
         return None
 
-    def _sample_unique_radius(self, circles: list) -> int:
+    def _sample_unique_radius(self, radii: list[int]) -> int:
         """Sample a radius that keeps circumference ordering unique."""
         min_r = int(self.config.min_radius)
         max_r = int(self.config.max_radius)
         gap = int(self.config.min_radius_gap)
-        existing = [int(c["radius"]) for c in circles]
+        existing = [int(r) for r in radii]
         # Try random draws first
         for _ in range(200):
             r = random.randint(min_r, max_r)
@@ -277,59 +489,109 @@ class TaskGenerator(BaseGenerator):
                 return r
         return random.randint(min_r, max_r)
     
-    def _check_overlap(self, x: int, y: int, radius: int, existing_circles: list) -> bool:
-        """Check if a circle overlaps with existing circles."""
-        padding = 10
-        # Use squared distances to avoid expensive sqrt() calls
-        for circle in existing_circles:
-            dx = x - circle['x']
-            dy = y - circle['y']
+    def _check_overlap(self, x: int, y: int, radius: int, xs: list, ys: list, radii: list) -> bool:
+        """Check if a circle overlaps with already placed circles."""
+        # Use squared distances to avoid expensive sqrt() calls. The gap is the
+        # one src.feasibility assumes when estimating the acceptance rate.
+        for cx, cy, cr in zip(xs, ys, radii):
+            dx = x - cx
+            dy = y - cy
             distance_sq = dx * dx + dy * dy
-            min_dist_sq = (radius + circle['radius'] + padding) ** 2
+            min_dist_sq = (radius + cr + OVERLAP_PADDING) ** 2
             if distance_sq < min_dist_sq:
                 return True
         return False
     
-    def _render_initial_state(self, task_data: dict) -> Image.Image:
+    def _outline_width(self, renderer: ImageRenderer | None = None) -> int:
+        """Circle outline width, scaled with the output resolution."""
+        if renderer is None or renderer is self.renderer:
+            return OUTLINE_WIDTH
+        scale = renderer.image_size[0] / self.config.image_size[0]
+        return max(1, round(OUTLINE_WIDTH * scale))
+    
+    def _render_initial_state(self, scene: Scene, renderer: ImageRenderer | None = None) -> Image.Image:
         """Render circles in random positions."""
-        width, height = self.config.image_size
-        img = Image.new('RGB', (width, height), color=(255, 255, 255))
+        renderer = renderer or self.renderer
+        img = renderer.create_blank_image()
         draw = ImageDraw.Draw(img)
+        outline = self._outline_width(renderer)
         
-        for circle in task_data['circles']:
-            x, y, r = circle['x'], circle['y'], circle['radius']
-            draw.ellipse([x - r, y - r, x + r, y + r], fill=circle['color'], outline=(0, 0, 0), width=2)
+        for _, x, y, r, color in scene.circles():
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=color, outline=(0, 0, 0), width=outline)
         
         return img
     
-    def _render_final_state(self, task_data: dict) -> Image.Image:
+    def _render_final_state(self, scene: Scene, renderer: ImageRenderer | None = None) -> Image.Image:
         """Render circles sorted by circumference on horizontal line."""
-        width, height = self.config.image_size
-        img = Image.new('RGB', (width, height), color=(255, 255, 255))
+        renderer = renderer or self.renderer
+        img = renderer.create_blank_image()
         draw = ImageDraw.Draw(img)
+        outline = self._outline_width(renderer)
         
-        line_y = task_data['line_y']
-        
-        for circle in task_data['sorted_circles']:
-            x, y, r = circle['final_x'], circle['final_y'], circle['radius']
-            draw.ellipse([x - r, y - r, x + r, y + r], fill=circle['color'], outline=(0, 0, 0), width=2)
+        for _, x, y, r, color in scene.final_circles():
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=color, outline=(0, 0, 0), width=outline)
         
         return img
     
+    def _svg_circle(self, x: float, y: float, r: float, color: tuple, outline: int, children=()) -> str:
+        """Circle matching the raster: PIL fills pixels x-r..x+r with the outline inside."""
+        return svg_circle(
+            x + 0.5, y + 0.5, r + 0.5 - outline / 2, color,
+            stroke=(0, 0, 0), stroke_width=outline, children=children,
+        )
+    
+    def _svg_documents(self, scene: Scene, renderer: ImageRenderer) -> dict | None:
+        """SVG exports built straight from the scene (see svg_frames / svg_animation)."""
+        if not (self.config.svg_frames or self.config.svg_animation):
+            return None
+        outline = self._outline_width(renderer)
+        documents = {}
+        if self.config.svg_frames:
+            documents["first_frame.svg"] = svg_document(renderer.image_size, [
+                self._svg_circle(x, y, r, color, outline) for _, x, y, r, color in scene.circles()
+            ])
+            documents["final_frame.svg"] = svg_document(renderer.image_size, [
+                self._svg_circle(x, y, r, color, outline) for _, x, y, r, color in scene.final_circles()
+            ])
+        if self.config.svg_animation:
+            # Same timeline as the video: frame k shows at k / fps, and the
+            # transition eases (smoothstep) from frame `hold` to `hold + transition - 1`
+            hold_frames, transition_frames = self._animation_timing()
+            total_frames = 2 * hold_frames + transition_frames
+            key_times = [
+                0,
+                hold_frames / total_frames,
+                (hold_frames + transition_frames - 1) / total_frames,
+                1,
+            ]
+            splines = ["0 0 1 1", SMOOTHSTEP_SPLINE, "0 0 1 1"]
+            duration = total_frames / self.config.video_fps
+            elements = []
+            for x, y, r, color, fx, fy in zip(
+                scene.xs, scene.ys, scene.radii, scene.colors, scene.final_xs, scene.final_ys
+            ):
+                animations = [
+                    svg_animate(attr, [start + 0.5, start + 0.5, end + 0.5, end + 0.5],
+                                key_times, duration, splines)
+                    for attr, start, end in (("cx", x, fx), ("cy", y, fy))
+                ]
+                elements.append(self._svg_circle(x, y, r, color, outline, animations))
+            documents["ground_truth.svg"] = svg_document(renderer.image_size, elements)
+        return documents
+    
     def _generate_video(
         self,
-        first_image: Image.Image,
-        final_image: Image.Image,
         task_id: str,
-        task_data: dict
+        scene: Scene,
+        frames: list | None = None,
+        renderer: ImageRenderer | None = None,
     ) -> str | None:
         """Generate ground truth video showing circles moving to sorted positions."""
-        temp_dir = Path(tempfile.gettempdir()) / f"{self.config.domain}_videos"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        video_path = temp_dir / f"{task_id}_ground_truth.mp4"
+        video_path = self._video_path(task_id, renderer)
         
         # Create animation frames
-        frames = self._create_animation_frames(task_data)
+        if frames is None:
+            frames = self._create_animation_frames(scene, renderer)
         
         result = self.video_generator.create_video_from_frames(
             frames,
@@ -337,68 +599,128 @@ class TaskGenerator(BaseGenerator):
         )
         
         return str(result) if result else None
-
-    def _create_animation_frames(self, task_data: dict) -> list:
-        """Create animation frames showing circles moving to sorted positions."""
-        width, height = self.config.image_size
-        # Hard cap: keep video within 5 seconds.
-        duration_s = min(float(self.config.video_duration), 5.0)
-        total_frames = int(self.config.video_fps * duration_s)
-        total_frames = max(3, total_frames)
-        hold_frames = int(total_frames * 0.1)
-        transition_frames = total_frames - 2 * hold_frames
-        
-        frames = []
-        
-        initial_frame = self._render_initial_state(task_data)
-        for _ in range(hold_frames):
-            frames.append(initial_frame)
-        
-        circles = task_data['circles']
-        sorted_circles = task_data['sorted_circles']
-        
-        circle_map = {c['id']: c for c in circles}
-        for sorted_circle in sorted_circles:
-            original_circle = circle_map[sorted_circle['id']]
-            original_circle['start_x'] = original_circle['x']
-            original_circle['start_y'] = original_circle['y']
-            original_circle['end_x'] = sorted_circle['final_x']
-            original_circle['end_y'] = sorted_circle['final_y']
-        
-        # Optimize: reduce frame count for faster generation
-        # Use fewer frames but maintain smooth animation
-        if transition_frames > 40:
-            transition_frames = 40  # Cap at 40 frames for performance
+    
+    def _generate_videos(
+        self,
+        task_id: str,
+        scene: Scene,
+        frames: list | None = None,
+        renderer: ImageRenderer | None = None,
+    ) -> tuple[str | None, dict[int, str] | None]:
+        """
+        Generate the ground truth video and one video per config.video_fps_variants rate.
         
-        # Pre-compute circle positions for all frames
-        circle_positions = []
-        for i in range(transition_frames):
-            progress = i / (transition_frames - 1) if transition_frames > 1 else 1.0
-            ease_progress = self._ease_in_out(progress)
-            positions = []
-            for circle in circles:
-                current_x = circle['start_x'] + (circle['end_x'] - circle['start_x']) * ease_progress
-                current_y = circle['start_y'] + (circle['end_y'] - circle['start_y']) * ease_progress
-                positions.append((current_x, current_y))
-            circle_positions.append(positions)
+        Every rate re-samples the same eased motion, with the same duration,
+        at its own timestamps; frames whose pixels coincide with an already
+        rendered frame (holds, shared progress values) are reused, and all
+        videos are encoded in one pass. Returns (video path, {fps: video path}, or None without variants).
+        """
+        if not self.config.video_fps_variants:
+            return self._generate_video(task_id, scene, frames=frames, renderer=renderer), None
+        renderer = renderer or self.renderer
+        if frames is None:
+            frames = self._create_animation_frames(scene, renderer)
+        animation = self._animation(scene, renderer)
+        cache = {self._frame_key(animation, k): frame for k, frame in enumerate(frames)}
+        streams = [(frames, self._video_path(task_id, renderer), self.config.video_fps)]
+        for fps in self.config.video_fps_variants:
+            streams.append((
+                self._create_animation_frames(scene, renderer, fps=fps, cache=cache),
+                self._video_path(task_id, renderer, fps),
+                fps,
+            ))
+        paths = self.video_generator.create_videos_from_frames(streams)
+        return str(paths[0]), {fps: str(path) for fps, path in zip(self.config.video_fps_variants, paths[1:])}
+    
+    def _video_path(self, task_id: str, renderer: ImageRenderer | None = None, fps: int | None = None) -> Path:
+        """Temporary path of a task's video (per output width and frame-rate variant)."""
+        temp_dir = (self.temp_dir or Path(tempfile.gettempdir())) / f"{self.config.domain}_videos"
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        suffix = ""
+        if renderer is not None and renderer is not self.renderer:
+            suffix = f"_{renderer.image_size[0]}px"
+        if fps is not None:
+            suffix += f"_{fps}fps"
+        return temp_dir / f"{task_id}_ground_truth{suffix}.mp4"
+
+    def _animation_timing(self) -> tuple[int, int]:
+        """Return (hold_frames, transition_frames) of the ground-truth animation."""
+        # Hard cap: keep video within 5 seconds and 40 moving frames (see src.animation)
+        return animation_timing(self.config.video_fps, self.config.video_duration)
+    
+    def animation_frame_count(self) -> int:
+        """Number of frames in every ground-truth animation."""
+        hold_frames, transition_frames = self._animation_timing()
+        return 2 * hold_frames + transition_frames
+    
+    def _create_animation_frames(
+        self,
+        scene: Scene,
+        renderer: ImageRenderer | None = None,
+        fps: int | None = None,
+        cache: dict | None = None,
+    ) -> list:
+        """
+        Create animation frames showing circles moving to sorted positions.
         
-        # Create frames with pre-computed positions
-        white_bg = Image.new('RGB', (width, height), color=(255, 255, 255))
-        for positions in circle_positions:
-            img = white_bg.copy()
-            draw = ImageDraw.Draw(img)
-            for circle, (cx, cy) in zip(circles, positions):
-                r = circle['radius']
-                draw.ellipse([cx - r, cy - r, cx + r, cy + r], 
-                           fill=circle['color'], outline=(0, 0, 0), width=2)
-            frames.append(img)
+        `fps` defaults to config.video_fps. Other rates resample the same
+        timeline (hold and move durations in seconds are those at video_fps):
+        frame k shows the animation at k / fps. Frames are looked up in (and
+        added to) `cache` by _frame_key, so calls for the same scene and
+        renderer at several frame rates share every frame whose pixels coincide.
+        """
+        renderer = renderer or self.renderer
+        outline = self._outline_width(renderer)
+        animation = self._animation(scene, renderer)
+        if cache is None:
+            cache = {}
         
-        final_frame = self._render_final_state(task_data)
-        for _ in range(hold_frames):
-            frames.append(final_frame)
+        frames = []
+        white_bg = None
+        for k in range(animation.frame_count(fps)):
+            key = self._frame_key(animation, k, fps)
+            if key not in cache:
+                if key == "start":
+                    cache[key] = self._render_initial_state(scene, renderer)
+                elif key == "end":
+                    cache[key] = self._render_final_state(scene, renderer)
+                else:
+                    # The same keyframe math Animation.render_frame uses, so
+                    # stored parameters reproduce these frames
+                    if white_bg is None:
+                        white_bg = renderer.create_blank_image()
+                    img = white_bg.copy()
+                    draw = ImageDraw.Draw(img)
+                    for r, color, (cx, cy) in zip(scene.radii, scene.colors, animation.positions(k, fps)):
+                        draw.ellipse([cx - r, cy - r, cx + r, cy + r], 
+                                   fill=color, outline=(0, 0, 0), width=outline)
+                    cache[key] = img
+            frames.append(cache[key])
         
         return frames
     
+    @staticmethod
+    def _frame_key(animation: Animation, k: int, fps: int | None = None) -> str | float:
+        """What frame k (at `fps`) shows: the start or end hold, or the eased progress of a moving frame."""
+        if animation.keyframe_position(k, fps) < animation.hold_frames:
+            return "start"
+        if animation.is_end_hold(k, fps):
+            return "end"
+        return animation.progress(k, fps)
+    
+    def _animation(self, scene: Scene, renderer: ImageRenderer | None = None) -> Animation:
+        """Keyframe parameters of the ground-truth animation of a scene."""
+        renderer = renderer or self.renderer
+        hold_frames, transition_frames = self._animation_timing()
+        return Animation(
+            scene,
+            image_size=renderer.image_size,
+            fps=self.config.video_fps,
+            hold_frames=hold_frames,
+            transition_frames=transition_frames,
+            outline_width=self._outline_width(renderer),
+        )
+    
     def _ease_in_out(self, t: float) -> float:
         """Easing function for smooth animation."""
-        return t * t * (3 - 2 * t)
+        return smoothstep(t)
@@ -0,0 +1,110 @@
+"""
+Near-duplicate scene detection.
+
+Scene.signature() only matches scenes with identical integer layouts; two
+scenes whose circles are a few pixels apart look the same but count as
+distinct. SceneIndex embeds each scene permutation-invariantly (circles in
+canonical order: largest first, ties by color) as quantized radii and
+positions relative to the image width, with the circle count and color
+sequence as an exact group key, and looks up neighbours in an LSH index:
+
+    index = SceneIndex(tolerance=0.01, image_width=1024)   # ~10 px
+    if not index.query(scene):
+        index.add(task_id, scene)
+
+audit_task_dirs() runs the same check over an already generated dataset.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Tuple
+
+from core.layout import iter_task_dirs
+from core.lsh import NearDuplicateIndex
+from .scene import Scene
+
+EMBEDDING_STEPS = 4096  # Quantization steps per image width
+
+
+def scene_embedding(scene: Scene, image_width: int) -> Tuple[Hashable, Tuple[int, ...]]:
+    """
+    Permutation-invariant (group, vector) embedding of a scene's initial layout.
+
+    group: (circle count, colors in canonical order)
+    vector: (radius, x, y) per circle in canonical order, in EMBEDDING_STEPS
+        units per image width (so resolutions are comparable)
+    """
+    scale = EMBEDDING_STEPS / image_width
+    circles = sorted(
+        zip(scene.radii, scene.colors, scene.xs, scene.ys),
+        key=lambda c: (-c[0], c[1], c[2], c[3]),
+    )
+    group = (len(circles), tuple(c[1] for c in circles))
+    vector = tuple(
+        int(round(v * scale)) for r, _, x, y in circles for v in (r, x, y)
+    )
+    return group, vector
+
+
+class SceneIndex:
+    """Streaming near-duplicate index over scenes."""
+
+    def __init__(self, tolerance: float, image_width: int, **lsh_options: Any):
+        """
+        Args:
+            tolerance: Scenes match if every radius and center coordinate is within
+                this fraction of the image width (e.g. 0.01 = ~10 px at 1024)
+            image_width: Width of the images the scenes are drawn at
+            **lsh_options: Passed to core.lsh.NearDuplicateIndex
+        """
+        self.image_width = image_width
+        self.index = NearDuplicateIndex(math.ceil(tolerance * EMBEDDING_STEPS), **lsh_options)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add(self, key: Any, scene: Scene) -> None:
+        self.index.add(key, *scene_embedding(scene, self.image_width))
+
+    def query(self, scene: Scene) -> List[Any]:
+        """Keys of indexed scenes that are near-duplicates of `scene`."""
+        return self.index.query(*scene_embedding(scene, self.image_width))
+
+
+def audit_task_dirs(
+    domain_dir: Path,
+    tolerance: float,
+    image_width: int,
+    **lsh_options: Any,
+) -> Dict[str, Any]:
+    """
+    Find near-duplicate scenes in a written `<domain>_task/` directory.
+
+    Tasks are read in manifest order; each one is grouped with the first
+    earlier task it matches.
+
+    Returns:
+        {"tasks": n, "tolerance": tolerance, "clusters": [[task_id, ...], ...]}
+        with only clusters of two or more tasks
+    """
+    index = SceneIndex(tolerance, image_width, **lsh_options)
+    clusters: Dict[str, List[str]] = {}
+    num_tasks = 0
+    for task_dir in iter_task_dirs(domain_dir):
+        metadata = json.loads((task_dir / "metadata.json").read_text())
+        scene = Scene.from_metadata(metadata["parameters"])
+        task_id = metadata["task_id"]
+        num_tasks += 1
+        matches = index.query(scene)
+        if matches:
+            clusters[matches[0]].append(task_id)
+        else:
+            # Only cluster roots are indexed, so each task joins exactly one cluster
+            clusters[task_id] = [task_id]
+            index.add(task_id, scene)
+    return {
+        "tasks": num_tasks,
+        "tolerance": tolerance,
+        "clusters": [ids for ids in clusters.values() if len(ids) > 1],
+    }
@@ -0,0 +1,164 @@
+"""
+Compact scene representation.
+
+A Scene is an immutable struct-of-arrays over the circles of one task: parallel
+tuples of ids, radii, colors and initial/final positions, plus the precomputed
+sort order (largest circumference first). Sampling, deduplication, rendering
+and metadata all work from this one structure.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+Color = Tuple[int, int, int]
+
+
+def final_lineup(
+    radii: Sequence[int], image_size: Tuple[int, int], spacing: int
+) -> Tuple[List[int], List[int], int]:
+    """
+    The solved layout: circles left to right by circumference, largest first,
+    `spacing` apart, centered horizontally on the middle row.
+
+    Returns:
+        (order, final_xs, line_y), final_xs in id order
+    """
+    width, height = image_size
+    # Stable, so equal radii keep id order
+    order = sorted(range(len(radii)), key=lambda i: radii[i], reverse=True)
+    total_width = sum(r * 2 for r in radii) + spacing * (len(radii) - 1)
+    final_xs = [0] * len(radii)
+    current_x = (width - total_width) // 2
+    for i in order:
+        final_xs[i] = current_x + radii[i]
+        current_x += radii[i] * 2 + spacing
+    return order, final_xs, height // 2
+
+
+class Scene:
+    """Immutable circle layout (struct of arrays)."""
+
+    __slots__ = ("ids", "radii", "colors", "xs", "ys", "final_xs", "final_ys", "order", "line_y")
+
+    def __init__(
+        self,
+        radii: Sequence[int],
+        colors: Sequence[Color],
+        xs: Sequence[float],
+        ys: Sequence[float],
+        final_xs: Sequence[float],
+        final_ys: Sequence[float],
+        line_y: float,
+        ids: Optional[Sequence[int]] = None,
+        order: Optional[Sequence[int]] = None,
+    ):
+        """
+        Args:
+            radii, colors, xs, ys: Per-circle radius, RGB color and initial center
+            final_xs, final_ys: Per-circle center once sorted onto the line
+            line_y: y coordinate of the final line
+            ids: Circle ids (default: 0..n-1)
+            order: Circle indices sorted by circumference, largest first
+                (computed from radii if omitted)
+        """
+        n = len(radii)
+        if not all(len(v) == n for v in (colors, xs, ys, final_xs, final_ys)):
+            raise ValueError("Scene arrays must all have the same length")
+        if order is None:
+            # Stable, so equal radii keep id order (as sorted(..., reverse=True) does)
+            order = sorted(range(n), key=lambda i: radii[i], reverse=True)
+        set_ = object.__setattr__
+        set_(self, "ids", tuple(ids) if ids is not None else tuple(range(n)))
+        set_(self, "radii", tuple(radii))
+        set_(self, "colors", tuple(tuple(c) for c in colors))
+        set_(self, "xs", tuple(xs))
+        set_(self, "ys", tuple(ys))
+        set_(self, "final_xs", tuple(final_xs))
+        set_(self, "final_ys", tuple(final_ys))
+        set_(self, "order", tuple(order))
+        set_(self, "line_y", line_y)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Scene is immutable")
+
+    def __len__(self) -> int:
+        return len(self.radii)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Scene):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, f) for f in self.__slots__))
+
+    @property
+    def num_circles(self) -> int:
+        return len(self.radii)
+
+    def circles(self) -> Iterator[Tuple[int, float, float, int, Color]]:
+        """Yield (id, x, y, radius, color) at the initial positions, in id order."""
+        return zip(self.ids, self.xs, self.ys, self.radii, self.colors)
+
+    def final_circles(self) -> Iterator[Tuple[int, float, float, int, Color]]:
+        """Yield (id, final_x, final_y, radius, color) in sorted (left-to-right) order."""
+        for i in self.order:
+            yield self.ids[i], self.final_xs[i], self.final_ys[i], self.radii[i], self.colors[i]
+
+    def scaled(self, factor: float) -> "Scene":
+        """The same scene in a coordinate frame `factor` times larger (ids and order kept)."""
+        if factor == 1:
+            return self
+        scale = lambda values: [v * factor for v in values]
+        return Scene(
+            radii=scale(self.radii),
+            colors=self.colors,
+            xs=scale(self.xs),
+            ys=scale(self.ys),
+            final_xs=scale(self.final_xs),
+            final_ys=scale(self.final_ys),
+            line_y=self.line_y * factor,
+            ids=self.ids,
+            order=self.order,
+        )
+
+    def signature(self) -> tuple:
+        """Exact-duplicate key: count, rounded start layout, final order and line."""
+        start = tuple(sorted(
+            (int(i), int(x), int(y), int(r), c)
+            for i, x, y, r, c in self.circles()
+        ))
+        sorted_ids = tuple(int(self.ids[i]) for i in self.order)
+        return (self.num_circles, start, sorted_ids, int(self.line_y))
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """Task parameters for metadata.json (sort order and line are derivable)."""
+        return {
+            "circles": [
+                {
+                    "id": i,
+                    "radius": r,
+                    "color": list(c),
+                    "initial_position": [x, y],
+                    "final_position": [fx, fy],
+                }
+                for i, x, y, r, c, fx, fy in zip(
+                    self.ids, self.xs, self.ys, self.radii, self.colors, self.final_xs, self.final_ys
+                )
+            ],
+        }
+
+    @classmethod
+    def from_metadata(cls, parameters: Dict[str, Any]) -> "Scene":
+        """Rebuild a Scene from the `parameters` block of metadata.json."""
+        circles = parameters["circles"]
+        final_ys = [c["final_position"][1] for c in circles]
+        return cls(
+            ids=[c["id"] for c in circles],
+            radii=[c["radius"] for c in circles],
+            colors=[tuple(c["color"]) for c in circles],
+            xs=[c["initial_position"][0] for c in circles],
+            ys=[c["initial_position"][1] for c in circles],
+            final_xs=[c["final_position"][0] for c in circles],
+            final_ys=final_ys,
+            line_y=final_ys[0] if final_ys else 0,
+        )
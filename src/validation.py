@@ -0,0 +1,161 @@
+"""
+Task-specific validation.
+
+check_task() adds to the generic core.validation checks what only this task
+knows: the circles in metadata.json must be a valid scene for the TaskConfig
+(counts, radii, no overlaps, inside the image), the final positions must be
+exactly the lineup re-derived from the radii, a scheduled difficulty bucket
+must match the circles, the frame-rate variants (ground_truth_<fps>fps.mp4)
+must last as long as ground_truth.mp4, and animation.json (if written) must describe the
+same scene and timing. Resolution variants (`<width>px/`) are checked at their
+own image size, with the circles scaled back to config.image_size first.
+"""
+
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from core.validation import check_video, load_metadata, validate_task_dir
+from .animation import ANIMATION_FILE, Animation, animation_timing, resampled_frame_count
+from .config import TaskConfig
+from .difficulty import make_bucket, min_adjacent_ratio
+from .scene import Scene, final_lineup
+
+
+def check_geometry(scene: Scene, config: TaskConfig) -> List[str]:
+    """Errors in a scene's circles relative to the config."""
+    errors: List[str] = []
+    width, height = config.image_size
+    n = scene.num_circles
+    if not config.min_circles <= n <= config.max_circles:
+        errors.append(f"{n} circles, expected {config.min_circles}-{config.max_circles}")
+    if len(set(scene.radii)) != n:
+        errors.append(f"radii are not distinct: {list(scene.radii)}")
+    for i, x, y, r, _ in scene.circles():
+        if not config.min_radius <= r <= config.max_radius:
+            errors.append(f"circle {i} radius {r} outside {config.min_radius}-{config.max_radius}")
+        if x - r < 0 or y - r < 0 or x + r > width or y + r > height:
+            errors.append(f"circle {i} at ({x}, {y}) r={r} leaves the image")
+    circles = list(scene.circles())
+    for a in range(n):
+        for b in range(a + 1, n):
+            (ia, xa, ya, ra, _), (ib, xb, yb, rb, _) = circles[a], circles[b]
+            if math.hypot(xa - xb, ya - yb) < ra + rb:
+                errors.append(f"circles {ia} and {ib} overlap")
+
+    order, final_xs, line_y = final_lineup(scene.radii, config.image_size, int(config.min_spacing))
+    if list(scene.final_xs) != final_xs or any(fy != line_y for fy in scene.final_ys):
+        errors.append("final positions differ from the lineup derived from the radii")
+    return errors
+
+
+def check_difficulty(scene: Scene, bucket_name: str, config: TaskConfig) -> List[str]:
+    """Errors if a scene's count or tightness doesn't match its difficulty bucket."""
+    try:
+        bucket = make_bucket(config, bucket_name)
+    except ValueError as e:
+        return [str(e)]
+    errors: List[str] = []
+    if scene.num_circles != bucket.num_circles:
+        errors.append(f"difficulty {bucket_name} but {scene.num_circles} circles")
+    elif scene.num_circles > 1 and not bucket.contains_ratio(min_adjacent_ratio(scene.radii)):
+        errors.append(
+            f"difficulty {bucket_name} but smallest adjacent radius ratio "
+            f"{min_adjacent_ratio(scene.radii):.3f} is outside {bucket.ratio_lo:.3f}-{bucket.ratio_hi:.3f}"
+        )
+    return errors
+
+
+def check_video_variants(
+    task_dir: Path, config: TaskConfig, check_frames: bool = True, image_size: Optional[Tuple[int, int]] = None
+) -> List[str]:
+    """
+    Errors in the ground_truth_<fps>fps.mp4 videos of config.video_fps_variants.
+
+    Every variant resamples the animation of ground_truth.mp4, so its frame
+    count must give the same duration at its own rate.
+    """
+    errors: List[str] = []
+    require_video = config.generate_videos and not config.parametric_video
+    hold_frames, transition_frames = animation_timing(config.video_fps, config.video_duration)
+    num_frames = 2 * hold_frames + transition_frames
+    for fps in config.video_fps_variants:
+        video = Path(task_dir) / f"ground_truth_{fps}fps.mp4"
+        if not video.exists():
+            if require_video:
+                errors.append(f"missing {video.name}")
+            continue
+        if check_frames:
+            expected = resampled_frame_count(num_frames, config.video_fps, fps)
+            error = check_video(video, expected, fps, image_size or config.image_size)
+            if error:
+                errors.append(error)
+    return errors
+
+
+def _base_scene(scene: Scene, factor: float) -> Scene:
+    """A resolution variant's scene in base coordinates (sampled scenes are integral)."""
+    base = scene.scaled(factor)
+    whole = lambda values: [round(v) for v in values]
+    return Scene(
+        radii=whole(base.radii), colors=base.colors, xs=whole(base.xs), ys=whole(base.ys),
+        final_xs=whole(base.final_xs), final_ys=whole(base.final_ys), line_y=round(base.line_y),
+        ids=base.ids, order=base.order,
+    )
+
+
+def check_task(
+    task_dir: Path,
+    config: TaskConfig,
+    num_frames: Optional[int] = None,
+    image_size: Optional[Tuple[int, int]] = None,
+) -> List[str]:
+    """
+    Validate one task directory: files, metadata, geometry and animation.
+
+    Args:
+        task_dir: Task directory
+        config: The TaskConfig the dataset was generated with
+        num_frames: Expected frames per animation (TaskGenerator.animation_frame_count())
+        image_size: Image size of a `<width>px/` resolution variant
+            (default: config.image_size)
+    """
+    task_dir = Path(task_dir)
+    image_size = tuple(image_size or config.image_size)
+    errors = validate_task_dir(
+        task_dir,
+        image_size,
+        num_frames=num_frames,
+        fps=config.video_fps,
+        require_video=config.generate_videos and not config.parametric_video,
+    )
+    errors.extend(check_video_variants(task_dir, config, check_frames=num_frames is not None, image_size=image_size))
+    # load_metadata already reported a missing/invalid file via validate_task_dir
+    metadata = load_metadata(task_dir, [])
+    if metadata is None or "parameters" not in metadata:
+        return errors
+    try:
+        scene = Scene.from_metadata(metadata["parameters"])
+    except (KeyError, TypeError, ValueError) as e:
+        return errors + [f"metadata.json circles are malformed: {e}"]
+    base_scene = scene
+    if image_size != tuple(config.image_size):
+        base_scene = _base_scene(scene, config.image_size[0] / image_size[0])
+    errors.extend(check_geometry(base_scene, config))
+    if "difficulty" in metadata["parameters"]:
+        errors.extend(check_difficulty(base_scene, metadata["parameters"]["difficulty"], config))
+
+    if (task_dir / ANIMATION_FILE).exists():
+        animation = Animation.load(task_dir)
+        if num_frames is not None and animation.num_frames != num_frames:
+            errors.append(f"{ANIMATION_FILE} has {animation.num_frames} frames, expected {num_frames}")
+        if animation.fps != config.video_fps:
+            errors.append(f"{ANIMATION_FILE} is {animation.fps} fps, expected {config.video_fps}")
+        moving = animation.scene
+        if (moving.radii, moving.xs, moving.ys, moving.final_xs, moving.final_ys) != (
+            scene.radii, scene.xs, scene.ys, scene.final_xs, scene.final_ys
+        ):
+            errors.append(f"{ANIMATION_FILE} does not match metadata.json")
+    elif config.parametric_video:
+        errors.append(f"missing {ANIMATION_FILE}")
+    return errors